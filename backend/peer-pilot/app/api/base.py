@@ -1,5 +1,5 @@
 from fastapi import APIRouter
-from app.api.endpoints import students, teams, grades, peer_reviews, team_grades, dashboard, projects, auth
+from app.api.endpoints import students, teams, grades, peer_reviews, team_grades, dashboard, projects, auth, jobs
 
 api_router = APIRouter()
 api_router.include_router(students.router, prefix="/students", tags=["students"])
@@ -10,3 +10,4 @@ api_router.include_router(team_grades.router, prefix="/team-grades", tags=["team
 api_router.include_router(dashboard.router, prefix="/dashboard", tags=["dashboard"])
 api_router.include_router(projects.router, prefix="/projects", tags=["projects"])
 api_router.include_router(auth.router, prefix="/auth", tags=["auth"])
+api_router.include_router(jobs.router, prefix="/jobs", tags=["jobs"])
@@ -1,38 +1,44 @@
-from fastapi import APIRouter, Depends, HTTPException, status
+from typing import Optional
+
+from fastapi import APIRouter, Depends, File, HTTPException, UploadFile, status
 from fastapi.security import OAuth2PasswordRequestForm
 from sqlalchemy.orm import Session
+from starlette.concurrency import run_in_threadpool
 
 from app.core.db import get_db
+from app.core.hashing import hash_pool_metrics
 from app.core.security import (
     get_password_hash,
     get_user_by_email,
     verify_password,
     create_access_token,
+    require_instructor,
 )
 from app.models.student import Student
 from app.models.user import User
-from app.schemas.auth import LoginRequest, Token, CurrentUser, UserCreate, UserRead
+from app.schemas.auth import (
+    LoginRequest,
+    Token,
+    CurrentUser,
+    UserCreate,
+    UserRead,
+    HashPoolMetricsRead,
+    ImportRowError,
+    RosterImportReport,
+)
+from app.services.dashboard_snapshots import invalidate_all
+from app.services.roster_import import import_roster
 from app.core.security import get_current_user
 
 router = APIRouter()
 
-@router.post("/register", response_model=UserRead, status_code=status.HTTP_201_CREATED)
-def register_user(
-    user_in: UserCreate,
-    db: Session = Depends(get_db),
-):
-    existing = db.query(User).filter(User.email == user_in.email).first()
-    if existing:
-        raise HTTPException(
-            status_code=status.HTTP_400_BAD_REQUEST,
-            detail="User with this email already exists",
-        )
 
+def _create_user(db: Session, user_in: UserCreate, hashed_password: str) -> User:
     user = User(
         email=user_in.email,
         name=user_in.name,
         role=user_in.role,
-        hashed_password=get_password_hash(user_in.password),
+        hashed_password=hashed_password,
     )
     db.add(user)
     db.flush()  # чтобы получить user.id, не коммитя транзакцию
@@ -56,6 +62,7 @@ def register_user(
             )
             db.add(student)
             db.flush()  # получаем student.id
+            invalidate_all(db)
 
         # линкуем пользователя к студенту
         user.student_id = student.id
@@ -66,10 +73,87 @@ def register_user(
 
     return user
 
+
+# async — чтобы ждать пул bcrypt, не занимая поток; сами запросы к БД
+# синхронные и уходят в threadpool, иначе блокировали бы event loop
+@router.post("/register", response_model=UserRead, status_code=status.HTTP_201_CREATED)
+async def register_user(
+    user_in: UserCreate,
+    db: Session = Depends(get_db),
+):
+    existing = await run_in_threadpool(get_user_by_email, db, user_in.email)
+    if existing:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="User with this email already exists",
+        )
+
+    hashed_password = await get_password_hash(user_in.password)
+    return await run_in_threadpool(_create_user, db, user_in, hashed_password)
+
+@router.post("/import", response_model=RosterImportReport)
+def import_users(
+    file: UploadFile = File(...),
+    db: Session = Depends(get_db),
+    _: User = Depends(require_instructor),
+):
+    """
+    Массовая регистрация из CSV (name,email,password,role,team_id) или JSON
+    (массив объектов / NDJSON). Строки с ошибками пропускаются и попадают
+    в отчёт, остальные создаются одной транзакцией.
+    """
+    result = import_roster(db, file.file, file.filename, file.content_type)
+    db.commit()
+    return RosterImportReport(
+        created=result.created,
+        linkedStudents=result.linked_students,
+        errors=[ImportRowError.model_validate(e) for e in result.errors],
+    )
+
+
+def _save_password_hash(db: Session, user: User, hashed_password: str) -> None:
+    user.hashed_password = hashed_password
+    db.commit()
+    # перечитываем здесь, а не ленивой загрузкой в корутине
+    db.refresh(user)
+
+
+async def _authenticate(db: Session, email: str, password: str) -> Optional[User]:
+    """Пользователь с верным паролем или None; устаревший хэш тут же заменяется."""
+    user = await run_in_threadpool(get_user_by_email, db, email)
+    if not user:
+        return None
+    ok, new_hash = await verify_password(password, user.hashed_password)
+    if not ok:
+        return None
+    if new_hash is not None:
+        await run_in_threadpool(_save_password_hash, db, user, new_hash)
+    return user
+
+
+@router.get("/hashing/metrics", response_model=HashPoolMetricsRead)
+def password_hashing_metrics(_: User = Depends(require_instructor)):
+    """Счётчики пула bcrypt текущего процесса (у каждого воркера uvicorn свой пул)."""
+    metrics = hash_pool_metrics()
+    finished = metrics.completed + metrics.failed
+    return HashPoolMetricsRead(
+        workers=metrics.workers,
+        queueLimit=metrics.queue_limit,
+        inFlight=metrics.in_flight,
+        peakInFlight=metrics.peak_in_flight,
+        submitted=metrics.submitted,
+        completed=metrics.completed,
+        failed=metrics.failed,
+        rejected=metrics.rejected,
+        rehashed=metrics.rehashed,
+        avgSeconds=metrics.total_seconds / finished if finished else None,
+    )
+
+
 @router.post("/login", response_model=Token)
-def login_json(data: LoginRequest, db: Session = Depends(get_db)):
-    user = get_user_by_email(db, data.email)
-    if not user or not verify_password(data.password, user.hashed_password):
+async def login_json(data: LoginRequest, db: Session = Depends(get_db)):
+    user = await _authenticate(db, data.email, data.password)
+    if not user:
         raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Invalid credentials")
 
     token = create_access_token({"sub": str(user.id)})
@@ -77,12 +161,12 @@ def login_json(data: LoginRequest, db: Session = Depends(get_db)):
 
 
 @router.post("/token", response_model=Token)
-def login_token(
+async def login_token(
     form_data: OAuth2PasswordRequestForm = Depends(),
     db: Session = Depends(get_db),
 ):
-    user = get_user_by_email(db, form_data.username)
-    if not user or not verify_password(form_data.password, user.hashed_password):
+    user = await _authenticate(db, form_data.username, form_data.password)
+    if not user:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="Incorrect email or password",
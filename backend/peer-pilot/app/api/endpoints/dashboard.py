@@ -1,18 +1,32 @@
-from fastapi import APIRouter, Depends, HTTPException
-from sqlalchemy.orm import Session
+from typing import Literal
 
+from fastapi import APIRouter, Depends, HTTPException, Query, Response
+from sqlalchemy import func
+from sqlalchemy.orm import Session, aliased, selectinload
+
+from app.api.fieldsets import PEER_REVIEW, FieldSet, serialize
+from app.api.normalized import EntityMap, ResponseFormat, envelope_json, format_param
 from app.core.db import get_db
-from app.core.security import get_current_user
+from app.core.security import get_current_user, require_instructor
 from app.models.student import Student
 from app.models.team import Team
 from app.models.grade import Grade
-from app.models.peer_review import PeerReview
+from app.models.peer_review import PeerReview, PeerReviewStatus
+from app.models.project import Project
+from app.models.team_grade import TeamGrade
 from app.models.user import User
 from app.schemas.student import StudentRead
 from app.schemas.team import TeamRead
 from app.schemas.grade import GradeRead
 from app.schemas.peer_review import PeerReviewRead
-from app.schemas.dashboard import StudentDashboard  # твой уже существующий
+from app.schemas.dashboard import (  # твой уже существующий
+    InstructorDashboard,
+    PendingReviewItem,
+    SprintReviewStatusCounts,
+    StudentDashboard,
+    TeamGradeSummary,
+)
+from app.services.dashboard_snapshots import load_snapshot, save_snapshot, snapshot_generation
 
 router = APIRouter()
 
@@ -20,22 +34,71 @@ router = APIRouter()
 @router.get("/students/{student_id}", response_model=StudentDashboard)
 def get_student_dashboard(
     student_id: int,
+    scope: Literal["all", "project"] = Query(
+        "all",
+        description="'project' — только команды и студенты проекта, в котором состоит студент",
+    ),
+    fmt: ResponseFormat = Depends(format_param),
     db: Session = Depends(get_db),
     current_user: User = Depends(get_current_user),
 ):
-    student = db.query(Student).get(student_id)
+    # у нормализованного формата свой снапшот; сбрасываются они вместе (по student_id)
+    snapshot_key = scope if fmt == "nested" else f"{scope}:{fmt}"
+
+    # готовый снапшот отдаём как есть, без запросов и сериализации
+    cached = load_snapshot(db, student_id, snapshot_key)
+    if cached is not None:
+        return Response(content=cached, media_type="application/json")
+
+    # счётчик до чтения данных: инвалидация во время сборки отменит сохранение
+    generation = snapshot_generation(db)
+    student = (
+        db.query(Student)
+        .options(selectinload(Student.team))
+        .filter(Student.id == student_id)
+        .first()
+    )
     if not student:
         raise HTTPException(404, "Student not found")
 
-    teams = db.query(Team).all()
-    students = db.query(Student).all()
-    grades = db.query(Grade).filter(Grade.student_id == student_id).all()
+    if fmt == "normalized":
+        payload = build_student_dashboard_normalized(db, student, scope)
+    else:
+        payload = build_student_dashboard(db, student, scope).model_dump_json(by_alias=True)
+    save_snapshot(db, student_id, snapshot_key, payload, generation)
+    return Response(content=payload, media_type="application/json")
+
+
+def _load_student_dashboard(db: Session, student: Student, scope: str):
+    # составы команд грузим одним SELECT ... IN, а не лениво на каждую команду
+    teams_query = db.query(Team).options(selectinload(Team.students)).order_by(Team.id)
+
+    if scope == "project":
+        project_id = student.team.project_id if student.team else None
+        if project_id is not None:
+            teams_query = teams_query.filter(Team.project_id == project_id)
+        else:
+            teams_query = teams_query.filter(Team.id == student.team_id)
+
+        teams = teams_query.all()
+        students = [s for t in teams for s in t.students]
+        if student.team_id is None:
+            students.append(student)
+    else:
+        teams = teams_query.all()
+        students = db.query(Student).order_by(Student.id).all()
+
+    grades = db.query(Grade).filter(Grade.student_id == student.id).all()
 
     # ревью, где его команда reviewer или reviewee
     review_assignments = []
     if student.team_id:
         review_assignments = (
             db.query(PeerReview)
+            .options(
+                selectinload(PeerReview.reviewing_team).selectinload(Team.students),
+                selectinload(PeerReview.reviewed_team).selectinload(Team.students),
+            )
             .filter(
                 (PeerReview.reviewing_team_id == student.team_id)
                 | (PeerReview.reviewed_team_id == student.team_id)
@@ -43,19 +106,163 @@ def get_student_dashboard(
             .all()
         )
 
+    return teams, students, grades, review_assignments
+
+
+def _grade_read(g: Grade) -> GradeRead:
+    return GradeRead(
+        id=g.id,
+        studentId=g.student_id,
+        sprint=g.sprint,
+        assignment=g.assignment,
+        score=g.score,
+    )
+
+
+def build_student_dashboard(db: Session, student: Student, scope: str) -> StudentDashboard:
+    teams, students, grades, review_assignments = _load_student_dashboard(db, student, scope)
     return StudentDashboard(
         student=StudentRead.model_validate(student),
         teams=[TeamRead.model_validate(t) for t in teams],
         students=[StudentRead.model_validate(s) for s in students],
-        grades=[
-            GradeRead(
-                id=g.id,
-                studentId=g.student_id,
-                sprint=g.sprint,
-                assignment=g.assignment,
-                score=g.score,
+        grades=[_grade_read(g) for g in grades],
+        review_assignments=[PeerReviewRead.model_validate(r) for r in review_assignments],
+    )
+
+
+def build_student_dashboard_normalized(db: Session, student: Student, scope: str) -> str:
+    """
+    Тот же дашборд, но каждая команда и студент — один раз в entities;
+    teams / students / reviewAssignments ссылаются на них по id.
+    """
+    teams, students, grades, review_assignments = _load_student_dashboard(db, student, scope)
+    entities = EntityMap()
+    data = {
+        "studentId": entities.student(student),
+        "teamIds": [entities.team(t) for t in teams],
+        "studentIds": [entities.student(s) for s in students],
+        "grades": [_grade_read(g).model_dump(by_alias=True) for g in grades],
+        "reviewAssignments": [],
+    }
+    for review in review_assignments:
+        entities.team(review.reviewing_team)
+        entities.team(review.reviewed_team)
+        data["reviewAssignments"].append(serialize(review, PEER_REVIEW, FieldSet(sparse=True)))
+    return envelope_json(data, entities).decode()
+
+
+@router.get("/instructor/{project_id}", response_model=InstructorDashboard)
+def get_instructor_dashboard(
+    project_id: int,
+    db: Session = Depends(get_db),
+    _: User = Depends(require_instructor),
+):
+    """
+    Сводка по проекту для инструктора (QAS001): всё агрегируется в SQL
+    через GROUP BY, сырые строки grades / peer_reviews в Python не тянем.
+    """
+    if db.query(Project.id).filter(Project.id == project_id).first() is None:
+        raise HTTPException(404, "Project not found")
+
+    project_team_ids = db.query(Team.id).filter(Team.project_id == project_id).scalar_subquery()
+
+    # команды + размер состава
+    team_rows = (
+        db.query(Team.id, Team.name, Team.color, func.count(Student.id))
+        .outerjoin(Student, Student.team_id == Team.id)
+        .filter(Team.project_id == project_id)
+        .group_by(Team.id, Team.name, Team.color)
+        .order_by(Team.id)
+        .all()
+    )
+
+    # средние по индивидуальным оценкам участников команды
+    student_avgs = {
+        team_id: (avg, cnt)
+        for team_id, avg, cnt in (
+            db.query(Student.team_id, func.avg(Grade.score), func.count(Grade.id))
+            .join(Grade, Grade.student_id == Student.id)
+            .filter(Student.team_id.in_(project_team_ids))
+            .group_by(Student.team_id)
+        )
+    }
+
+    # средние по командным оценкам
+    team_avgs = {
+        team_id: (avg, cnt)
+        for team_id, avg, cnt in (
+            db.query(TeamGrade.team_id, func.avg(TeamGrade.score), func.count(TeamGrade.id))
+            .filter(TeamGrade.team_id.in_(project_team_ids))
+            .group_by(TeamGrade.team_id)
+        )
+    }
+
+    teams = []
+    for team_id, name, color, student_count in team_rows:
+        avg_student, student_cnt = student_avgs.get(team_id, (None, 0))
+        avg_team, team_cnt = team_avgs.get(team_id, (None, 0))
+        teams.append(
+            TeamGradeSummary(
+                team_id=team_id,
+                team_name=name,
+                color=color,
+                student_count=student_count,
+                avg_student_score=avg_student,
+                student_grade_count=student_cnt,
+                avg_team_score=avg_team,
+                team_grade_count=team_cnt,
             )
-            for g in grades
+        )
+
+    # статусы ревью по спринтам
+    by_sprint: dict[int, SprintReviewStatusCounts] = {}
+    status_rows = (
+        db.query(PeerReview.sprint, PeerReview.status, func.count(PeerReview.id))
+        .filter(PeerReview.reviewing_team_id.in_(project_team_ids))
+        .group_by(PeerReview.sprint, PeerReview.status)
+        .order_by(PeerReview.sprint)
+    )
+    for sprint, status, cnt in status_rows:
+        counts = by_sprint.setdefault(sprint, SprintReviewStatusCounts(sprint=sprint))
+        setattr(counts, PeerReviewStatus(status).value, cnt)
+
+    # незакрытые ревью — только нужные колонки, без ORM-объектов и составов команд
+    reviewing = aliased(Team)
+    reviewed = aliased(Team)
+    pending_rows = (
+        db.query(
+            PeerReview.id,
+            PeerReview.sprint,
+            reviewing.id,
+            reviewing.name,
+            reviewed.id,
+            reviewed.name,
+            PeerReview.due_date,
+        )
+        .join(reviewing, reviewing.id == PeerReview.reviewing_team_id)
+        .join(reviewed, reviewed.id == PeerReview.reviewed_team_id)
+        .filter(
+            reviewing.project_id == project_id,
+            PeerReview.status == PeerReviewStatus.PENDING,
+        )
+        .order_by(PeerReview.sprint, PeerReview.id)
+        .all()
+    )
+
+    return InstructorDashboard(
+        project_id=project_id,
+        teams=teams,
+        review_status=list(by_sprint.values()),
+        pending_reviews=[
+            PendingReviewItem(
+                id=row[0],
+                sprint=row[1],
+                reviewing_team_id=row[2],
+                reviewing_team_name=row[3],
+                reviewed_team_id=row[4],
+                reviewed_team_name=row[5],
+                due_date=row[6],
+            )
+            for row in pending_rows
         ],
-        review_assignments=[PeerReviewRead.model_validate(r) for r in review_assignments],
     )
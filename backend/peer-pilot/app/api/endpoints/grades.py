@@ -1,20 +1,71 @@
-from typing import List, Optional
+import json
+import uuid
+from dataclasses import replace
+from pathlib import Path
+from typing import List, Literal, Optional
 
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, Depends, HTTPException, Request, Response
+from fastapi.responses import StreamingResponse
+from sqlalchemy import update
+from sqlalchemy.exc import IntegrityError
 from sqlalchemy.orm import Session
 
+from app.api.pagination import Page, page_params, paginate
+from app.core.config import app_settings
 from app.core.db import get_db
 from app.core.security import get_current_user, require_instructor
-from app.models.grade import Grade
+from app.models.grade import AssignmentLetterEnum, Grade
+from app.models.job import Job, JobStatus
 from app.models.user import User
-from app.schemas.grade import GradeRead, GradeUpsert
+from app.schemas.grade import (
+    FinalGradesRead,
+    FinalGradesWhatIf,
+    GradeMatrixRead,
+    GradeRead,
+    GradeStatRead,
+    GradeUpsert,
+    TeamGradeFanOut,
+    TeamGradeFanOutRead,
+)
+from app.services.dashboard_snapshots import invalidate_students
+from app.services.downloads import conditional_file_response
+from app.services.final_grades import (
+    LETTERS,
+    FinalGrades,
+    GradingPolicy,
+    apply_overrides,
+    compute_final_grades,
+    load_cohort,
+)
+from app.services.grade_fanout import FanOutError, fan_out_team_grades
+from app.services.grade_matrix import build_grade_matrix
+from app.services.grade_stats import (
+    BUCKET_WIDTH,
+    STUDENT_SCOPE,
+    apply_grade_stat_deltas,
+    grade_stat_summaries,
+)
+from app.services.grade_store import grade_key, grade_scores, upsert_grade_rows
+from app.services.jobs import enqueue, job_handler, notify_workers
+from app.services.moodle_export import (
+    moodle_export_expired,
+    moodle_export_path,
+    prune_moodle_exports,
+    stream_moodle_csv,
+    write_moodle_csv,
+)
+
+EXPORT_DIR = Path("data/exports")
 
 router = APIRouter()
 
 
 @router.get("/", response_model=List[GradeRead])
 def list_grades(
+    request: Request,
+    response: Response,
     student_id: Optional[int] = None,
+    page: Page = Depends(page_params),
     db: Session = Depends(get_db),
     _: User = Depends(get_current_user),
 ):
@@ -22,7 +73,7 @@ def list_grades(
     if student_id is not None:
         query = query.filter(Grade.student_id == student_id)
 
-    grades = query.all()
+    grades = paginate(query, Grade.id, page, request, response)
 
     return [
         GradeRead(
@@ -36,46 +87,290 @@ def list_grades(
     ]
 
 
+@router.get("/matrix", response_model=GradeMatrixRead)
+def grade_matrix(
+    project_id: Optional[int] = None,
+    team_id: Optional[int] = None,
+    db: Session = Depends(get_db),
+    _: User = Depends(get_current_user),
+):
+    """Журнал одной матрицей вместо списка GradeRead — на порядок меньше JSON."""
+    matrix = build_grade_matrix(db, project_id=project_id, team_id=team_id)
+    return GradeMatrixRead(
+        studentIds=matrix.student_ids,
+        sprints=[sprint for sprint, _ in matrix.columns],
+        assignments=[letter for _, letter in matrix.columns],
+        scores=matrix.scores,
+    )
+
+
+@router.get("/stats", response_model=List[GradeStatRead])
+def grade_stats(
+    scope: Optional[Literal["student", "team"]] = None,
+    sprint: Optional[int] = None,
+    assignment: Optional[AssignmentLetterEnum] = None,
+    db: Session = Depends(get_db),
+    _: User = Depends(require_instructor),
+):
+    """Статистика по (sprint, assignment) из накопленных агрегатов grade_stats."""
+    return [
+        GradeStatRead(**vars(summary), bucketWidth=BUCKET_WIDTH)
+        for summary in grade_stat_summaries(db, scope=scope, sprint=sprint, assignment=assignment)
+    ]
+
+
+@router.post("/stats/rebuild", status_code=202)
+def rebuild_grade_stats_table(
+    db: Session = Depends(get_db),
+    _: User = Depends(require_instructor),
+):
+    """Пересчёт grade_stats из grades / team_grades фоновой задачей (восстановление)."""
+    job = enqueue(db, "rebuild_grade_stats", dedupe_key="all")
+    job_id = job.id
+    db.commit()
+    notify_workers()
+    return {"jobId": job_id}
+
+
+def _final_grades_read(result: FinalGrades) -> FinalGradesRead:
+    averages = result.letter_averages.round(2).tolist()
+    return FinalGradesRead(
+        studentIds=result.student_ids.tolist(),
+        teamIds=[None if t < 0 else t for t in result.team_ids.tolist()],
+        letters=LETTERS,
+        letterAverages=[[None if x != x else x for x in row] for row in averages],  # NaN -> null
+        final=result.final.round(2).tolist(),
+        bands=result.bands,
+    )
+
+
+@router.get("/final", response_model=FinalGradesRead)
+def final_grades(
+    project_id: Optional[int] = None,
+    db: Session = Depends(get_db),
+    _: User = Depends(require_instructor),
+):
+    """Итоговые оценки потока по весам из настроек (FINAL_GRADE_*)."""
+    cohort = load_cohort(db, project_id)
+    return _final_grades_read(compute_final_grades(cohort, GradingPolicy.from_settings()))
+
+
+@router.post("/final/what-if", response_model=FinalGradesRead)
+def final_grades_what_if(
+    scenario: FinalGradesWhatIf,
+    project_id: Optional[int] = None,
+    db: Session = Depends(get_db),
+    _: User = Depends(require_instructor),
+):
+    """Пересчёт с другими весами/полосами и правками оценок — без записи в БД."""
+    policy = GradingPolicy.from_settings()
+    if scenario.weights is not None:
+        policy.weights = scenario.weights
+    if scenario.bonusLetters is not None:
+        policy.bonus_letters = tuple(scenario.bonusLetters)
+    if scenario.bands is not None:
+        # replace — чтобы __post_init__ упорядочил полосы
+        policy = replace(policy, bands=tuple(scenario.bands.items()))
+
+    cohort = apply_overrides(
+        load_cohort(db, project_id),
+        [(o.studentId, o.sprint, o.assignment, o.score) for o in scenario.overrides],
+    )
+    return _final_grades_read(compute_final_grades(cohort, policy))
+
+
+def _moodle_filename(project_id: Optional[int], sprint: Optional[int]) -> str:
+    parts = ["grades"]
+    if project_id is not None:
+        parts.append(f"project-{project_id}")
+    if sprint is not None:
+        parts.append(f"sprint-{sprint}")
+    return "-".join(parts) + "-moodle.csv"
+
+
+@router.get("/export/moodle")
+def export_moodle_csv(
+    project_id: Optional[int] = None,
+    sprint: Optional[int] = None,
+    db: Session = Depends(get_db),
+    _: User = Depends(require_instructor),
+):
+    """
+    CSV для импорта оценок в Moodle (по строке на студента). Тело отдаётся
+    потоком по мере чтения курсора — время до первого байта не зависит
+    от размера курса.
+    """
+    return StreamingResponse(
+        stream_moodle_csv(db.get_bind(), project_id=project_id, sprint=sprint),
+        media_type="text/csv; charset=utf-8",
+        headers={
+            "Content-Disposition": f'attachment; filename="{_moodle_filename(project_id, sprint)}"'
+        },
+    )
+
+
+@job_handler("moodle_export")
+def moodle_export_job(db: Session, payload: dict) -> dict:
+    # старые экспорты чистим при каждом новом — файлы не копятся бесконечно
+    prune_moodle_exports(EXPORT_DIR, app_settings.MOODLE_EXPORT_TTL_SECONDS)
+    dest = moodle_export_path(EXPORT_DIR, payload["file_token"])
+    size = write_moodle_csv(
+        db.get_bind(), dest, project_id=payload.get("project_id"), sprint=payload.get("sprint")
+    )
+    return {"file": dest.name, "size": size}
+
+
+@router.post("/export/moodle/jobs", status_code=202)
+def enqueue_moodle_export(
+    project_id: Optional[int] = None,
+    sprint: Optional[int] = None,
+    db: Session = Depends(get_db),
+    _: User = Depends(require_instructor),
+):
+    """Тот же экспорт фоновой задачей — для больших курсов; статус — GET /jobs/{id}."""
+    job_id = enqueue(
+        db,
+        "moodle_export",
+        {"file_token": uuid.uuid4().hex, "project_id": project_id, "sprint": sprint},
+    ).id
+    db.commit()
+    notify_workers()
+    return {"jobId": job_id}
+
+
+@router.get("/export/moodle/jobs/{job_id}")
+def download_moodle_export(
+    job_id: int,
+    request: Request,
+    db: Session = Depends(get_db),
+    _: User = Depends(require_instructor),
+):
+    job = db.get(Job, job_id)
+    if not job or job.kind != "moodle_export":
+        raise HTTPException(404, "Export not found")
+    if job.status != JobStatus.SUCCEEDED:
+        raise HTTPException(409, f"Export is {job.status.value}")
+
+    payload = json.loads(job.payload)
+    path = moodle_export_path(EXPORT_DIR, payload["file_token"])
+    if moodle_export_expired(path, app_settings.MOODLE_EXPORT_TTL_SECONDS):
+        path.unlink(missing_ok=True)
+        raise HTTPException(404, "Export file expired or missing on server")
+    return conditional_file_response(
+        request,
+        path,
+        filename=_moodle_filename(payload.get("project_id"), payload.get("sprint")),
+        media_type="text/csv; charset=utf-8",
+    )
+
+
 @router.put("/", response_model=List[GradeRead])
 def upsert_grades(
     grades: List[GradeUpsert],
     db: Session = Depends(get_db),
     _: User = Depends(require_instructor),
 ):
-    result: list[Grade] = []
+    """
+    Сохранение журнала целиком: оценки пишутся upsert'ом по натуральному
+    ключу (student_id, sprint, assignment) — несколько SQL на весь запрос.
+    Элемент с id, у которого поменялся ключ, переносится UPDATE по id.
+    """
+    ids = {item.id for item in grades if item.id}
+    existing = {
+        grade_id: (student_id, sprint, assignment, score)
+        for grade_id, student_id, sprint, assignment, score in (
+            db.query(Grade.id, Grade.student_id, Grade.sprint, Grade.assignment, Grade.score)
+            .filter(Grade.id.in_(ids))
+        )
+    } if ids else {}
+    missing = ids - existing.keys()
+    if missing:
+        raise HTTPException(404, f"Grade {min(missing)} not found")
 
-    for item in grades:
-        grade_id = item.id
+    touched_students: set[int] = {student_id for student_id, _, _, _ in existing.values()}
+    moved: list[dict] = []
+    upserts: list[dict] = []
 
-        if grade_id:
-            grade = db.query(Grade).get(grade_id)
-            if not grade:
-                raise HTTPException(404, f"Grade {grade_id} not found")
+    for item in grades:
+        touched_students.add(item.studentId)
+        row = {
+            "student_id": item.studentId,
+            "sprint": item.sprint,
+            "assignment": item.assignment,
+            "score": item.score,
+        }
+        key = grade_key(item.studentId, item.sprint, item.assignment)
+        if item.id and grade_key(*existing[item.id][:3]) != key:
+            moved.append({"id": item.id, **row})
         else:
-            grade = Grade()
-            db.add(grade)
+            upserts.append(row)
 
-        grade.student_id = item.studentId
-        grade.sprint = item.sprint
-        grade.assignment = item.assignment.value
-        grade.score = item.score
+    if moved:
+        try:
+            db.execute(update(Grade), moved)
+        except IntegrityError:
+            db.rollback()
+            raise HTTPException(409, "Grade for this student, sprint and assignment already exists")
 
-        result.append(grade)
+    previous = grade_scores(
+        db, [grade_key(row["student_id"], row["sprint"], row["assignment"]) for row in upserts]
+    )
+    upserted = upsert_grade_rows(db, upserts)
 
+    # ключ -> (id, score) сохранённой строки
+    saved = {key: (row.id, row.score) for key, row in upserted.items()}
+    for row in moved:
+        saved[grade_key(row["student_id"], row["sprint"], row["assignment"])] = (row["id"], row["score"])
+
+    apply_grade_stat_deltas(
+        db,
+        STUDENT_SCOPE,
+        removed=[(sprint, letter, score) for (_, sprint, letter), score in previous.items()]
+        + [existing[row["id"]][1:] for row in moved],
+        added=[(row.sprint, row.assignment, row.score) for row in upserted.values()]
+        + [(row["sprint"], row["assignment"], row["score"]) for row in moved],
+    )
+
+    invalidate_students(db, touched_students)
     db.commit()
-    for g in result:
-        db.refresh(g)
 
-    return [
-        GradeRead(
-            id=g.id,
-            studentId=g.student_id,
-            sprint=g.sprint,
-            assignment=g.assignment,
-            score=g.score,
+    result = []
+    for item in grades:
+        grade_id, score = saved[grade_key(item.studentId, item.sprint, item.assignment)]
+        result.append(
+            GradeRead(
+                id=grade_id,
+                studentId=item.studentId,
+                sprint=item.sprint,
+                assignment=item.assignment,
+                score=score,
+            )
         )
-        for g in result
-    ]
+    return result
+
+@router.post("/fan-out", response_model=TeamGradeFanOutRead)
+def fan_out_grades(
+    fan_out: TeamGradeFanOut,
+    db: Session = Depends(get_db),
+    _: User = Depends(require_instructor),
+):
+    """
+    Командные оценки проекта за спринт -> оценки каждого участника одним
+    INSERT ... SELECT по натуральному ключу. Повторный вызов идемпотентен,
+    overrides перекрывают командный балл для отдельных студентов.
+    """
+    try:
+        result = fan_out_team_grades(
+            db,
+            fan_out.projectId,
+            fan_out.sprint,
+            [(o.studentId, o.assignment, o.score) for o in fan_out.overrides],
+        )
+    except FanOutError as exc:
+        raise HTTPException(400, str(exc))
+    db.commit()
+    return TeamGradeFanOutRead(**vars(result))
+
 
 @router.post("/", response_model=None, status_code=204)
 def save_grades_legacy(
@@ -0,0 +1,39 @@
+import json
+
+from fastapi import APIRouter, Depends, HTTPException
+from sqlalchemy.orm import Session
+
+from app.core.db import get_db
+from app.core.security import require_instructor
+from app.models.job import Job
+from app.models.user import User
+from app.schemas.job import JobRead
+
+router = APIRouter()
+
+
+@router.get("/{job_id}", response_model=JobRead)
+def get_job(
+    job_id: int,
+    db: Session = Depends(get_db),
+    _: User = Depends(require_instructor),
+):
+    """
+    Статус фоновой задачи — фронт опрашивает его после 202 / X-Job-Id.
+    Задачи ставят только инструкторские эндпоинты, а в result/error бывают
+    данные экспорта — студентам статус не отдаём.
+    """
+    job = db.get(Job, job_id)
+    if not job:
+        raise HTTPException(404, "Job not found")
+    return JobRead(
+        id=job.id,
+        kind=job.kind,
+        status=job.status,
+        attempts=job.attempts,
+        max_attempts=job.max_attempts,
+        result=json.loads(job.result) if job.result else None,
+        error=job.error,
+        created_at=job.created_at,
+        finished_at=job.finished_at,
+    )
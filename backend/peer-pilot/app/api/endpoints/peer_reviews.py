@@ -1,28 +1,58 @@
 import logging
 from typing import List, Optional
 
-from fastapi import APIRouter, Depends, HTTPException, UploadFile, File, Form
-from fastapi.responses import FileResponse
-from sqlalchemy.orm import Session
+from fastapi import APIRouter, Depends, HTTPException, Request, Response, UploadFile, File, Form
+from fastapi.responses import StreamingResponse
+from sqlalchemy import func, update
+from sqlalchemy.orm import Session, selectinload
+from starlette.concurrency import run_in_threadpool
 from pathlib import Path
 import json
-import zipfile
-import io
 from datetime import datetime
 
+from app.api.fieldsets import (
+    PEER_REVIEW,
+    FieldSet,
+    fieldset_params,
+    serialize,
+    sparse_query,
+    sparse_response,
+    validate_fieldset,
+)
+from app.api.normalized import EntityMap, ResponseFormat, format_param, normalized_response
+from app.api.pagination import Page, page_params, paginate
+from app.core.config import app_settings
 from app.core.db import get_db
 from app.core.security import get_current_user, require_instructor, require_student
 from app.models.student import Student
 from app.models.user import User, UserRole
 from app.models.peer_review import PeerReview, PeerReviewStatus
+from app.models.suggested_grade import SuggestedGrade
 from app.models.team import Team
 from app.schemas.peer_review import (
     PeerReviewRead,
     PeerReviewCreate,
     PeerReviewUpdate,
+    PeerReviewBulkUpdate,
+    PeerReviewBulkResult,
     ApiPeerReviewRead,
     ReportLinkUpdate,
+    SuggestedGradeSummary,
+)
+from app.services.dashboard_snapshots import invalidate_teams
+from app.services.archives import (
+    drop_stale_sprint_archive,
+    read_manifest,
+    refresh_sprint_archive,
+    sprint_archive_path,
+    sprint_entry_name,
+    stream_zip,
 )
+from app.services.downloads import conditional_file_response
+from app.services import blob_store
+from app.services.jobs import enqueue, job_handler, notify_workers
+from app.services.suggested_grades import clear_suggested_grades, project_suggested_grades
+from app.services.uploads import UploadTooLargeError
 
 UPLOAD_DIR = Path("data/uploads")
 UPLOAD_DIR.mkdir(parents=True, exist_ok=True)
@@ -51,6 +81,7 @@ def update_report_link(
         raise HTTPException(status_code=404, detail="Peer review not found")
 
     pr.reviewed_team_report_link = data.reportLink
+    invalidate_teams(db, [pr.reviewing_team_id, pr.reviewed_team_id])
     db.commit()
     return
 
@@ -58,12 +89,22 @@ def update_report_link(
 
 @router.get("/", response_model=List[ApiPeerReviewRead])
 def list_peer_reviews(
+    request: Request,
+    response: Response,
     sprint: Optional[int] = None,
     reviewing_team_id: Optional[int] = None,
+    page: Page = Depends(page_params),
+    fs: FieldSet = Depends(fieldset_params),
+    fmt: ResponseFormat = Depends(format_param),
     db: Session = Depends(get_db),
     current_user: User = Depends(get_current_user),
 ):
     query = db.query(PeerReview)
+    normalized = fmt == "normalized"
+    if normalized:
+        # команды уходят в entities; fields по-прежнему сужает поля самих ревью
+        review_fields = FieldSet(fields=fs.fields, sparse=True)
+        validate_fieldset(PEER_REVIEW, review_fields)
 
     if current_user.role == UserRole.STUDENT:
         # 1. Находим студента, привязанного к этому пользователю
@@ -90,25 +131,100 @@ def list_peer_reviews(
         if reviewing_team_id is not None:
             query = query.filter(PeerReview.reviewing_team_id == reviewing_team_id)
 
-    reviews = query.all()
-
-    if current_user.role == UserRole.STUDENT:
-        for pr in reviews:
-            mirror = (
-                db.query(PeerReview)
-                .filter(
-                    PeerReview.sprint == pr.sprint,
-                    PeerReview.reviewing_team_id == pr.reviewed_team_id,  # команда напротив — reviewer
-                )
-                .first()
+    if fs.sparse and not normalized:
+        # sprint / reviewed_team_id нужны для подстановки зеркальных ссылок ниже
+        query = sparse_query(query, PEER_REVIEW, fs, always=("sprint", "reviewed_team_id"))
+    else:
+        query = query.options(
+            selectinload(PeerReview.reviewing_team).selectinload(Team.students),
+            selectinload(PeerReview.reviewed_team).selectinload(Team.students),
+        )
+    reviews = paginate(query, PeerReview.id, page, request, response)
+
+    if current_user.role == UserRole.STUDENT and reviews:
+        # все "зеркальные" ревью (команда напротив — reviewer) одним запросом
+        mirror_rows = (
+            db.query(
+                PeerReview.sprint,
+                PeerReview.reviewing_team_id,
+                PeerReview.reviewed_team_report_link,
             )
+            .filter(
+                PeerReview.sprint.in_({pr.sprint for pr in reviews}),
+                PeerReview.reviewing_team_id.in_({pr.reviewed_team_id for pr in reviews}),
+            )
+            .order_by(PeerReview.id)
+            .all()
+        )
+        mirror_links: dict[tuple[int, int], str | None] = {}
+        for sprint_, reviewing_id, link in mirror_rows:
+            mirror_links.setdefault((sprint_, reviewing_id), link)
 
-            if mirror and mirror.reviewed_team_report_link:
+        for pr in reviews:
+            link = mirror_links.get((pr.sprint, pr.reviewed_team_id))
+            if link:
                 # подменяем ТОЛЬКО в ответе (commit не делаем)
-                pr.reviewed_team_report_link = mirror.reviewed_team_report_link
+                pr.reviewed_team_report_link = link
+    if normalized:
+        entities = EntityMap()
+        data = []
+        for pr in reviews:
+            entities.team(pr.reviewing_team)
+            entities.team(pr.reviewed_team)
+            data.append(serialize(pr, PEER_REVIEW, review_fields))
+        return normalized_response(data, entities, response)
+    if fs.sparse:
+        return sparse_response([serialize(pr, PEER_REVIEW, fs) for pr in reviews], response)
     return reviews
 
 
+@router.get("/suggested-grades/summary", response_model=List[SuggestedGradeSummary])
+def suggested_grades_summary(
+    sprint: Optional[int] = None,
+    db: Session = Depends(get_db),
+    _: User = Depends(require_instructor),
+):
+    """Средняя предложенная оценка по проверяемой команде, спринту и букве."""
+    query = (
+        db.query(
+            PeerReview.sprint,
+            PeerReview.reviewed_team_id,
+            SuggestedGrade.assignment,
+            func.avg(SuggestedGrade.score),
+            func.count(SuggestedGrade.id),
+        )
+        .join(PeerReview, PeerReview.id == SuggestedGrade.peer_review_id)
+        .group_by(PeerReview.sprint, PeerReview.reviewed_team_id, SuggestedGrade.assignment)
+        .order_by(PeerReview.sprint, PeerReview.reviewed_team_id, SuggestedGrade.assignment)
+    )
+    if sprint is not None:
+        query = query.filter(PeerReview.sprint == sprint)
+
+    return [
+        SuggestedGradeSummary(
+            sprint=row_sprint,
+            team_id=team_id,
+            assignment=assignment,
+            avg_score=float(avg_score),
+            count=count,
+        )
+        for row_sprint, team_id, assignment, avg_score, count in query
+    ]
+
+
+@router.post("/suggested-grades/rebuild", status_code=202)
+def rebuild_suggested_grades_projection(
+    db: Session = Depends(get_db),
+    _: User = Depends(require_instructor),
+):
+    """Пересобирает таблицу suggested_grades из JSON фоновой задачей (бэкфилл)."""
+    job = enqueue(db, "rebuild_suggested_grades", dedupe_key="all")
+    job_id = job.id
+    db.commit()
+    notify_workers()
+    return {"jobId": job_id}
+
+
 @router.post("/", response_model=PeerReviewRead)
 def create_peer_review(
     data: PeerReviewCreate,
@@ -135,11 +251,96 @@ def create_peer_review(
         review_grade=data.reviewGrade,
     )
     db.add(pr)
+    db.flush()
+    project_suggested_grades(db, {pr.id: pr.suggested_grades})
+    invalidate_teams(db, [pr.reviewing_team_id, pr.reviewed_team_id])
     db.commit()
     db.refresh(pr)
     return pr
 
 
+# camelCase поля PeerReviewUpdate -> колонки PeerReview
+UPDATE_FIELD_TO_ATTR = {
+    "sprint": "sprint",
+    "reviewingTeamId": "reviewing_team_id",
+    "reviewedTeamId": "reviewed_team_id",
+    "reviewedTeamReportLink": "reviewed_team_report_link",
+    "submittedAt": "submitted_at",
+    "dueDate": "due_date",
+    "assignedWork": "assigned_work",
+    "suggestedGrades": "suggested_grades",
+    "reviewGrade": "review_grade",
+}
+NOT_NULL_ATTRS = ("sprint", "reviewing_team_id", "reviewed_team_id")
+
+
+@router.patch("/bulk", response_model=List[PeerReviewBulkResult])
+def bulk_update_peer_reviews(
+    items: List[PeerReviewBulkUpdate],
+    db: Session = Depends(get_db),
+    _: User = Depends(require_instructor),
+):
+    """
+    Массовое выставление review_grade / правка полей ревью за одну транзакцию.
+    Элементы с одинаковым набором полей пишутся одним UPDATE (executemany по id).
+    status и ссылки на PDF здесь не меняются — они считаются из загрузок.
+    """
+    ids = {item.id for item in items}
+    existing = {
+        review_id: (reviewing_id, reviewed_id)
+        for review_id, reviewing_id, reviewed_id in (
+            db.query(PeerReview.id, PeerReview.reviewing_team_id, PeerReview.reviewed_team_id)
+            .filter(PeerReview.id.in_(ids))
+        )
+    } if ids else {}
+
+    team_refs = {
+        v for item in items for v in (item.reviewingTeamId, item.reviewedTeamId) if v is not None
+    }
+    known_teams = (
+        {tid for (tid,) in db.query(Team.id).filter(Team.id.in_(team_refs))} if team_refs else set()
+    )
+
+    results: list[PeerReviewBulkResult] = []
+    groups: dict[tuple[str, ...], list[dict]] = {}
+    touched_teams: set[int] = set()
+    suggested: dict[int, Optional[dict]] = {}
+
+    for item in items:
+        if item.id not in existing:
+            results.append(PeerReviewBulkResult(id=item.id, ok=False, error="Peer review not found"))
+            continue
+
+        values = {
+            UPDATE_FIELD_TO_ATTR[field]: value
+            for field, value in item.model_dump(exclude_unset=True).items()
+            if field in UPDATE_FIELD_TO_ATTR
+        }
+        if any(attr in values and values[attr] is None for attr in NOT_NULL_ATTRS):
+            results.append(PeerReviewBulkResult(id=item.id, ok=False, error="Required field is null"))
+            continue
+        new_teams = {values[a] for a in ("reviewing_team_id", "reviewed_team_id") if a in values}
+        if not new_teams <= known_teams:
+            results.append(PeerReviewBulkResult(id=item.id, ok=False, error="Invalid team ids"))
+            continue
+
+        if values:
+            groups.setdefault(tuple(sorted(values)), []).append({"id": item.id, **values})
+            if "suggested_grades" in values:
+                suggested[item.id] = values["suggested_grades"]
+            touched_teams.update(existing[item.id])
+            touched_teams.update(new_teams)
+        results.append(PeerReviewBulkResult(id=item.id, ok=True))
+
+    for rows in groups.values():
+        db.execute(update(PeerReview), rows)
+    project_suggested_grades(db, suggested)
+
+    invalidate_teams(db, touched_teams)
+    db.commit()
+    return results
+
+
 @router.put("/{review_id}", response_model=PeerReviewRead)
 def update_peer_review(
     review_id: int,
@@ -150,21 +351,18 @@ def update_peer_review(
     if not pr:
         raise HTTPException(404, "Peer review not found")
 
+    # старые команды тоже — если ревью перевесили на другую пару
+    invalidate_teams(db, [pr.reviewing_team_id, pr.reviewed_team_id])
+
     for field, value in data.model_dump(exclude_unset=True).items():
         if field == "status":
             continue
-        attr = {
-            "reviewingTeamId": "reviewing_team_id",
-            "reviewedTeamId": "reviewed_team_id",
-            "reviewedTeamReportLink": "reviewed_team_report_link",
-            "submittedAt": "submitted_at",
-            "dueDate": "due_date",
-            "assignedWork": "assigned_work",
-            "suggestedGrades": "suggested_grades",
-            "reviewGrade": "review_grade",
-        }.get(field, field)
+        attr = UPDATE_FIELD_TO_ATTR.get(field, field)
         setattr(pr, attr, value)
+        if attr == "suggested_grades":
+            project_suggested_grades(db, {pr.id: value})
 
+    invalidate_teams(db, [pr.reviewing_team_id, pr.reviewed_team_id])
     db.commit()
     db.refresh(pr)
     return pr
@@ -191,24 +389,28 @@ def delete_review_file(
         path_str = pr.summary_pdf_link
         pr.summary_pdf_link = None
         pr.suggested_grades = None
+        clear_suggested_grades(db, [pr.id])
     pr.status = PeerReviewStatus.PENDING
 
-    # если ссылку вообще не хранили — просто 204
-    if path_str:
-        path = Path(path_str)
-        if path.exists():
-            try:
-                path.unlink()
-            except OSError:
-                # не критично — просто логируем/игнорим
-                pass
+    # если ссылку вообще не хранили — просто 204;
+    # blob удаляется только когда на него не осталось ссылок
+    released = blob_store.release(db, UPLOAD_DIR, path_str)
 
     # если оба файла отсутствуют — откатываем статус
     if not pr.comments_pdf_link and not pr.summary_pdf_link:
         pr.status = PeerReviewStatus.PENDING
         pr.submitted_at = None
 
+    invalidate_teams(db, [pr.reviewing_team_id, pr.reviewed_team_id])
+    if path_str:
+        _enqueue_sprint_archive(db, pr.sprint)
     db.commit()
+    blob_store.unlink_released(db, UPLOAD_DIR, [released])
+    if path_str:
+        drop_stale_sprint_archive(
+            UPLOAD_DIR, pr.sprint, sprint_entry_name(pr.sprint, pr.id, file_type), None
+        )
+        notify_workers()
     return
 
 
@@ -224,8 +426,72 @@ def _recompute_status(pr: PeerReview):
         pr.status = PeerReviewStatus.PENDING
         pr.submitted_at = None
 
+def _sprint_archive_entries(db: Session, sprint: int) -> dict[str, str]:
+    rows = (
+        db.query(PeerReview.id, PeerReview.summary_pdf_link, PeerReview.comments_pdf_link)
+        .filter(PeerReview.sprint == sprint)
+        .order_by(PeerReview.id)
+        .all()
+    )
+
+    entries: dict[str, str] = {}
+    for review_id, summary_link, comments_link in rows:
+        for label, path_str in [("summary", summary_link), ("comments", comments_link)]:
+            if not path_str or not Path(path_str).exists():
+                continue
+            entries[sprint_entry_name(sprint, review_id, label)] = path_str
+    return entries
+
+
+def _enqueue_sprint_archive(db: Session, sprint: int) -> None:
+    enqueue(db, "build_sprint_archive", {"sprint": sprint}, dedupe_key=f"sprint:{sprint}")
+
+
+@job_handler("build_sprint_archive")
+def build_sprint_archive_job(db: Session, payload: dict) -> dict:
+    sprint = payload["sprint"]
+    entries = _sprint_archive_entries(db, sprint)
+    refresh_sprint_archive(UPLOAD_DIR, sprint, entries)
+    return {"sprint": sprint, "files": len(entries)}
+
 # ---------- FILE UPLOAD ----------
 
+def _attach_review_file(
+    db: Session,
+    pr: PeerReview,
+    fileType: str,
+    dest: Path,
+    suggestedGrades: str | None,
+) -> Path | None:
+    """Привязывает файл к ревью и коммитит; возвращает освободившийся blob."""
+    # предыдущий файл этого типа больше не нужен этому ревью
+    if fileType == "comments":
+        released = blob_store.release(db, UPLOAD_DIR, pr.comments_pdf_link)
+        pr.comments_pdf_link = str(dest)
+    else:
+        released = blob_store.release(db, UPLOAD_DIR, pr.summary_pdf_link)
+        pr.summary_pdf_link = str(dest)
+        if suggestedGrades:
+            try:
+                pr.suggested_grades = json.loads(suggestedGrades)
+            except json.JSONDecodeError:
+                pass
+            else:
+                project_suggested_grades(db, {pr.id: pr.suggested_grades})
+
+    _recompute_status(pr)
+    invalidate_teams(db, [pr.reviewing_team_id, pr.reviewed_team_id])
+    _enqueue_sprint_archive(db, pr.sprint)
+    db.commit()
+    return released
+
+
+def _finish_review_file(db: Session, pr: PeerReview, released: Path | None) -> None:
+    # unlink ждёт flock blob'а — только в threadpool, не в event loop
+    blob_store.unlink_released(db, UPLOAD_DIR, [released])
+    db.refresh(pr)
+
+
 @router.post("/upload")
 async def upload_review_file(
     reviewId: int = Form(...),
@@ -238,37 +504,46 @@ async def upload_review_file(
     """
     POST /reviews/upload со стороны студента / инструктора.
     Фронт шлёт form-data: reviewId, fileType, file, suggestedGrades (json).
+    Синхронные шаги (SQL, блокировка blob) идут через run_in_threadpool.
     """
-    pr = db.query(PeerReview).get(reviewId)
+    pr = await run_in_threadpool(db.get, PeerReview, reviewId)
     if not pr:
         raise HTTPException(404, "Peer review not found")
 
-    # сохраняем файл
+    # сохраняем файл в content-addressed хранилище (blobs/<sha256>),
+    # одинаковые PDF хранятся один раз
     suffix = "comments" if fileType == "comments" else "summary"
-    filename = f"review_{reviewId}_{suffix}_{int(datetime.utcnow().timestamp())}.pdf"
-    dest = UPLOAD_DIR / filename
-
-    with dest.open("wb") as f:
-        content = await file.read()
-        f.write(content)
+    try:
+        stored = await blob_store.put_upload(
+            db,
+            file,
+            UPLOAD_DIR,
+            max_size=app_settings.MAX_UPLOAD_SIZE_MB * 1024 * 1024,
+        )
+    except UploadTooLargeError as e:
+        raise HTTPException(413, f"File is too large (limit {e.limit} bytes)")
+    dest = stored.path
 
     url_path = f"/peer-reviews/{reviewId}/download/{suffix}"
 
-    if fileType == "comments":
-        pr.comments_pdf_link = str(dest)
-    else:
-        pr.summary_pdf_link = str(dest)
-        if suggestedGrades:
-            try:
-                pr.suggested_grades = json.loads(suggestedGrades)
-            except json.JSONDecodeError:
-                pass
-    
-    _recompute_status(pr)
-    db.commit()
-    db.refresh(pr)
+    released = await run_in_threadpool(
+        _attach_review_file, db, pr, fileType, dest, suggestedGrades
+    )
+    await blob_store.ensure_stored(file, stored, UPLOAD_DIR)
+    await run_in_threadpool(_finish_review_file, db, pr, released)
+
+    # старая версия записи не должна попасть в скачивание; дописывает
+    # новую запись в готовый архив фоновая задача
+    await run_in_threadpool(
+        drop_stale_sprint_archive,
+        UPLOAD_DIR,
+        pr.sprint,
+        sprint_entry_name(pr.sprint, pr.id, suffix),
+        str(dest),
+    )
+    notify_workers()
 
-    return {"fileUrl": url_path}
+    return {"fileUrl": url_path, "sha256": stored.sha256, "size": stored.size}
 
 
 # ---------- FILE DOWNLOAD ----------
@@ -277,6 +552,8 @@ async def upload_review_file(
 def download_review_pdf(
     review_id: int,
     file_type: str,
+    request: Request,
+    inline: bool = False,
     db: Session = Depends(get_db),
     _: User = Depends(get_current_user),
 ):
@@ -297,35 +574,43 @@ def download_review_pdf(
     if not path.exists():
         raise HTTPException(404, "File missing on server")
 
-    return FileResponse(path, media_type="application/pdf", filename=path.name)
+    # ETag / 304 / Range — повторные просмотры командой не гоняют файл заново
+    return conditional_file_response(
+        request,
+        path,
+        filename=f"review_{review_id}_{file_type}.pdf",
+        media_type="application/pdf",
+        digest=blob_store.digest_of(UPLOAD_DIR, path_str),
+        inline=inline,
+    )
 
 
 @router.get("/{sprint}/download-all")
 def download_all_files_for_sprint(
     sprint: int,
+    request: Request,
     db: Session = Depends(get_db),
     _: User = Depends(require_instructor),
 ):
     """
     GET /sprints/{sprint}/download-all — zip всех файлов по спринту.
+    Если готовый архив совпадает с текущими файлами ревью — отдаём его
+    (с ETag / Range). Иначе архив стримится на лету, а готовая копия
+    пересобирается фоновой задачей: первый байт не ждёт сборки на диск.
     """
-    reviews = db.query(PeerReview).filter(PeerReview.sprint == sprint).all()
-    memfile = io.BytesIO()
+    entries = _sprint_archive_entries(db, sprint)
+    filename = f"sprint-{sprint}-peer-reviews.zip"
+    archive = sprint_archive_path(UPLOAD_DIR, sprint)
+    if read_manifest(archive) == entries:
+        return conditional_file_response(
+            request, archive, filename=filename, media_type="application/zip"
+        )
 
-    with zipfile.ZipFile(memfile, mode="w", compression=zipfile.ZIP_DEFLATED) as zf:
-        for pr in reviews:
-            for label, path_str in [("summary", pr.summary_pdf_link), ("comments", pr.comments_pdf_link)]:
-                if not path_str:
-                    continue
-                path = Path(path_str)
-                if not path.exists():
-                    continue
-                arcname = f"sprint_{sprint}/review_{pr.id}_{label}.pdf"
-                zf.write(path, arcname=arcname)
-
-    memfile.seek(0)
-    return FileResponse(
-        memfile,
+    _enqueue_sprint_archive(db, sprint)
+    db.commit()
+    notify_workers()
+    return StreamingResponse(
+        stream_zip([(name, Path(path)) for name, path in sorted(entries.items())]),
         media_type="application/zip",
-        filename=f"sprint-{sprint}-peer-reviews.zip",
+        headers={"Content-Disposition": f'attachment; filename="{filename}"'},
     )
@@ -2,9 +2,11 @@
 
 import random
 from typing import List
-from fastapi import APIRouter, Depends, HTTPException, Query
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, Response
 from sqlalchemy.orm import Session
 
+from app.api.fieldsets import PROJECT, FieldSet, fieldset_params, serialize, sparse_query, sparse_response
+from app.api.pagination import Page, page_params, paginate
 from app.core.db import get_db
 from app.core.security import require_instructor, require_student, get_current_user
 from app.models.project import Project
@@ -16,6 +18,7 @@ from app.schemas.project import (
     ProjectRead,
     ProjectTeamsAssignment,
 )
+from app.services.dashboard_snapshots import invalidate_all
 
 router = APIRouter()
 
@@ -57,6 +60,7 @@ def create_project(
         )
         db.add(team)
 
+    invalidate_all(db)
     db.commit()
     db.refresh(prj)
     return prj
@@ -64,24 +68,34 @@ def create_project(
 
 @router.get("/", response_model=List[ProjectRead])
 def list_projects(
+    request: Request,
+    response: Response,
+    page: Page = Depends(page_params),
+    fs: FieldSet = Depends(fieldset_params),
     db: Session = Depends(get_db),
     _: User = Depends(get_current_user),
 ):
-    # Важно: возвращаем проекты с командами и студентами
-    projects = db.query(Project).all()
-    return projects
+    # Важно: по умолчанию возвращаем проекты с командами и студентами
+    if not fs.sparse:
+        return paginate(db.query(Project), Project.id, page, request, response)
+    projects = paginate(sparse_query(db.query(Project), PROJECT, fs), Project.id, page, request, response)
+    return sparse_response([serialize(p, PROJECT, fs) for p in projects], response)
 
 
 @router.get("/{project_id}", response_model=ProjectRead)
 def get_project(
     project_id: int,
+    fs: FieldSet = Depends(fieldset_params),
     db: Session = Depends(get_db),
     _: User = Depends(get_current_user),
 ):
-    prj = db.query(Project).get(project_id)
+    query = db.query(Project)
+    if fs.sparse:
+        query = sparse_query(query, PROJECT, fs)
+    prj = query.filter(Project.id == project_id).first()
     if not prj:
         raise HTTPException(404, "Project not found")
-    return prj
+    return sparse_response(serialize(prj, PROJECT, fs)) if fs.sparse else prj
 
 
 @router.post("/{project_id}/assign-teams", response_model=ProjectRead)
@@ -113,6 +127,7 @@ def assign_teams_to_project(
             student.team_id = team.id
             student.is_rep = s_def.isRep
 
+    invalidate_all(db)
     db.commit()
     db.refresh(prj)
     return prj
@@ -178,5 +193,6 @@ def join_team(
     student.team_id = team.id
     student.is_rep = as_rep
 
+    invalidate_all(db)
     db.commit()
     return
@@ -1,27 +1,47 @@
 from typing import List
 
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, HTTPException, Request, Response, status
 from sqlalchemy.orm import Session
 
+from app.api.fieldsets import STUDENT, FieldSet, fieldset_params, serialize, sparse_query, sparse_response
+from app.api.pagination import Page, page_params, paginate
 from app.core.db import get_db
+from app.models.grade import Grade
 from app.models.student import Student
 from app.schemas.student import StudentRead, StudentCreate, StudentUpdate
+from app.services.dashboard_snapshots import invalidate_all
+from app.services.grade_stats import STUDENT_SCOPE, apply_grade_stat_deltas
 
 router = APIRouter()
 
 
 @router.get("/", response_model=List[StudentRead])
-def list_students(db: Session = Depends(get_db)):
-    students = db.query(Student).all()
-    return students
+def list_students(
+    request: Request,
+    response: Response,
+    page: Page = Depends(page_params),
+    fs: FieldSet = Depends(fieldset_params),
+    db: Session = Depends(get_db),
+):
+    if not fs.sparse:
+        return paginate(db.query(Student), Student.id, page, request, response)
+    students = paginate(sparse_query(db.query(Student), STUDENT, fs), Student.id, page, request, response)
+    return sparse_response([serialize(s, STUDENT, fs) for s in students], response)
 
 
 @router.get("/{student_id}", response_model=StudentRead)
-def get_student(student_id: int, db: Session = Depends(get_db)):
-    student = db.query(Student).filter(Student.id == student_id).first()
+def get_student(
+    student_id: int,
+    fs: FieldSet = Depends(fieldset_params),
+    db: Session = Depends(get_db),
+):
+    query = db.query(Student)
+    if fs.sparse:
+        query = sparse_query(query, STUDENT, fs)
+    student = query.filter(Student.id == student_id).first()
     if not student:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Student not found")
-    return student
+    return sparse_response(serialize(student, STUDENT, fs)) if fs.sparse else student
 
 
 @router.post("/", response_model=StudentRead, status_code=status.HTTP_201_CREATED)
@@ -32,6 +52,7 @@ def create_student(student_in: StudentCreate, db: Session = Depends(get_db)):
         team_id=student_in.team_id,
     )
     db.add(student)
+    invalidate_all(db)
     db.commit()
     db.refresh(student)
     return student
@@ -51,6 +72,7 @@ def update_student(student_id: int, student_in: StudentUpdate, db: Session = Dep
     if student_in.team_id is not None:
         student.team_id = student_in.team_id
 
+    invalidate_all(db)
     db.commit()
     db.refresh(student)
     return student
@@ -61,6 +83,15 @@ def delete_student(student_id: int, db: Session = Depends(get_db)):
     student = db.query(Student).filter(Student.id == student_id).first()
     if not student:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Student not found")
+    # оценки уходят каскадом вместе со студентом — вычитаем их из статистики
+    apply_grade_stat_deltas(
+        db,
+        STUDENT_SCOPE,
+        removed=db.query(Grade.sprint, Grade.assignment, Grade.score)
+        .filter(Grade.student_id == student_id)
+        .all(),
+    )
     db.delete(student)
+    invalidate_all(db)
     db.commit()
     return None
@@ -1,19 +1,24 @@
 from typing import List, Optional
 
-from fastapi import APIRouter, Depends
+from fastapi import APIRouter, Depends, Request, Response
 from sqlalchemy.orm import Session
 
+from app.api.pagination import Page, page_params, paginate
 from app.core.db import get_db
 from app.models.team_grade import TeamGrade
 from app.schemas.team_grade import TeamGradeRead, TeamGradeCreate, TeamGradeUpdate
+from app.services.grade_stats import TEAM_SCOPE, apply_grade_stat_deltas
 
 router = APIRouter()
 
 
 @router.get("/", response_model=List[TeamGradeRead])
 def list_team_grades(
+    request: Request,
+    response: Response,
     team_id: Optional[int] = None,
     sprint: Optional[int] = None,
+    page: Page = Depends(page_params),
     db: Session = Depends(get_db),
 ):
     query = db.query(TeamGrade)
@@ -21,7 +26,7 @@ def list_team_grades(
         query = query.filter(TeamGrade.team_id == team_id)
     if sprint is not None:
         query = query.filter(TeamGrade.sprint == sprint)
-    return query.all()
+    return paginate(query, TeamGrade.id, page, request, response)
 
 
 @router.post("/", response_model=TeamGradeRead)
@@ -34,6 +39,9 @@ def create_team_grade(team_grade_in: TeamGradeCreate, db: Session = Depends(get_
         comments=team_grade_in.comments,
     )
     db.add(team_grade)
+    apply_grade_stat_deltas(
+        db, TEAM_SCOPE, added=[(team_grade.sprint, team_grade.assignment, team_grade.score)]
+    )
     db.commit()
     db.refresh(team_grade)
     return team_grade
@@ -44,6 +52,7 @@ def update_team_grade(team_grade_id: int, team_grade_in: TeamGradeUpdate, db: Se
     team_grade = db.query(TeamGrade).filter(TeamGrade.id == team_grade_id).first()
     if not team_grade:
         return None
+    before = (team_grade.sprint, team_grade.assignment, team_grade.score)
 
     if team_grade_in.sprint is not None:
         team_grade.sprint = team_grade_in.sprint
@@ -54,6 +63,12 @@ def update_team_grade(team_grade_id: int, team_grade_in: TeamGradeUpdate, db: Se
     if team_grade_in.comments is not None:
         team_grade.comments = team_grade_in.comments
 
+    apply_grade_stat_deltas(
+        db,
+        TEAM_SCOPE,
+        removed=[before],
+        added=[(team_grade.sprint, team_grade.assignment, team_grade.score)],
+    )
     db.commit()
     db.refresh(team_grade)
     return team_grade
@@ -64,6 +79,9 @@ def delete_team_grade(team_grade_id: int, db: Session = Depends(get_db)):
     team_grade = db.query(TeamGrade).filter(TeamGrade.id == team_grade_id).first()
     if not team_grade:
         return {"deleted": False}
+    apply_grade_stat_deltas(
+        db, TEAM_SCOPE, removed=[(team_grade.sprint, team_grade.assignment, team_grade.score)]
+    )
     db.delete(team_grade)
     db.commit()
     return {"deleted": True}
@@ -1,38 +1,60 @@
 import random
 from typing import List, Optional
-from fastapi import APIRouter, Depends, HTTPException
-from sqlalchemy import or_
+from fastapi import APIRouter, Depends, HTTPException, Request, Response
+from sqlalchemy import func, insert, or_
 from sqlalchemy.orm import Session
 
+from app.api.fieldsets import TEAM, FieldSet, fieldset_params, serialize, sparse_query, sparse_response
+from app.api.endpoints import peer_reviews
+from app.api.pagination import Page, page_params, paginate
+from app.core.config import app_settings
 from app.core.db import get_db
 from app.core.security import require_instructor, require_student, get_current_user
 from app.models.peer_review import PeerReview, PeerReviewStatus
 from app.models.team import Team
 from app.models.student import Student
+from app.models.suggested_grade import SuggestedGrade
+from app.models.team_grade import TeamGrade
 from app.models.user import User
 from app.schemas.team import TeamCreate, TeamRead, TeamUpdate
+from app.services import blob_store
+from app.services.dashboard_snapshots import invalidate_all
+from app.services.grade_stats import TEAM_SCOPE, apply_grade_stat_deltas
+from app.services.jobs import enqueue, job_handler, notify_workers
+from app.services.pairing import get_pairing_engine
 
 router = APIRouter()
 
 
 @router.get("/", response_model=List[TeamRead])
 def list_teams(
+    request: Request,
+    response: Response,
+    page: Page = Depends(page_params),
+    fs: FieldSet = Depends(fieldset_params),
     db: Session = Depends(get_db),
     _: User = Depends(get_current_user),
 ):
-    return db.query(Team).all()
+    if not fs.sparse:
+        return paginate(db.query(Team), Team.id, page, request, response)
+    teams = paginate(sparse_query(db.query(Team), TEAM, fs), Team.id, page, request, response)
+    return sparse_response([serialize(t, TEAM, fs) for t in teams], response)
 
 
 @router.get("/{team_id}", response_model=TeamRead)
 def get_team(
     team_id: int,
+    fs: FieldSet = Depends(fieldset_params),
     db: Session = Depends(get_db),
     _: User = Depends(get_current_user),
 ):
-    team = db.query(Team).get(team_id)
+    query = db.query(Team)
+    if fs.sparse:
+        query = sparse_query(query, TEAM, fs)
+    team = query.filter(Team.id == team_id).first()
     if not team:
         raise HTTPException(404, "Team not found")
-    return team
+    return sparse_response(serialize(team, TEAM, fs)) if fs.sparse else team
 
 
 @router.post("/", response_model=TeamRead)
@@ -48,6 +70,7 @@ def create_team(
         project_id=data.projectId,
     )
     db.add(team)
+    invalidate_all(db)
     db.commit()
     db.refresh(team)
     return team
@@ -56,9 +79,15 @@ def create_team(
 TOTAL_SPRINTS = 8
 
 
-def maybe_generate_peer_reviews_for_project(db: Session, project_id: int) -> None:
-    teams: List[Team] = (
-        db.query(Team)
+def maybe_generate_peer_reviews_for_project(db: Session, project_id: Optional[int]) -> None:
+    # только команды этого проекта, размер состава — одним агрегатным запросом
+    teams = (
+        db.query(Team.id, Team.is_locked, func.count(Student.id))
+        .outerjoin(Student, Student.team_id == Team.id)
+        .filter(
+            Team.project_id == project_id if project_id is not None else Team.project_id.is_(None)
+        )
+        .group_by(Team.id, Team.is_locked)
         .order_by(Team.id)
         .all()
     )
@@ -68,67 +97,89 @@ def maybe_generate_peer_reviews_for_project(db: Session, project_id: int) -> Non
         return
 
     # Если есть хотя бы одна незалоченная команда — ещё рано
-    if any(not t.is_locked for t in teams):
+    if any(not is_locked for _, is_locked, _ in teams):
         return
-    
-    non_empty_teams: List[Team] = []
-    for t in teams:
-        # считаем, что есть relationship Team.students
-        if t.is_locked and (not t.students or len(t.students) == 0):
-            db.delete(t)
-        else:
-            non_empty_teams.append(t)
 
-    db.flush()
-
-    if len(non_empty_teams) < 2:
-        db.commit()
-        return
+    all_ids = [team_id for team_id, _, _ in teams]
+    team_ids = [team_id for team_id, _, size in teams if size > 0]
+    empty_ids = [team_id for team_id, _, size in teams if size == 0]
 
-    team_ids = [t.id for t in non_empty_teams]
-
-    # 1. Сносим все старые ревью по этому проекту
-    db.query(PeerReview).filter(
+    # 1. Сносим все старые ревью по этому проекту (включая пустые команды)
+    old_reviews = db.query(PeerReview.id).filter(
         or_(
-            PeerReview.reviewing_team_id.in_(team_ids),
-            PeerReview.reviewed_team_id.in_(team_ids),
+            PeerReview.reviewing_team_id.in_(all_ids),
+            PeerReview.reviewed_team_id.in_(all_ids),
         )
+    )
+    # загруженные к ним PDF — снимаем ссылки на blob'ы в той же транзакции
+    released = [
+        blob_store.release(db, peer_reviews.UPLOAD_DIR, link)
+        for links in db.query(PeerReview.summary_pdf_link, PeerReview.comments_pdf_link).filter(
+            PeerReview.id.in_(old_reviews.scalar_subquery())
+        )
+        for link in links
+        if link
+    ]
+    db.query(SuggestedGrade).filter(
+        SuggestedGrade.peer_review_id.in_(old_reviews.scalar_subquery())
+    ).delete(synchronize_session=False)
+    db.query(PeerReview).filter(
+        PeerReview.id.in_(old_reviews.scalar_subquery())
     ).delete(synchronize_session=False)
 
-    # 2. Генерируем новые ревью на все спринты
-    n = len(non_empty_teams)
-    sprints = list(range(1, TOTAL_SPRINTS + 1))
-
-    for sprint in sprints:
-        # shift от 1 до n-1, чтобы не было self-review
-        shift = (sprint % (n - 1)) + 1 if n > 1 else 0
-
-        for idx, reviewing_team in enumerate(non_empty_teams):
-            reviewed_team = non_empty_teams[(idx + shift) % n]
-
-            review = PeerReview(
-                sprint=sprint,
-                reviewing_team_id=reviewing_team.id,
-                reviewed_team_id=reviewed_team.id,
-                status=PeerReviewStatus.PENDING,
-                reviewed_team_report_link=None,
-                summary_pdf_link=None,
-                comments_pdf_link=None,
-                submitted_at=None,
-                due_date=None,
-                assigned_work=None,
-                suggested_grades=None,
-                review_grade=None,
-            )
-            db.add(review)
+    # 2. Пустые залоченные команды удаляем bulk DELETE'ами; каскадов ORM
+    # при этом нет, поэтому зависимые строки убираем явно
+    if empty_ids:
+        _delete_teams(db, empty_ids)
+
+    # 3. Генерируем новые ревью на все спринты — один bulk INSERT
+    if len(team_ids) >= 2:
+        engine = get_pairing_engine(app_settings.PEER_REVIEW_PAIRING)
+        db.execute(
+            insert(PeerReview),
+            [
+                {
+                    "sprint": sprint,
+                    "reviewing_team_id": reviewing_id,
+                    "reviewed_team_id": reviewed_id,
+                    "status": PeerReviewStatus.PENDING,
+                }
+                for sprint, reviewing_id, reviewed_id in engine.generate(team_ids, TOTAL_SPRINTS)
+            ],
+        )
 
+    # новое расписание видно в дашбордах — сбрасываем их в той же транзакции
+    invalidate_all(db)
     db.commit()
+    blob_store.unlink_released(db, peer_reviews.UPLOAD_DIR, released)
+
+
+def _delete_teams(db: Session, team_ids: List[int]) -> None:
+    """Команды без ревью и студентов: их командные оценки (и вклад в grade_stats) и ссылки пользователей."""
+    apply_grade_stat_deltas(
+        db,
+        TEAM_SCOPE,
+        removed=db.query(TeamGrade.sprint, TeamGrade.assignment, TeamGrade.score)
+        .filter(TeamGrade.team_id.in_(team_ids))
+        .all(),
+    )
+    db.query(TeamGrade).filter(TeamGrade.team_id.in_(team_ids)).delete(synchronize_session=False)
+    db.query(User).filter(User.team_id.in_(team_ids)).update(
+        {User.team_id: None}, synchronize_session=False
+    )
+    db.query(Team).filter(Team.id.in_(team_ids)).delete(synchronize_session=False)
+
+
+@job_handler("regenerate_peer_reviews")
+def regenerate_peer_reviews_job(db: Session, payload: dict) -> None:
+    maybe_generate_peer_reviews_for_project(db, payload.get("project_id"))
 
 
 @router.patch("/{team_id}", response_model=TeamRead)
 def update_team(
     team_id: int,
     data: TeamUpdate,
+    response: Response,
     db: Session = Depends(get_db),
     current_user: User = Depends(get_current_user),
 ):
@@ -167,14 +218,25 @@ def update_team(
     # фиксируем изменения в сессии, чтобы следующий запрос видел актуальное is_locked
     db.flush()
 
-    # если команда только что стала залоченной (до этого не была)
+    # если команда только что стала залоченной (до этого не была) —
+    # генерация peer-reviews (если это был "последний lock") идёт фоновой задачей
+    job_id = None
     if not was_locked_before and team.is_locked:
-        # пробуем сгенерировать peer-reviews для проекта,
-        # если это был "последний lock"
-        maybe_generate_peer_reviews_for_project(db, project_id=team.project_id)
+        job_id = enqueue(
+            db,
+            "regenerate_peer_reviews",
+            {"project_id": team.project_id},
+            dedupe_key=f"project:{team.project_id}",
+        ).id
 
-    # окончательно сохраняем все изменения (и Team, и PeerReview)
+    invalidate_all(db)
+
+    # окончательно сохраняем изменения Team вместе с задачей
     db.commit()
     db.refresh(team)
 
+    if job_id is not None:
+        notify_workers()
+        response.headers["X-Job-Id"] = str(job_id)
+
     return team
\ No newline at end of file
@@ -0,0 +1,180 @@
+"""
+Разреженные ответы: ?fields= и ?include=.
+
+Без параметров эндпоинты отдают прежнюю полную форму (TeamRead со студентами,
+PeerReviewRead с двумя командами). Если передан fields или include:
+- fields=id,name — только эти скалярные поля верхнего уровня (имена как в JSON);
+- include=students / reviewingTeam.students — вложенные объекты, только
+  перечисленные (у вложенных — все скалярные поля).
+ORM грузит только запрошенные колонки (load_only) и связи (selectinload);
+всё остальное — raiseload, случайная ленивая загрузка сразу видна.
+"""
+from dataclasses import dataclass, field
+from typing import Any, Dict, Iterable, List, Optional, Set
+
+from fastapi import HTTPException, Query, Response
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import JSONResponse
+from sqlalchemy.orm import load_only, raiseload, selectinload
+
+from app.api.pagination import page_headers
+from app.models.peer_review import PeerReview
+from app.models.project import Project
+from app.models.student import Student
+from app.models.team import Team
+
+
+@dataclass
+class Resource:
+    model: Any
+    # имя в JSON -> атрибут ORM
+    scalars: Dict[str, str]
+    # имя в JSON -> (атрибут-связь ORM, ресурс, список или объект)
+    relations: Dict[str, tuple] = field(default_factory=dict)
+
+
+STUDENT = Resource(
+    Student,
+    {"id": "id", "name": "name", "email": "email", "teamId": "team_id", "isRep": "is_rep"},
+)
+TEAM = Resource(
+    Team,
+    {"id": "id", "name": "name", "color": "color", "isLocked": "is_locked", "projectId": "project_id"},
+    {"students": ("students", STUDENT, True)},
+)
+PROJECT = Resource(
+    Project,
+    {
+        "id": "id",
+        "name": "name",
+        "maxTeams": "max_teams",
+        "maxStudentsPerTeam": "max_students_per_team",
+    },
+    {"teams": ("teams", TEAM, True)},
+)
+PEER_REVIEW = Resource(
+    PeerReview,
+    {
+        "id": "id",
+        "sprint": "sprint",
+        "reviewingTeamId": "reviewing_team_id",
+        "reviewedTeamId": "reviewed_team_id",
+        "reviewedTeamReportLink": "reviewed_team_report_link",
+        "summaryPDFLink": "summary_pdf_link",
+        "commentsPDFLink": "comments_pdf_link",
+        "status": "status",
+        "submittedAt": "submitted_at",
+        "dueDate": "due_date",
+        "assignedWork": "assigned_work",
+        "suggestedGrades": "suggested_grades",
+        "reviewGrade": "review_grade",
+    },
+    {
+        "reviewingTeam": ("reviewing_team", TEAM, False),
+        "reviewedTeam": ("reviewed_team", TEAM, False),
+    },
+)
+
+
+def _split(value: Optional[str]) -> Optional[Set[str]]:
+    if value is None:
+        return None
+    return {part.strip() for part in value.split(",") if part.strip()}
+
+
+@dataclass
+class FieldSet:
+    fields: Optional[Set[str]] = None  # None — все скалярные поля
+    include: Set[str] = field(default_factory=set)
+    sparse: bool = False
+
+    def nested(self, name: str) -> "FieldSet":
+        prefix = name + "."
+        return FieldSet(
+            include={path[len(prefix):] for path in self.include if path.startswith(prefix)},
+            sparse=True,
+        )
+
+
+def fieldset_params(
+    fields: Optional[str] = Query(None, description="Скалярные поля через запятую, например id,name"),
+    include: Optional[str] = Query(None, description="Вложенные объекты, например students"),
+) -> FieldSet:
+    return FieldSet(
+        fields=_split(fields),
+        include=_split(include) or set(),
+        sparse=fields is not None or include is not None,
+    )
+
+
+def validate_fieldset(resource: Resource, fs: FieldSet) -> None:
+    unknown = sorted((fs.fields or set()) - resource.scalars.keys())
+    if unknown:
+        raise HTTPException(400, f"Unknown fields: {', '.join(unknown)}")
+    for path in fs.include:
+        current = resource
+        for part in path.split("."):
+            if part not in current.relations:
+                raise HTTPException(400, f"Unknown include: {path}")
+            current = current.relations[part][1]
+
+
+def _columns(resource: Resource, fs: FieldSet, always: Iterable[str]) -> List[str]:
+    names = fs.fields if fs.fields is not None else resource.scalars.keys()
+    attrs = {"id", *always, *(resource.scalars[name] for name in names)}
+    return sorted(attrs)
+
+
+def _top_includes(fs: FieldSet) -> Set[str]:
+    return {path.split(".", 1)[0] for path in fs.include}
+
+
+def loader_options(resource: Resource, fs: FieldSet, always: Iterable[str] = ()) -> list:
+    """load_only + selectinload по запросу; остальные связи — raiseload."""
+    always = set(always)
+    includes = _top_includes(fs)
+    for name in includes:
+        attr, related, many = resource.relations[name]
+        if not many:
+            # many-to-one: нужен внешний ключ (reviewing_team_id и т.п.)
+            always |= {col.key for col in getattr(resource.model, attr).property.local_columns}
+
+    options: list = [load_only(*(getattr(resource.model, a) for a in _columns(resource, fs, always)))]
+    for name in includes:
+        attr, related, many = resource.relations[name]
+        nested = fs.nested(name)
+        nested_always = set()
+        if many:
+            # обратный внешний ключ (students.team_id) нужен, чтобы разложить по родителям
+            nested_always = {col.key for col in getattr(resource.model, attr).property.remote_side}
+        options.append(
+            selectinload(getattr(resource.model, attr)).options(
+                *loader_options(related, nested, nested_always)
+            )
+        )
+    options.append(raiseload("*"))
+    return options
+
+
+def sparse_query(query, resource: Resource, fs: FieldSet, always: Iterable[str] = ()):
+    validate_fieldset(resource, fs)
+    return query.options(*loader_options(resource, fs, always))
+
+
+def serialize(obj: Any, resource: Resource, fs: FieldSet) -> Dict[str, Any]:
+    names = fs.fields if fs.fields is not None else resource.scalars.keys()
+    data = {name: getattr(obj, resource.scalars[name]) for name in resource.scalars if name in names}
+    for name in sorted(_top_includes(fs)):
+        attr, related, many = resource.relations[name]
+        value = getattr(obj, attr)
+        nested = fs.nested(name)
+        if many:
+            data[name] = [serialize(item, related, nested) for item in value]
+        else:
+            data[name] = serialize(value, related, nested) if value is not None else None
+    return data
+
+
+def sparse_response(content: Any, response: Optional[Response] = None) -> JSONResponse:
+    """JSONResponse в обход response_model; заголовки пагинации переносим."""
+    return JSONResponse(jsonable_encoder(content), headers=page_headers(response))
@@ -0,0 +1,68 @@
+"""
+Нормализованный формат ответа: ?format=normalized.
+
+Вместо вложенных копий команд и студентов — id-ссылки в data и каждая
+сущность ровно один раз в entities:
+
+    {"data": ..., "entities": {"teams": {"3": {..., "studentIds": [..]}},
+                               "students": {"7": {...}}}}
+
+Формат по умолчанию ("nested") не меняется.
+"""
+from typing import Any, Dict, Literal, Optional
+
+from fastapi import Query, Response
+from pydantic_core import to_json
+
+from app.api.fieldsets import STUDENT, TEAM, FieldSet, serialize
+from app.api.pagination import page_headers
+
+ResponseFormat = Literal["nested", "normalized"]
+
+# только скалярные поля — вложенность заменяется ссылками
+_SCALARS = FieldSet(sparse=True)
+
+
+def format_param(
+    format: ResponseFormat = Query(
+        "nested",
+        description="'normalized' — сущности один раз в entities, в data ссылки по id",
+    ),
+) -> ResponseFormat:
+    return format
+
+
+class EntityMap:
+    def __init__(self) -> None:
+        self.teams: Dict[int, Dict[str, Any]] = {}
+        self.students: Dict[int, Dict[str, Any]] = {}
+
+    def student(self, student) -> int:
+        if student.id not in self.students:
+            self.students[student.id] = serialize(student, STUDENT, _SCALARS)
+        return student.id
+
+    def team(self, team) -> int:
+        if team.id not in self.teams:
+            data = serialize(team, TEAM, _SCALARS)
+            data["studentIds"] = [self.student(s) for s in team.students]
+            self.teams[team.id] = data
+        return team.id
+
+    def as_dict(self) -> Dict[str, Dict[str, Dict[str, Any]]]:
+        return {
+            "teams": {str(k): v for k, v in self.teams.items()},
+            "students": {str(k): v for k, v in self.students.items()},
+        }
+
+
+def envelope_json(data: Any, entities: EntityMap) -> bytes:
+    return to_json({"data": data, "entities": entities.as_dict()})
+
+
+def normalized_response(data: Any, entities: EntityMap, response: Optional[Response] = None) -> Response:
+    return Response(
+        content=envelope_json(data, entities),
+        media_type="application/json",
+        headers=page_headers(response),
+    )
@@ -0,0 +1,76 @@
+"""
+Keyset-пагинация списков по id.
+
+Тело ответа — по-прежнему JSON-массив (старые клиенты не ломаются),
+курсор следующей страницы — в заголовках X-Next-Cursor и Link (rel="next").
+Нет заголовка — страница последняя. Страница — WHERE id > :after ORDER BY id
+LIMIT n: по первичному ключу глубокая страница стоит столько же, сколько первая.
+"""
+import base64
+import binascii
+from dataclasses import dataclass
+from typing import Dict, Optional
+
+from fastapi import HTTPException, Query, Request, Response
+from sqlalchemy.orm import Query as OrmQuery
+
+from app.core.config import app_settings
+
+NEXT_CURSOR_HEADER = "X-Next-Cursor"
+
+
+@dataclass
+class Page:
+    limit: int
+    after_id: Optional[int] = None
+
+
+def encode_cursor(last_id: int) -> str:
+    # непрозрачный для клиента: формат курсора можно поменять, не ломая API
+    return base64.urlsafe_b64encode(f"id:{last_id}".encode()).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str) -> int:
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4)).decode()
+        prefix, _, value = raw.partition(":")
+        if prefix != "id":
+            raise ValueError(cursor)
+        return int(value)
+    except (binascii.Error, UnicodeDecodeError, ValueError):
+        raise HTTPException(400, "Invalid cursor")
+
+
+def page_params(
+    limit: int = Query(app_settings.LIST_PAGE_SIZE, ge=1, le=app_settings.LIST_PAGE_SIZE_MAX),
+    cursor: Optional[str] = None,
+) -> Page:
+    return Page(limit=limit, after_id=decode_cursor(cursor) if cursor else None)
+
+
+def page_headers(response: Optional[Response]) -> Dict[str, str]:
+    """
+    Заголовки пагинации из внедрённого Response — для эндпоинтов, которые
+    возвращают свой Response (FastAPI их тогда сам не переносит).
+    """
+    if response is None:
+        return {}
+    return {
+        key: value
+        for key, value in response.headers.items()
+        if key.lower() in (NEXT_CURSOR_HEADER.lower(), "link")
+    }
+
+
+def paginate(query: OrmQuery, id_column, page: Page, request: Request, response: Response) -> list:
+    """Одна страница query по id_column; при наличии следующей — ставит заголовки."""
+    if page.after_id is not None:
+        query = query.filter(id_column > page.after_id)
+    # +1 строка — узнать, есть ли следующая страница, без отдельного COUNT
+    rows = query.order_by(id_column).limit(page.limit + 1).all()
+    if len(rows) > page.limit:
+        rows = rows[: page.limit]
+        cursor = encode_cursor(getattr(rows[-1], id_column.key))
+        response.headers[NEXT_CURSOR_HEADER] = cursor
+        response.headers["Link"] = f'<{request.url.include_query_params(cursor=cursor)}>; rel="next"'
+    return rows
@@ -15,6 +15,47 @@ class Settings(BaseSettings):
     APP_PORT: int = "8000"
     APP_RELOAD: bool = True
 
+    MAX_UPLOAD_SIZE_MB: int = 25
+    # internal-location nginx для X-Accel-Redirect (например "/protected");
+    # пусто — файлы отдаёт само приложение
+    FILE_ACCEL_REDIRECT_PREFIX: str | None = None
+
+    # схема назначения peer review: "latin_square" или "rotation" (старая)
+    PEER_REVIEW_PAIRING: str = "latin_square"
+
+    # фоновые задачи (app/services/jobs.py); 0 потоков — воркеры не запускаются
+    JOB_WORKER_THREADS: int = 2
+    JOB_POLL_INTERVAL_SECONDS: float = 2.0
+    JOB_RETRY_BACKOFF_SECONDS: int = 5
+    # running-задача, чей lease не продлевался дольше этого срока, считается брошенной;
+    # воркер продлевает lease каждую треть срока, пока задача выполняется
+    JOB_LEASE_SECONDS: int = 900
+
+    # число процессов uvicorn; та же переменная окружения, что читает сам uvicorn
+    WEB_CONCURRENCY: int = 1
+
+    # процессы bcrypt (app/core/hashing.py) в КАЖДОМ процессе uvicorn;
+    # 0 — cpu_count // WEB_CONCURRENCY (минимум 1), чтобы все пулы вместе
+    # занимали ядра машины, а не workers × cpu_count процессов
+    PASSWORD_HASH_WORKERS: int = 0
+    # стоимость bcrypt (log2 раундов); хэши с другой стоимостью пересчитываются при входе
+    PASSWORD_BCRYPT_ROUNDS: int = 12
+    # сколько хэшей входа/регистрации может ждать пул; сверх — 503
+    PASSWORD_HASH_QUEUE_SIZE: int = 64
+
+    # сколько хранится файл фонового экспорта в Moodle (app/services/moodle_export.py)
+    MOODLE_EXPORT_TTL_SECONDS: int = 24 * 60 * 60
+
+    # keyset-пагинация списков (app/api/pagination.py): страница по умолчанию и предел
+    LIST_PAGE_SIZE: int = 100
+    LIST_PAGE_SIZE_MAX: int = 1000
+
+    # итоговая оценка (app/services/final_grades.py): веса букв, бонусные буквы
+    # и полосы {полоса: минимальный балл} по убыванию порога
+    FINAL_GRADE_WEIGHTS: dict[str, float] = {"A": 0.3, "R": 0.2, "I": 0.3, "C": 0.2}
+    FINAL_GRADE_BONUS_LETTERS: list[str] = ["TE", "E"]
+    FINAL_GRADE_BANDS: dict[str, float] = {"A": 90, "B": 75, "C": 60, "D": 0}
+
 
 def setup_logger(
     *,
@@ -0,0 +1,164 @@
+"""
+Хэширование паролей bcrypt в пуле процессов.
+
+bcrypt — чистый CPU; в потоках одного процесса пачка хэшей упирается в одно
+ядро, поэтому массовые операции (импорт списка пользователей) раздаются
+процессам. Пул создаётся лениво, по одному на процесс uvicorn, поэтому по
+умолчанию ядра делятся между процессами uvicorn (hash_pool_size).
+
+Вход и регистрация тоже идут через пул (hash_in_pool / verify_in_pool):
+корутина ждёт future, не занимая поток threadpool, так что всплеск входов
+в начале занятия не задерживает остальные запросы. Очередь к пулу
+ограничена PASSWORD_HASH_QUEUE_SIZE — сверх неё HashQueueFull. Счётчики
+пула — hash_pool_metrics().
+"""
+import asyncio
+import multiprocessing
+import os
+import threading
+import time
+from concurrent.futures import Future, ProcessPoolExecutor
+from dataclasses import dataclass, replace
+from typing import List, Optional, Sequence, Tuple
+
+from passlib.context import CryptContext
+
+from app.core.config import app_settings
+
+# хэши с другим числом раундов passlib считает устаревшими (needs_update)
+pwd_context = CryptContext(
+    schemes=["bcrypt"],
+    deprecated="auto",
+    bcrypt__rounds=app_settings.PASSWORD_BCRYPT_ROUNDS,
+)
+
+_pool: Optional[ProcessPoolExecutor] = None
+_pool_workers = 0
+_pool_lock = threading.Lock()
+
+
+class HashQueueFull(RuntimeError):
+    pass
+
+
+@dataclass
+class HashPoolMetrics:
+    workers: int = 0
+    queue_limit: int = 0
+    # отправлено в пул и ещё не завершено (ждут процесса + считаются)
+    in_flight: int = 0
+    peak_in_flight: int = 0
+    submitted: int = 0
+    completed: int = 0
+    failed: int = 0
+    rejected: int = 0
+    rehashed: int = 0
+    # суммарное время от отправки до результата
+    total_seconds: float = 0.0
+
+
+_metrics = HashPoolMetrics()
+_metrics_lock = threading.Lock()
+
+
+def _hash_one(password: str) -> str:
+    # выполняется в дочернем процессе
+    return pwd_context.hash(password)
+
+
+def _verify_one(password: str, hashed: str) -> Tuple[bool, Optional[str]]:
+    # выполняется в дочернем процессе; новый хэш — если параметры устарели
+    return pwd_context.verify_and_update(password, hashed)
+
+
+def hash_pool_size() -> int:
+    if app_settings.PASSWORD_HASH_WORKERS:
+        return app_settings.PASSWORD_HASH_WORKERS
+    return max(1, (os.cpu_count() or 1) // max(1, app_settings.WEB_CONCURRENCY))
+
+
+def get_hash_pool() -> ProcessPoolExecutor:
+    global _pool, _pool_workers
+    with _pool_lock:
+        if _pool is None:
+            _pool_workers = hash_pool_size()
+            # spawn, а не fork: в процессе уже работают потоки (воркеры задач, threadpool)
+            _pool = ProcessPoolExecutor(
+                max_workers=_pool_workers,
+                mp_context=multiprocessing.get_context("spawn"),
+            )
+        return _pool
+
+
+def hash_passwords(passwords: Sequence[str]) -> List[str]:
+    """Хэширует пачку паролей на всех ядрах; порядок результата — как у входа."""
+    if not passwords:
+        return []
+    if len(passwords) == 1:
+        return [_hash_one(passwords[0])]
+
+    pool = get_hash_pool()
+    chunksize = max(1, len(passwords) // (_pool_workers * 4))
+    return list(pool.map(_hash_one, passwords, chunksize=chunksize))
+
+
+def _finish(future: Future, started: float) -> None:
+    with _metrics_lock:
+        _metrics.in_flight -= 1
+        _metrics.total_seconds += time.perf_counter() - started
+        if future.cancelled() or future.exception() is not None:
+            _metrics.failed += 1
+        else:
+            _metrics.completed += 1
+
+
+def _submit(fn, *args) -> Future:
+    """Отправка в пул с ограничением очереди; переполнение — сразу HashQueueFull."""
+    with _metrics_lock:
+        if _metrics.in_flight >= app_settings.PASSWORD_HASH_QUEUE_SIZE:
+            _metrics.rejected += 1
+            raise HashQueueFull("Password hashing queue is full")
+        _metrics.in_flight += 1
+        _metrics.peak_in_flight = max(_metrics.peak_in_flight, _metrics.in_flight)
+        _metrics.submitted += 1
+
+    started = time.perf_counter()
+    try:
+        future = get_hash_pool().submit(fn, *args)
+    except BaseException:
+        with _metrics_lock:
+            _metrics.in_flight -= 1
+            _metrics.failed += 1
+        raise
+    future.add_done_callback(lambda f: _finish(f, started))
+    return future
+
+
+async def hash_in_pool(password: str) -> str:
+    return await asyncio.wrap_future(_submit(_hash_one, password))
+
+
+async def verify_in_pool(password: str, hashed: str) -> Tuple[bool, Optional[str]]:
+    """(пароль верен, новый хэш или None) — см. CryptContext.verify_and_update."""
+    ok, new_hash = await asyncio.wrap_future(_submit(_verify_one, password, hashed))
+    if new_hash is not None:
+        with _metrics_lock:
+            _metrics.rehashed += 1
+    return ok, new_hash
+
+
+def hash_pool_metrics() -> HashPoolMetrics:
+    with _metrics_lock:
+        return replace(
+            _metrics,
+            workers=_pool_workers,
+            queue_limit=app_settings.PASSWORD_HASH_QUEUE_SIZE,
+        )
+
+
+def shutdown_hash_pool() -> None:
+    global _pool
+    with _pool_lock:
+        if _pool is not None:
+            _pool.shutdown(wait=False, cancel_futures=True)
+            _pool = None
@@ -1,13 +1,13 @@
 from datetime import datetime, timedelta, timezone
-from typing import Optional
+from typing import Optional, Tuple
 
 from fastapi import Depends, HTTPException, status
 from fastapi.security import OAuth2PasswordBearer
 from jose import JWTError, jwt
-from passlib.context import CryptContext
 from sqlalchemy.orm import Session
 
 from app.core.db import get_db
+from app.core.hashing import HashQueueFull, hash_in_pool, verify_in_pool
 from app.models.user import User, UserRole
 
 SECRET_KEY = "CHANGE_ME_IN_ENV"  # реально вытащить из env
@@ -15,15 +15,33 @@ ALGORITHM = "HS256"
 ACCESS_TOKEN_EXPIRE_MINUTES = 60 * 8
 
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl="/auth/token")
-pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
 
 
-def verify_password(plain_password: str, hashed_password: str) -> bool:
-    return pwd_context.verify(plain_password, hashed_password)
+def _hashing_busy() -> HTTPException:
+    return HTTPException(
+        status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+        detail="Too many concurrent password checks, retry shortly",
+        headers={"Retry-After": "1"},
+    )
+
 
+async def verify_password(plain_password: str, hashed_password: str) -> Tuple[bool, Optional[str]]:
+    """
+    Проверка в пуле процессов (app/core/hashing.py). Второй элемент — новый
+    хэш, если у старого устарели параметры (другая стоимость bcrypt):
+    вызывающий сохраняет его пользователю.
+    """
+    try:
+        return await verify_in_pool(plain_password, hashed_password)
+    except HashQueueFull:
+        raise _hashing_busy()
 
-def get_password_hash(password: str) -> str:
-    return pwd_context.hash(password)
+
+async def get_password_hash(password: str) -> str:
+    try:
+        return await hash_in_pool(password)
+    except HashQueueFull:
+        raise _hashing_busy()
 
 
 def create_access_token(data: dict, expires_delta: Optional[timedelta] = None) -> str:
@@ -1,4 +1,17 @@
+from typing import Iterable
+
+from sqlalchemy import Engine
 from sqlalchemy.orm import declarative_base
 
 Base = declarative_base()
 
+
+def ensure_indexes(engine: Engine, names: Iterable[str]) -> None:
+    """
+    create_all не добавляет индексы в уже существующие таблицы: индексы,
+    появившиеся в моделях позже, досоздаём по имени (IF NOT EXISTS).
+    """
+    indexes = {ix.name: ix for table in Base.metadata.tables.values() for ix in table.indexes}
+    with engine.begin() as conn:
+        for name in names:
+            indexes[name].create(conn, checkfirst=True)
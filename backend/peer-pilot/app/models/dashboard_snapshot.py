@@ -0,0 +1,39 @@
+from datetime import datetime
+
+from sqlalchemy import DDL, Column, DateTime, Integer, String, Text, event
+
+from app.models.base import Base
+
+
+class DashboardSnapshot(Base):
+    __tablename__ = "dashboard_snapshots"
+
+    # один снапшот на (студент, scope) — чтение дашборда = один lookup по PK;
+    # scope — "all" / "project", для ?format=normalized с суффиксом ":normalized"
+    student_id = Column(Integer, primary_key=True)
+    scope = Column(String(20), primary_key=True)
+
+    # уже сериализованный StudentDashboard (JSON c camelCase alias)
+    payload = Column(Text, nullable=False)
+    built_at = Column(DateTime, nullable=False, default=datetime.utcnow)
+
+
+class DashboardSnapshotGeneration(Base):
+    """
+    Счётчик инвалидаций (одна строка, id=1). Каждая invalidate_* увеличивает
+    его в транзакции записи; снапшот сохраняется, только если счётчик не
+    менялся с начала его сборки — иначе он собран из устаревших данных.
+    """
+
+    __tablename__ = "dashboard_snapshot_generation"
+
+    id = Column(Integer, primary_key=True)
+    value = Column(Integer, nullable=False, default=0)
+
+
+# строка счётчика создаётся вместе с таблицей — инвалидация всегда один UPDATE
+event.listen(
+    DashboardSnapshotGeneration.__table__,
+    "after_create",
+    DDL("INSERT INTO dashboard_snapshot_generation (id, value) VALUES (1, 0)"),
+)
@@ -0,0 +1,18 @@
+from datetime import datetime
+
+from sqlalchemy import Column, DateTime, Integer, String
+
+from app.models.base import Base
+
+
+class FileBlob(Base):
+    __tablename__ = "file_blobs"
+
+    # файл лежит в blobs/<sha256[:2]>/<sha256>.pdf
+    sha256 = Column(String(64), primary_key=True)
+    size = Column(Integer, nullable=False)
+
+    # сколько ссылок PeerReview (summary/comments) указывает на этот файл
+    ref_count = Column(Integer, nullable=False, default=0)
+
+    created_at = Column(DateTime, nullable=False, default=datetime.utcnow)
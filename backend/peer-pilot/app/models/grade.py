@@ -1,6 +1,6 @@
 import enum
 
-from sqlalchemy import Column, Enum, ForeignKey, Integer
+from sqlalchemy import Column, Enum, ForeignKey, Index, Integer
 from sqlalchemy.orm import relationship
 
 from app.models.base import Base
@@ -17,6 +17,16 @@ class AssignmentLetterEnum(str, enum.Enum):
 
 class Grade(Base):
     __tablename__ = "grades"
+    __table_args__ = (
+        # натуральный ключ: одна оценка на (студент, спринт, буква) — по нему upsert
+        Index(
+            "uq_grades_student_sprint_assignment",
+            "student_id",
+            "sprint",
+            "assignment",
+            unique=True,
+        ),
+    )
 
     id = Column(Integer, primary_key=True, index=True)
     student_id = Column(Integer, ForeignKey("students.id"), nullable=False, index=True)
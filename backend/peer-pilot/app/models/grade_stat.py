@@ -0,0 +1,31 @@
+from sqlalchemy import Column, Enum, Float, Integer, String, UniqueConstraint
+
+from app.models.base import Base
+from app.models.grade import AssignmentLetterEnum
+
+
+class GradeStat(Base):
+    """
+    Накопительные агрегаты оценок по (scope, sprint, assignment): по строке
+    на корзину гистограммы, в каждой — count / total / total_sq попавших
+    в неё баллов. Пишется дельтами из путей записи оценок
+    (app/services/grade_stats.py), пересобирается из grades / team_grades.
+    """
+
+    __tablename__ = "grade_stats"
+    __table_args__ = (
+        UniqueConstraint("scope", "sprint", "assignment", "bucket", name="uq_grade_stats_key"),
+    )
+
+    id = Column(Integer, primary_key=True, index=True)
+    # "student" — grades, "team" — team_grades
+    scope = Column(String(16), nullable=False)
+    sprint = Column(Integer, nullable=False)
+    assignment = Column(
+        Enum(AssignmentLetterEnum, name="assignment_letter"),
+        nullable=False,
+    )
+    bucket = Column(Integer, nullable=False)
+    count = Column(Integer, nullable=False, default=0)
+    total = Column(Float, nullable=False, default=0)
+    total_sq = Column(Float, nullable=False, default=0)
@@ -0,0 +1,44 @@
+import enum
+from datetime import datetime
+
+from sqlalchemy import Column, DateTime, Enum, Index, Integer, String, Text
+
+from app.models.base import Base
+
+
+class JobStatus(str, enum.Enum):
+    QUEUED = "queued"
+    RUNNING = "running"
+    SUCCEEDED = "succeeded"
+    FAILED = "failed"
+
+
+class Job(Base):
+    __tablename__ = "jobs"
+    __table_args__ = (
+        # выбор следующей задачи: status = queued AND run_after <= now ORDER BY id
+        Index("ix_jobs_status_run_after", "status", "run_after"),
+        Index("ix_jobs_kind_dedupe_key", "kind", "dedupe_key"),
+    )
+
+    id = Column(Integer, primary_key=True, index=True)
+    kind = Column(String(50), nullable=False)
+    # JSON-параметры обработчика
+    payload = Column(Text, nullable=False, default="{}")
+    # одинаковые queued-задачи (например, регенерация одного проекта) не дублируются
+    dedupe_key = Column(String(100), nullable=True)
+
+    status = Column(Enum(JobStatus), default=JobStatus.QUEUED, nullable=False)
+    attempts = Column(Integer, nullable=False, default=0)
+    max_attempts = Column(Integer, nullable=False, default=3)
+    run_after = Column(DateTime, nullable=False, default=datetime.utcnow)
+
+    # какой воркер (pid:thread) взял задачу и когда — для возврата "зависших"
+    locked_by = Column(String(100), nullable=True)
+    locked_at = Column(DateTime, nullable=True)
+
+    result = Column(Text, nullable=True)
+    error = Column(Text, nullable=True)
+
+    created_at = Column(DateTime, nullable=False, default=datetime.utcnow)
+    finished_at = Column(DateTime, nullable=True)
@@ -1,6 +1,6 @@
 import enum
 
-from sqlalchemy import JSON, Column, DateTime, Enum, ForeignKey, Integer, String
+from sqlalchemy import JSON, Column, DateTime, Enum, ForeignKey, Index, Integer, String
 from sqlalchemy.orm import relationship
 
 from app.models.base import Base
@@ -13,6 +13,10 @@ class PeerReviewStatus(str, enum.Enum):
 
 class PeerReview(Base):
     __tablename__ = "peer_reviews"
+    __table_args__ = (
+        # поиск "зеркального" ревью: (sprint, reviewing_team_id)
+        Index("ix_peer_reviews_sprint_reviewing_team", "sprint", "reviewing_team_id"),
+    )
 
     id = Column(Integer, primary_key=True, index=True)
     sprint = Column(Integer, nullable=False)
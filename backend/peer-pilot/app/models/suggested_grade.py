@@ -0,0 +1,26 @@
+from sqlalchemy import Column, Enum, ForeignKey, Integer, UniqueConstraint
+
+from app.models.base import Base
+from app.models.grade import AssignmentLetterEnum
+
+
+class SuggestedGrade(Base):
+    """
+    Проекция PeerReview.suggested_grades (JSON) в строки — для агрегатов
+    вида "средняя предложенная оценка по команде за спринт" одним GROUP BY.
+    Пишется вместе с JSON, источник правды — сам JSON.
+    """
+
+    __tablename__ = "suggested_grades"
+    __table_args__ = (
+        UniqueConstraint("peer_review_id", "assignment", name="uq_suggested_grades_review_assignment"),
+    )
+
+    id = Column(Integer, primary_key=True, index=True)
+    peer_review_id = Column(Integer, ForeignKey("peer_reviews.id"), nullable=False)
+    assignment = Column(
+        Enum(AssignmentLetterEnum, name="assignment_letter"),
+        nullable=False,
+        index=True,
+    )
+    score = Column(Integer, nullable=False)
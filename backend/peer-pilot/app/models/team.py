@@ -14,7 +14,7 @@ class Team(Base):
 
     is_locked = Column(Boolean, default=False, nullable=False)
 
-    project_id = Column(Integer, ForeignKey("projects.id"), nullable=True)
+    project_id = Column(Integer, ForeignKey("projects.id"), nullable=True, index=True)
 
     students = relationship("Student", back_populates="team", cascade="all,delete-orphan")
     reviewing_peer_reviews = relationship(
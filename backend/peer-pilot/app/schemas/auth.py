@@ -36,3 +36,30 @@ class CurrentUser(BaseModel):
     teamId: int | None = None
 
     model_config = ConfigDict(from_attributes=True)
+
+
+class ImportRowError(BaseModel):
+    row: int
+    email: Optional[str] = None
+    error: str
+
+    model_config = ConfigDict(from_attributes=True)
+
+
+class RosterImportReport(BaseModel):
+    created: int
+    linkedStudents: int
+    errors: list[ImportRowError]
+
+
+class HashPoolMetricsRead(BaseModel):
+    workers: int
+    queueLimit: int
+    inFlight: int
+    peakInFlight: int
+    submitted: int
+    completed: int
+    failed: int
+    rejected: int
+    rehashed: int
+    avgSeconds: Optional[float] = None
@@ -1,4 +1,5 @@
-from typing import List
+from datetime import datetime
+from typing import List, Optional
 
 from pydantic import BaseModel, ConfigDict, Field
 
@@ -18,3 +19,38 @@ class StudentDashboard(BaseModel):
     model_config = ConfigDict(
         from_attributes=True,
     )
+
+
+class TeamGradeSummary(BaseModel):
+    team_id: int = Field(serialization_alias="teamId")
+    team_name: str = Field(serialization_alias="teamName")
+    color: Optional[str] = None
+    student_count: int = Field(0, serialization_alias="studentCount")
+    avg_student_score: Optional[float] = Field(None, serialization_alias="avgStudentScore")
+    student_grade_count: int = Field(0, serialization_alias="studentGradeCount")
+    avg_team_score: Optional[float] = Field(None, serialization_alias="avgTeamScore")
+    team_grade_count: int = Field(0, serialization_alias="teamGradeCount")
+
+
+class SprintReviewStatusCounts(BaseModel):
+    sprint: int
+    pending: int = 0
+    submitted: int = 0
+    graded: int = 0
+
+
+class PendingReviewItem(BaseModel):
+    id: int
+    sprint: int
+    reviewing_team_id: int = Field(serialization_alias="reviewingTeamId")
+    reviewing_team_name: str = Field(serialization_alias="reviewingTeamName")
+    reviewed_team_id: int = Field(serialization_alias="reviewedTeamId")
+    reviewed_team_name: str = Field(serialization_alias="reviewedTeamName")
+    due_date: Optional[datetime] = Field(None, serialization_alias="dueDate")
+
+
+class InstructorDashboard(BaseModel):
+    project_id: int = Field(serialization_alias="projectId")
+    teams: List[TeamGradeSummary]
+    review_status: List[SprintReviewStatusCounts] = Field(serialization_alias="reviewStatus")
+    pending_reviews: List[PendingReviewItem] = Field(serialization_alias="pendingReviews")
@@ -1,4 +1,4 @@
-from typing import Optional
+from typing import Dict, List, Optional
 
 from pydantic import BaseModel, ConfigDict, Field
 
@@ -24,3 +24,83 @@ class GradeRead(GradeBase):
     id: int
 
     model_config = ConfigDict(from_attributes=True)
+
+
+class GradeMatrixRead(BaseModel):
+    """
+    Колоночный журнал: scores[i][j] — балл студента studentIds[i]
+    за спринт sprints[j] и букву assignments[j]; null — оценки нет.
+    """
+
+    studentIds: List[int]
+    sprints: List[int]
+    assignments: List[AssignmentLetterEnum]
+    scores: List[List[Optional[int]]]
+
+
+class GradeOverride(BaseModel):
+    studentId: int
+    sprint: int = Field(ge=1)
+    assignment: AssignmentLetterEnum
+    # null — «убрать оценку» в сценарии
+    score: Optional[int] = None
+
+
+class FinalGradesWhatIf(BaseModel):
+    """Сценарий пересчёта: не заданные поля берутся из настроек, в БД ничего не пишется."""
+
+    weights: Optional[Dict[AssignmentLetterEnum, float]] = None
+    bonusLetters: Optional[List[AssignmentLetterEnum]] = None
+    # хотя бы одна полоса: студенту всегда назначается какая-то
+    bands: Optional[Dict[str, float]] = Field(None, min_length=1)
+    overrides: List[GradeOverride] = []
+
+
+class FinalGradesRead(BaseModel):
+    """Колоночный ответ: i-й элемент каждого списка — студент studentIds[i]."""
+
+    studentIds: List[int]
+    teamIds: List[Optional[int]]
+    letters: List[AssignmentLetterEnum]
+    letterAverages: List[List[Optional[float]]]
+    final: List[float]
+    bands: List[str]
+
+
+class GradeStatRead(BaseModel):
+    """Перцентили — оценка по гистограмме (корзины по bucketWidth баллов)."""
+
+    scope: str
+    sprint: int
+    assignment: AssignmentLetterEnum
+    count: int
+    mean: Optional[float]
+    stddev: Optional[float]
+    median: Optional[float]
+    p25: Optional[float]
+    p75: Optional[float]
+    p90: Optional[float]
+    histogram: List[int]
+    bucketWidth: int
+
+    model_config = ConfigDict(from_attributes=True)
+
+
+class TeamGradeFanOutOverride(BaseModel):
+    studentId: int
+    assignment: AssignmentLetterEnum
+    score: int
+
+
+class TeamGradeFanOut(BaseModel):
+    """Перенос командных оценок проекта за спринт в оценки студентов."""
+
+    projectId: int
+    sprint: int = Field(ge=1)
+    overrides: List[TeamGradeFanOutOverride] = []
+
+
+class TeamGradeFanOutRead(BaseModel):
+    students: int
+    written: int
+    overridden: int
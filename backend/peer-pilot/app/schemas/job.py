@@ -0,0 +1,20 @@
+from datetime import datetime
+from typing import Any, Optional
+
+from pydantic import BaseModel, ConfigDict, Field
+
+from app.models.job import JobStatus
+
+
+class JobRead(BaseModel):
+    id: int
+    kind: str
+    status: JobStatus
+    attempts: int
+    max_attempts: int = Field(serialization_alias="maxAttempts")
+    result: Optional[Any] = None
+    error: Optional[str] = None
+    created_at: datetime = Field(serialization_alias="createdAt")
+    finished_at: Optional[datetime] = Field(None, serialization_alias="finishedAt")
+
+    model_config = ConfigDict(from_attributes=True)
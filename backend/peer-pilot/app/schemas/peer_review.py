@@ -2,6 +2,7 @@ from pydantic import BaseModel, ConfigDict, Field
 from typing import Optional, Any
 from datetime import datetime
 
+from app.models.grade import AssignmentLetterEnum
 from app.models.peer_review import PeerReviewStatus
 from app.schemas.team import TeamRead
 
@@ -80,6 +81,24 @@ class PeerReviewUpdate(BaseModel):
     reviewGrade: Optional[int] = None
 
 
+class PeerReviewBulkUpdate(PeerReviewUpdate):
+    id: int
+
+
+class PeerReviewBulkResult(BaseModel):
+    id: int
+    ok: bool
+    error: Optional[str] = None
+
+
+class SuggestedGradeSummary(BaseModel):
+    sprint: int
+    team_id: int = Field(serialization_alias="teamId")
+    assignment: AssignmentLetterEnum
+    avg_score: float = Field(serialization_alias="avgScore")
+    count: int
+
+
 class PeerReviewRead(PeerReviewBase):
     id: int
 
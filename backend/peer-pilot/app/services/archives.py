@@ -0,0 +1,229 @@
+import io
+import json
+import os
+import shutil
+import tempfile
+import uuid
+import zipfile
+from datetime import datetime
+from pathlib import Path
+from typing import Iterable, Iterator, Optional
+
+ARCHIVE_CHUNK_SIZE = 1024 * 1024  # 1 MiB
+
+
+class _ZipStreamBuffer(io.RawIOBase):
+    """
+    Приёмник без seek (non-seekable) для zipfile: всё, что записано,
+    забирается через drain() и сразу отдаётся клиенту.
+    zipfile в этом режиме пишет data descriptor после каждой записи.
+    """
+
+    def __init__(self):
+        super().__init__()
+        self._chunks: list[bytes] = []
+        self._pos = 0
+
+    def writable(self) -> bool:
+        return True
+
+    def write(self, b) -> int:
+        data = bytes(b)
+        self._chunks.append(data)
+        self._pos += len(data)
+        return len(data)
+
+    def tell(self) -> int:
+        return self._pos
+
+    def drain(self) -> bytes:
+        data = b"".join(self._chunks)
+        self._chunks.clear()
+        return data
+
+
+def _zip_info(arcname: str, st: os.stat_result) -> zipfile.ZipInfo:
+    info = zipfile.ZipInfo(
+        arcname,
+        date_time=datetime.fromtimestamp(st.st_mtime).timetuple()[:6],
+    )
+    info.compress_type = zipfile.ZIP_STORED
+    info.file_size = st.st_size
+    return info
+
+
+def stream_zip(
+    entries: Iterable[tuple[str, Path]],
+    chunk_size: int = ARCHIVE_CHUNK_SIZE,
+    comment: bytes = b"",
+) -> Iterator[bytes]:
+    """
+    Генерирует ZIP по мере чтения файлов: entries — пары (arcname, path).
+    PDF уже сжаты, поэтому пишем их как ZIP_STORED, без deflate.
+    В памяти одновременно не больше одного чанка.
+    """
+    buf = _ZipStreamBuffer()
+    with zipfile.ZipFile(buf, mode="w", compression=zipfile.ZIP_STORED) as zf:
+        zf.comment = comment
+        for arcname, path in entries:
+            try:
+                src = path.open("rb")
+            except OSError:
+                # файл удалили между выборкой из БД и стримингом — пропускаем
+                continue
+
+            with src:
+                info = _zip_info(arcname, os.fstat(src.fileno()))
+                with zf.open(info, mode="w") as dest:
+                    while True:
+                        chunk = src.read(chunk_size)
+                        if not chunk:
+                            break
+                        dest.write(chunk)
+                        yield buf.drain()
+            yield buf.drain()
+
+    # central directory пишется при закрытии ZipFile
+    yield buf.drain()
+
+
+# ---------- PREBUILT SPRINT ARCHIVES ----------
+# Для каждого спринта держим готовый archives/sprint_<n>.zip и рядом манифест
+# sprint_<n>.json {arcname: путь к файлу}; по нему при скачивании проверяем,
+# что архив соответствует БД. Манифест лежит отдельным файлом: комментарий
+# ZIP ограничен 65535 байтами, а манифест большого спринта длиннее. В
+# комментарии архива — только id сборки, тот же, что в манифесте: так пара
+# архив/манифест от разных сборок не считается актуальной.
+# Upload дописывает новую запись в копию архива, замена/удаление файла архив
+# инвалидирует. Все изменения атомарные (temp + os.replace), так что уже
+# начатые скачивания не ломаются.
+
+
+def sprint_entry_name(sprint: int, review_id: int, label: str) -> str:
+    return f"sprint_{sprint}/review_{review_id}_{label}.pdf"
+
+
+def sprint_archive_path(root: Path, sprint: int) -> Path:
+    return root / "archives" / f"sprint_{sprint}.zip"
+
+
+def manifest_path(archive: Path) -> Path:
+    return archive.with_suffix(".json")
+
+
+def read_manifest(archive: Path) -> Optional[dict[str, str]]:
+    try:
+        with zipfile.ZipFile(archive) as zf:
+            build_id = zf.comment.decode()
+        manifest = json.loads(manifest_path(archive).read_text())
+    except (OSError, zipfile.BadZipFile, ValueError):
+        return None
+    if not isinstance(manifest, dict) or manifest.get("id") != build_id:
+        return None
+    return manifest.get("entries")
+
+
+def _temp_beside(path: Path) -> Path:
+    path.parent.mkdir(parents=True, exist_ok=True)
+    fd, tmp_name = tempfile.mkstemp(dir=path.parent, prefix=".archive-", suffix=".part")
+    os.close(fd)
+    return Path(tmp_name)
+
+
+def _write_manifest(archive: Path, build_id: str, entries: dict[str, str]) -> None:
+    target = manifest_path(archive)
+    tmp = _temp_beside(target)
+    try:
+        manifest = {"id": build_id, "entries": entries}
+        tmp.write_text(json.dumps(manifest, separators=(",", ":"), sort_keys=True))
+        os.replace(tmp, target)
+    finally:
+        tmp.unlink(missing_ok=True)
+
+
+def _drop_archive(archive: Path) -> None:
+    archive.unlink(missing_ok=True)
+    manifest_path(archive).unlink(missing_ok=True)
+
+
+def build_sprint_archive(root: Path, sprint: int, entries: dict[str, str]) -> Path:
+    archive = sprint_archive_path(root, sprint)
+    build_id = uuid.uuid4().hex
+    tmp = _temp_beside(archive)
+    try:
+        with tmp.open("wb") as out:
+            pairs = [(name, Path(p)) for name, p in sorted(entries.items())]
+            for chunk in stream_zip(pairs, comment=build_id.encode()):
+                out.write(chunk)
+        _write_manifest(archive, build_id, entries)
+        os.replace(tmp, archive)
+    finally:
+        tmp.unlink(missing_ok=True)
+    return archive
+
+
+def ensure_sprint_archive(root: Path, sprint: int, entries: dict[str, str]) -> Path:
+    """Возвращает готовый архив спринта, пересобирая его, только если он устарел."""
+    archive = sprint_archive_path(root, sprint)
+    if read_manifest(archive) != entries:
+        build_sprint_archive(root, sprint, entries)
+    return archive
+
+
+def drop_stale_sprint_archive(root: Path, sprint: int, arcname: str, path_str: Optional[str]) -> None:
+    """
+    Вызывается после commit в upload/delete: если запись arcname в готовом
+    архиве указывает на другой файл (замена или удаление), архив удаляется,
+    чтобы скачивание не отдало старую версию. Всё остальное — в фоновой задаче.
+    """
+    archive = sprint_archive_path(root, sprint)
+    manifest = read_manifest(archive)
+    if manifest is not None and arcname in manifest and manifest[arcname] != path_str:
+        _drop_archive(archive)
+
+
+def refresh_sprint_archive(root: Path, sprint: int, entries: dict[str, str]) -> Path:
+    """
+    Фоновая сборка архива спринта: если в готовом архиве только не хватает
+    записей, они дописываются; иначе архив пересобирается целиком.
+    """
+    manifest = read_manifest(sprint_archive_path(root, sprint))
+    if manifest is not None and all(entries.get(name) == p for name, p in manifest.items()):
+        for arcname in sorted(entries.keys() - manifest.keys()):
+            update_sprint_archive(root, sprint, arcname, entries[arcname])
+    return ensure_sprint_archive(root, sprint, entries)
+
+
+def update_sprint_archive(root: Path, sprint: int, arcname: str, path_str: Optional[str]) -> None:
+    """
+    Новая запись дописывается в копию архива; замена или удаление записи —
+    архив просто удаляется и будет пересобран при следующей сборке.
+    """
+    archive = sprint_archive_path(root, sprint)
+    manifest = read_manifest(archive)
+    if manifest is None:
+        return
+
+    if path_str is None or arcname in manifest:
+        _drop_archive(archive)
+        return
+
+    path = Path(path_str)
+    build_id = uuid.uuid4().hex
+    tmp = _temp_beside(archive)
+    try:
+        shutil.copyfile(archive, tmp)
+        manifest[arcname] = path_str
+        with zipfile.ZipFile(tmp, mode="a", compression=zipfile.ZIP_STORED) as zf, \
+                path.open("rb") as src:
+            info = _zip_info(arcname, os.fstat(src.fileno()))
+            with zf.open(info, mode="w") as dest:
+                shutil.copyfileobj(src, dest, ARCHIVE_CHUNK_SIZE)
+            zf.comment = build_id.encode()
+        _write_manifest(archive, build_id, manifest)
+        os.replace(tmp, archive)
+    except OSError:
+        # не смогли дописать — пусть пересоберётся при скачивании
+        _drop_archive(archive)
+    finally:
+        tmp.unlink(missing_ok=True)
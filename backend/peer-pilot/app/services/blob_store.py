@@ -0,0 +1,141 @@
+import fcntl
+import re
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Iterable, Iterator, Optional
+
+from fastapi import UploadFile
+from sqlalchemy import update
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session
+from starlette.concurrency import run_in_threadpool
+
+from app.models.file_blob import FileBlob
+from app.services.uploads import StoredUpload, copy_upload, hash_upload
+
+_SHA256_RE = re.compile(r"^[0-9a-f]{64}$")
+
+
+def blob_path(root: Path, digest: str) -> Path:
+    return root / "blobs" / digest[:2] / f"{digest}.pdf"
+
+
+def digest_of(root: Path, path_str: str) -> Optional[str]:
+    path = Path(path_str)
+    if _SHA256_RE.match(path.stem) and path == blob_path(root, path.stem):
+        return path.stem
+    return None
+
+
+@contextmanager
+def _blob_lock(root: Path, digest: str) -> Iterator[None]:
+    """
+    Межпроцессная блокировка (flock) каталога blob'а. Под ней идут
+    «проверка ссылок + unlink» в unlink_released и проверка наличия файла
+    после commit в ensure_stored — эти шаги не перемежаются.
+    """
+    lock_path = root / "locks" / f"blobs-{digest[:2]}.lock"
+    lock_path.parent.mkdir(parents=True, exist_ok=True)
+    with lock_path.open("a") as fh:
+        fcntl.flock(fh, fcntl.LOCK_EX)
+        try:
+            yield
+        finally:
+            fcntl.flock(fh, fcntl.LOCK_UN)
+
+
+def _acquire(db: Session, digest: str, size: int) -> None:
+    bump = (
+        update(FileBlob)
+        .where(FileBlob.sha256 == digest)
+        .values(ref_count=FileBlob.ref_count + 1)
+    )
+    if db.execute(bump).rowcount:
+        return
+    try:
+        with db.begin_nested():
+            db.add(FileBlob(sha256=digest, size=size, ref_count=1))
+    except IntegrityError:
+        # ту же запись только что вставил параллельный запрос
+        db.execute(bump)
+
+
+async def put_upload(db: Session, upload: UploadFile, root: Path, max_size: int) -> StoredUpload:
+    """
+    Кладёт загруженный файл в content-addressed хранилище и добавляет ссылку.
+    Сначала считаем sha256 (без записи), и только если такого blob ещё нет —
+    копируем файл. Повторная загрузка того же PDF не пишет на диск ничего.
+    """
+    digest, size = await hash_upload(upload, max_size)
+    path = blob_path(root, digest)
+    if not await run_in_threadpool(path.exists):
+        await run_in_threadpool(path.parent.mkdir, parents=True, exist_ok=True)
+        await copy_upload(upload, path)
+    await run_in_threadpool(_acquire, db, digest, size)
+    return StoredUpload(path=path, size=size, sha256=digest)
+
+
+def _exists_locked(root: Path, digest: str) -> bool:
+    with _blob_lock(root, digest):
+        return blob_path(root, digest).exists()
+
+
+async def ensure_stored(upload: UploadFile, stored: StoredUpload, root: Path) -> None:
+    """
+    Вызывать после commit, в котором put_upload добавил ссылку. Параллельный
+    unlink_released мог проверить ref_count до нашего commit и удалить файл,
+    который put_upload счёл уже существующим, — тогда пишем его заново.
+    Проверка идёт под той же блокировкой, что и unlink: если он ещё не
+    начался, то после нашего commit увидит ссылку и файл не тронет.
+    """
+    if not await run_in_threadpool(_exists_locked, root, stored.sha256):
+        await copy_upload(upload, stored.path)
+
+
+def release(db: Session, root: Path, path_str: Optional[str]) -> Optional[Path]:
+    """
+    Снимает одну ссылку с файла. Возвращает путь, который можно удалить
+    после commit (последняя ссылка ушла), иначе None.
+    Файлы старого формата (review_<id>_..., не blob) удаляются как раньше.
+    """
+    if not path_str:
+        return None
+
+    digest = digest_of(root, path_str)
+    if digest is None:
+        return Path(path_str)
+
+    db.execute(
+        update(FileBlob)
+        .where(FileBlob.sha256 == digest, FileBlob.ref_count > 0)
+        .values(ref_count=FileBlob.ref_count - 1)
+    )
+    gone = (
+        db.query(FileBlob)
+        .filter(FileBlob.sha256 == digest, FileBlob.ref_count <= 0)
+        .delete(synchronize_session=False)
+    )
+    return Path(path_str) if gone else None
+
+
+def unlink_released(db: Session, root: Path, paths: Iterable[Optional[Path]]) -> None:
+    """Удаляет файлы, освобождённые release(), — вызывать после commit."""
+    for path in paths:
+        if path is None:
+            continue
+        digest = digest_of(root, str(path))
+        if digest is None:
+            _unlink_quietly(path)
+            continue
+        with _blob_lock(root, digest):
+            # blob мог снова понадобиться, пока мы коммитили
+            if db.query(FileBlob.sha256).filter(FileBlob.sha256 == digest).first() is None:
+                _unlink_quietly(path)
+
+
+def _unlink_quietly(path: Path) -> None:
+    try:
+        path.unlink(missing_ok=True)
+    except OSError:
+        # не критично — просто логируем/игнорим
+        pass
@@ -0,0 +1,95 @@
+from typing import Iterable, Optional
+
+from sqlalchemy import select, update
+from sqlalchemy.exc import IntegrityError, OperationalError
+from sqlalchemy.orm import Session
+
+from app.models.dashboard_snapshot import DashboardSnapshot, DashboardSnapshotGeneration
+from app.models.student import Student
+
+_GENERATION_ID = 1
+
+
+def load_snapshot(db: Session, student_id: int, scope: str) -> Optional[str]:
+    snap = db.get(DashboardSnapshot, (student_id, scope))
+    return snap.payload if snap else None
+
+
+def snapshot_generation(db: Session, for_update: bool = False) -> int:
+    """Текущий счётчик инвалидаций; читать ДО запросов, из которых собирается снапшот."""
+    query = select(DashboardSnapshotGeneration.value).where(
+        DashboardSnapshotGeneration.id == _GENERATION_ID
+    )
+    if for_update:
+        query = query.with_for_update()
+    return db.execute(query).scalar() or 0
+
+
+def save_snapshot(db: Session, student_id: int, scope: str, payload: str, generation: int) -> None:
+    """
+    Сохраняет снапшот, собранный при счётчике generation. Если с тех пор прошла
+    инвалидация — не сохраняем (следующее чтение соберёт заново). Строка
+    счётчика блокируется до commit: инвалидация, начавшаяся после проверки,
+    ждёт нас и затем удаляет и этот снапшот.
+
+    Это запись во время чтения, поэтому любые конфликты (дубль, занятая
+    блокировка SQLite) просто пропускают сохранение.
+    """
+    try:
+        if snapshot_generation(db, for_update=True) != generation:
+            return
+        db.merge(DashboardSnapshot(student_id=student_id, scope=scope, payload=payload))
+        db.commit()
+    except (IntegrityError, OperationalError):
+        # другой воркер успел записать тот же снапшот или база занята записью
+        db.rollback()
+
+
+# ---------- INVALIDATION ----------
+# Вызываются из write-путей ДО их commit, поэтому удаление снапшотов
+# попадает в ту же транзакцию, что и само изменение данных. Сначала
+# увеличиваем счётчик (блокирует его строку), потом удаляем снапшоты.
+
+
+def _bump_generation(db: Session) -> None:
+    bump = (
+        update(DashboardSnapshotGeneration)
+        .where(DashboardSnapshotGeneration.id == _GENERATION_ID)
+        .values(value=DashboardSnapshotGeneration.value + 1)
+    )
+    if db.execute(bump).rowcount:
+        return
+    try:
+        with db.begin_nested():
+            db.add(DashboardSnapshotGeneration(id=_GENERATION_ID, value=1))
+    except IntegrityError:
+        # строку только что создал параллельный запрос
+        db.execute(bump)
+
+
+def invalidate_students(db: Session, student_ids: Iterable[int]) -> None:
+    ids = {sid for sid in student_ids if sid is not None}
+    if not ids:
+        return
+    _bump_generation(db)
+    db.query(DashboardSnapshot).filter(
+        DashboardSnapshot.student_id.in_(ids)
+    ).delete(synchronize_session=False)
+
+
+def invalidate_teams(db: Session, team_ids: Iterable[int]) -> None:
+    ids = {tid for tid in team_ids if tid is not None}
+    if not ids:
+        return
+    _bump_generation(db)
+    members = db.query(Student.id).filter(Student.team_id.in_(ids))
+    db.query(DashboardSnapshot).filter(
+        DashboardSnapshot.student_id.in_(members.scalar_subquery())
+    ).delete(synchronize_session=False)
+
+
+def invalidate_all(db: Session) -> None:
+    # команды и студенты видны в дашборде каждого студента,
+    # поэтому их изменения сбрасывают все снапшоты
+    _bump_generation(db)
+    db.query(DashboardSnapshot).delete(synchronize_session=False)
@@ -0,0 +1,83 @@
+from email.utils import formatdate, parsedate_to_datetime
+from pathlib import Path
+from typing import Optional
+from urllib.parse import quote
+
+from fastapi import Request, Response
+from fastapi.responses import FileResponse
+from starlette.datastructures import Headers
+
+from app.core.config import app_settings
+
+
+def _etag_matches(if_none_match: str, etag: str) -> bool:
+    # для GET сравнение слабое: W/"x" совпадает с "x"
+    wanted = etag.removeprefix("W/")
+    for candidate in if_none_match.split(","):
+        candidate = candidate.strip()
+        if candidate == "*" or candidate.removeprefix("W/") == wanted:
+            return True
+    return False
+
+
+def is_not_modified(headers: Headers, etag: str, mtime: float) -> bool:
+    if_none_match = headers.get("if-none-match")
+    if if_none_match is not None:
+        # при наличии If-None-Match заголовок If-Modified-Since игнорируется (RFC 9110)
+        return _etag_matches(if_none_match, etag)
+
+    if_modified_since = headers.get("if-modified-since")
+    if if_modified_since:
+        try:
+            since = parsedate_to_datetime(if_modified_since).timestamp()
+        except (TypeError, ValueError):
+            return False
+        return int(mtime) <= since
+    return False
+
+
+def conditional_file_response(
+    request: Request,
+    path: Path,
+    *,
+    filename: str,
+    media_type: str,
+    digest: Optional[str] = None,
+    inline: bool = False,
+) -> Response:
+    """
+    Отдаёт файл с ETag / Last-Modified и отвечает 304 на If-None-Match /
+    If-Modified-Since. Range и If-Range обрабатывает FileResponse.
+
+    digest — sha256 содержимого (для blob-хранилища), из него строится
+    сильный ETag; для старых файлов ETag строится из mtime и размера.
+    Если задан FILE_ACCEL_REDIRECT_PREFIX, тело отдаёт nginx через
+    X-Accel-Redirect (sendfile), а приложение шлёт только заголовки.
+    """
+    st = path.stat()
+    etag = f'"{digest}"' if digest else f'"{st.st_mtime_ns:x}-{st.st_size:x}"'
+    disposition_type = "inline" if inline else "attachment"
+    headers = {
+        "ETag": etag,
+        "Last-Modified": formatdate(st.st_mtime, usegmt=True),
+        # URL один, а файл за ним может смениться — каждый раз ревалидируем
+        "Cache-Control": "private, no-cache",
+    }
+
+    if is_not_modified(request.headers, etag, st.st_mtime):
+        return Response(status_code=304, headers=headers)
+
+    accel_prefix = app_settings.FILE_ACCEL_REDIRECT_PREFIX
+    if accel_prefix:
+        headers["X-Accel-Redirect"] = f"{accel_prefix.rstrip('/')}/{quote(path.as_posix())}"
+        headers["Content-Disposition"] = f'{disposition_type}; filename="{filename}"'
+        return Response(media_type=media_type, headers=headers)
+
+    return FileResponse(
+        path,
+        media_type=media_type,
+        filename=filename,
+        headers=headers,
+        stat_result=st,
+        content_disposition_type=disposition_type,
+    )
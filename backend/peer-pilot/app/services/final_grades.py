@@ -0,0 +1,208 @@
+"""
+Итоговые оценки по всему потоку одним векторным проходом (NumPy).
+
+Баллы проекта грузятся в тензор students × sprints × letters (NaN — нет
+оценки). Слои накладываются по приоритету: индивидуальная Grade, затем
+TeamGrade команды студента, затем для буквы R — средний review_grade ревью,
+написанных командой за спринт. Дальше — средние по буквам, взвешенная
+итоговая, бонусные буквы и полосы (A/B/C/D). Загрузка отделена от расчёта:
+what-if по весам и правкам оценок пересчитывает уже загруженный тензор.
+"""
+from dataclasses import dataclass, field, replace
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple
+
+import numpy as np
+from sqlalchemy import func, select
+from sqlalchemy.orm import Session
+
+from app.core.config import app_settings
+from app.models.grade import AssignmentLetterEnum, Grade
+from app.models.peer_review import PeerReview
+from app.models.student import Student
+from app.models.team import Team
+from app.models.team_grade import TeamGrade
+
+LETTERS: List[AssignmentLetterEnum] = list(AssignmentLetterEnum)
+_LETTER_INDEX = {letter: i for i, letter in enumerate(LETTERS)}
+_REVIEW_LETTER = _LETTER_INDEX[AssignmentLetterEnum.R]
+
+
+@dataclass
+class GradingPolicy:
+    # вес буквы в итоговой; буквы без оценок в потоке из нормировки выпадают
+    weights: Dict[AssignmentLetterEnum, float]
+    # бонусные буквы: сумма баллов за все спринты прибавляется к итоговой
+    bonus_letters: Tuple[AssignmentLetterEnum, ...] = ()
+    # (полоса, минимальный балл) по убыванию порога; ниже всех — последняя полоса
+    bands: Sequence[Tuple[str, float]] = (("A", 90), ("B", 75), ("C", 60), ("D", 0))
+    max_score: float = 100
+
+    def __post_init__(self):
+        if not self.bands:
+            raise ValueError("Grading policy needs at least one band")
+        # searchsorted ниже опирается на порядок — из настроек он не гарантирован
+        self.bands = tuple(sorted(self.bands, key=lambda band: -band[1]))
+
+    @classmethod
+    def from_settings(cls) -> "GradingPolicy":
+        return cls(
+            weights={AssignmentLetterEnum(k): v for k, v in app_settings.FINAL_GRADE_WEIGHTS.items()},
+            bonus_letters=tuple(AssignmentLetterEnum(k) for k in app_settings.FINAL_GRADE_BONUS_LETTERS),
+            bands=tuple(app_settings.FINAL_GRADE_BANDS.items()),
+        )
+
+
+@dataclass
+class Cohort:
+    student_ids: np.ndarray  # (n,) int, по возрастанию
+    team_ids: np.ndarray  # (n,) int, -1 — без команды
+    scores: np.ndarray  # (n, sprints, letters) float, NaN — нет оценки
+
+
+@dataclass
+class FinalGrades:
+    student_ids: np.ndarray
+    team_ids: np.ndarray
+    letter_averages: np.ndarray  # (n, letters), NaN — буква в потоке не оценивалась
+    final: np.ndarray  # (n,)
+    bands: List[str] = field(default_factory=list)
+
+
+def _scatter_mean(shape, index: Tuple[np.ndarray, ...], values: np.ndarray) -> np.ndarray:
+    """Среднее значений с совпадающим индексом; NaN там, где значений нет."""
+    total = np.zeros(shape)
+    count = np.zeros(shape)
+    np.add.at(total, index, values)
+    np.add.at(count, index, 1)
+    with np.errstate(invalid="ignore", divide="ignore"):
+        return np.where(count > 0, total / count, np.nan)
+
+
+def _columns(rows: Sequence[tuple], width: int) -> List[np.ndarray]:
+    if not rows:
+        return [np.empty(0) for _ in range(width)]
+    # object для enum-букв: str-enum numpy сам приводит к строкам неверно
+    return [
+        np.asarray(column, dtype=object if isinstance(column[0], AssignmentLetterEnum) else None)
+        for column in zip(*rows)
+    ]
+
+
+def load_cohort(db: Session, project_id: Optional[int] = None) -> Cohort:
+    """Четыре запроса по колонкам (без ORM-объектов), дальше всё в массивах."""
+    students = select(Student.id, func.coalesce(Student.team_id, -1)).order_by(Student.id)
+    team_grades = select(TeamGrade.team_id, TeamGrade.sprint, TeamGrade.assignment, TeamGrade.score)
+    reviews = select(PeerReview.reviewing_team_id, PeerReview.sprint, PeerReview.review_grade).where(
+        PeerReview.review_grade.is_not(None)
+    )
+    grades = select(Grade.student_id, Grade.sprint, Grade.assignment, Grade.score)
+    if project_id is not None:
+        project_teams = select(Team.id).where(Team.project_id == project_id)
+        students = students.where(Student.team_id.in_(project_teams))
+        team_grades = team_grades.where(TeamGrade.team_id.in_(project_teams))
+        reviews = reviews.where(PeerReview.reviewing_team_id.in_(project_teams))
+        grades = grades.join(Student, Student.id == Grade.student_id).where(
+            Student.team_id.in_(project_teams)
+        )
+
+    student_rows = db.execute(students).all()
+    student_ids, team_ids = (np.asarray(c, dtype=np.int64) for c in _columns(student_rows, 2))
+    g_student, g_sprint, g_letter, g_score = _columns(db.execute(grades).all(), 4)
+    t_team, t_sprint, t_letter, t_score = _columns(db.execute(team_grades).all(), 4)
+    r_team, r_sprint, r_score = _columns(db.execute(reviews).all(), 3)
+
+    sprints = int(max([0, *(a.max() for a in (g_sprint, t_sprint, r_sprint) if a.size)]))
+    n = len(student_ids)
+    scores = np.full((n, sprints, len(LETTERS)), np.nan)
+    if not n or not sprints:
+        return Cohort(student_ids, team_ids, scores)
+
+    def letter_index(letters: np.ndarray) -> np.ndarray:
+        return np.fromiter((_LETTER_INDEX[x] for x in letters), dtype=np.int64, count=len(letters))
+
+    # команды -> плотные индексы; «команда» -1 (без команды) оценок не получает
+    teams, student_team = np.unique(team_ids, return_inverse=True)
+    team_layer = np.full((len(teams), sprints, len(LETTERS)), np.nan)
+
+    def team_index(ids: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+        pos = np.searchsorted(teams, ids)
+        known = (pos < len(teams)) & (teams[np.minimum(pos, len(teams) - 1)] == ids)
+        return pos, known
+
+    if t_team.size:
+        pos, known = team_index(t_team.astype(np.int64))
+        team_layer[pos[known], t_sprint[known] - 1, letter_index(t_letter)[known]] = t_score[known]
+    if r_team.size:
+        pos, known = team_index(r_team.astype(np.int64))
+        review = _scatter_mean(
+            (len(teams), sprints), (pos[known], r_sprint[known] - 1), r_score[known].astype(float)
+        )
+        slot = team_layer[:, :, _REVIEW_LETTER]
+        team_layer[:, :, _REVIEW_LETTER] = np.where(np.isnan(slot), review, slot)
+
+    scores[:] = team_layer[student_team]
+    if g_student.size:
+        rows = np.searchsorted(student_ids, g_student.astype(np.int64))
+        scores[rows, g_sprint - 1, letter_index(g_letter)] = g_score
+    return Cohort(student_ids, team_ids, scores)
+
+
+def apply_overrides(
+    cohort: Cohort, overrides: Iterable[Tuple[int, int, AssignmentLetterEnum, Optional[float]]]
+) -> Cohort:
+    """What-if: копия потока с правками (student_id, sprint, letter, score|None)."""
+    overrides = list(overrides)
+    if not overrides:
+        return cohort
+    sprints = max(cohort.scores.shape[1], max(sprint for _, sprint, _, _ in overrides))
+    scores = np.full((len(cohort.student_ids), sprints, len(LETTERS)), np.nan)
+    scores[:, : cohort.scores.shape[1]] = cohort.scores
+
+    ids = np.asarray([o[0] for o in overrides], dtype=np.int64)
+    rows = np.searchsorted(cohort.student_ids, ids)
+    known = (rows < len(cohort.student_ids)) & (
+        cohort.student_ids[np.minimum(rows, len(cohort.student_ids) - 1)] == ids
+    ) if len(cohort.student_ids) else np.zeros(len(ids), dtype=bool)
+    sprint_idx = np.asarray([o[1] - 1 for o in overrides])
+    letter_idx = np.asarray([_LETTER_INDEX[AssignmentLetterEnum(o[2])] for o in overrides])
+    values = np.asarray([np.nan if o[3] is None else o[3] for o in overrides], dtype=float)
+    scores[rows[known], sprint_idx[known], letter_idx[known]] = values[known]
+    return replace(cohort, scores=scores)
+
+
+def compute_final_grades(cohort: Cohort, policy: GradingPolicy) -> FinalGrades:
+    scores = cohort.scores
+    n = len(cohort.student_ids)
+
+    # колонка (спринт, буква) считается, если в ней есть хоть одна оценка;
+    # пропуск студента в такой колонке — 0, неоцененные спринты не тянут вниз
+    graded = ~np.all(np.isnan(scores), axis=0) if n else np.zeros(scores.shape[1:], dtype=bool)
+    filled = np.where(graded, np.nan_to_num(scores, nan=0.0), 0.0)
+    graded_count = graded.sum(axis=0)  # (letters,)
+    with np.errstate(invalid="ignore", divide="ignore"):
+        averages = np.where(graded_count > 0, filled.sum(axis=1) / graded_count, np.nan)
+
+    bonus = np.zeros(len(LETTERS), dtype=bool)
+    bonus[[_LETTER_INDEX[b] for b in policy.bonus_letters]] = True
+    weights = np.asarray([policy.weights.get(letter, 0.0) for letter in LETTERS], dtype=float)
+    weights[bonus | (graded_count == 0)] = 0.0
+
+    final = np.zeros(n)
+    if weights.sum() > 0:
+        final = np.nan_to_num(averages) @ weights / weights.sum()
+    final = final + filled[:, :, bonus].sum(axis=(1, 2))
+    final = np.clip(final, 0, policy.max_score)
+
+    names = [name for name, _ in policy.bands]
+    # пороги по возрастанию для searchsorted: индекс = число пройденных порогов
+    thresholds = np.asarray([threshold for _, threshold in policy.bands][::-1], dtype=float)
+    band_idx = len(names) - np.searchsorted(thresholds, final, side="right")
+    band_idx = np.clip(band_idx, 0, len(names) - 1)
+
+    return FinalGrades(
+        student_ids=cohort.student_ids,
+        team_ids=cohort.team_ids,
+        letter_averages=averages,
+        final=final,
+        bands=[names[i] for i in band_idx],
+    )
@@ -0,0 +1,123 @@
+"""
+Перенос командных оценок в индивидуальные: каждая оценка team_grades
+проекта за спринт копируется всем участникам команды одним
+INSERT ... SELECT ... ON CONFLICT (student_id, sprint, assignment) DO UPDATE.
+
+Операция идемпотентна — повторный запуск перезаписывает те же ключи теми же
+баллами. Индивидуальные правки (overrides) применяются после переноса и
+перекрывают командный балл; при повторном запуске без них снова будет
+командный балл.
+"""
+from dataclasses import dataclass
+from typing import Iterable, Tuple
+
+from sqlalchemy import String, and_, cast, select
+from sqlalchemy.orm import Session
+
+from app.models.grade import AssignmentLetterEnum, Grade
+from app.models.student import Student
+from app.models.team import Team
+from app.models.team_grade import TeamGrade
+from app.services.dashboard_snapshots import invalidate_students
+from app.services.grade_stats import STUDENT_SCOPE, apply_grade_stat_deltas
+from app.services.grade_store import (
+    GRADE_NATURAL_KEY,
+    grade_key,
+    grade_scores,
+    upsert_grade_rows,
+    upsert_insert,
+)
+
+# (student_id, assignment, score) — правка для спринта переноса
+FanOutOverride = Tuple[int, AssignmentLetterEnum, int]
+
+
+class FanOutError(ValueError):
+    pass
+
+
+@dataclass
+class FanOutResult:
+    students: int
+    written: int
+    overridden: int
+
+
+def _project_students(project_id: int):
+    return (
+        select(Student.id)
+        .join(Team, Team.id == Student.team_id)
+        .where(Team.project_id == project_id)
+    )
+
+
+def fan_out_source(project_id: int, sprint: int):
+    """(student_id, sprint, assignment, score) командных оценок для каждого участника."""
+    grades = Grade.__table__
+    return (
+        select(
+            Student.id.label("student_id"),
+            TeamGrade.sprint.label("sprint"),
+            # у team_grades свой enum-тип — в PostgreSQL через строку
+            cast(cast(TeamGrade.assignment, String), grades.c.assignment.type).label("assignment"),
+            TeamGrade.score.label("score"),
+        )
+        .join(Student, Student.team_id == TeamGrade.team_id)
+        .join(Team, Team.id == TeamGrade.team_id)
+        .where(Team.project_id == project_id, TeamGrade.sprint == sprint)
+    )
+
+
+def fan_out_team_grades(
+    db: Session,
+    project_id: int,
+    sprint: int,
+    overrides: Iterable[FanOutOverride] = (),
+) -> FanOutResult:
+    """Переносит оценки и обновляет grade_stats / снапшоты; commit — за вызывающим."""
+    overrides = list(overrides)
+    student_ids = set(db.scalars(_project_students(project_id)))
+    outsiders = {student_id for student_id, _, _ in overrides} - student_ids
+    if outsiders:
+        raise FanOutError(f"Student {min(outsiders)} is not in project {project_id}")
+
+    grades = Grade.__table__
+    source = fan_out_source(project_id, sprint)
+    src = source.subquery()
+
+    # старые баллы перезаписываемых ключей — для дельт статистики
+    previous = db.execute(
+        select(grades.c.sprint, grades.c.assignment, grades.c.score).join(
+            src,
+            and_(*(grades.c[name] == src.c[name] for name in GRADE_NATURAL_KEY)),
+        )
+    ).all()
+
+    stmt = upsert_insert(db, grades).from_select(
+        ["student_id", "sprint", "assignment", "score"], source
+    )
+    stmt = stmt.on_conflict_do_update(
+        index_elements=[grades.c[name] for name in GRADE_NATURAL_KEY],
+        set_={"score": stmt.excluded.score},
+    ).returning(grades.c.sprint, grades.c.assignment, grades.c.score)
+    written = db.execute(stmt).all()
+    apply_grade_stat_deltas(db, STUDENT_SCOPE, removed=previous, added=written)
+
+    if overrides:
+        rows = [
+            {"student_id": student_id, "sprint": sprint, "assignment": letter, "score": score}
+            for student_id, letter, score in overrides
+        ]
+        before = grade_scores(db, [grade_key(r["student_id"], sprint, r["assignment"]) for r in rows])
+        saved = upsert_grade_rows(db, rows)
+        apply_grade_stat_deltas(
+            db,
+            STUDENT_SCOPE,
+            removed=[(s, letter, score) for (_, s, letter), score in before.items()],
+            added=[(row.sprint, row.assignment, row.score) for row in saved.values()],
+        )
+    else:
+        saved = {}
+
+    invalidate_students(db, student_ids)
+    return FanOutResult(students=len(student_ids), written=len(written), overridden=len(saved))
@@ -0,0 +1,60 @@
+"""
+Журнал оценок в колоночном виде: студенты × (спринт, буква).
+
+Вместо объекта на каждую оценку — список студентов, список колонок и плотная
+матрица баллов (None — нет оценки). Строится из одного упорядоченного запроса.
+"""
+from dataclasses import dataclass
+from typing import Dict, List, Optional, Tuple
+
+from sqlalchemy import select
+from sqlalchemy.orm import Session
+
+from app.models.grade import AssignmentLetterEnum, Grade
+from app.models.student import Student
+from app.models.team import Team
+
+# порядок букв — как в журнале на фронте (A, R, I, C, TE, E)
+_LETTER_ORDER = {letter: i for i, letter in enumerate(AssignmentLetterEnum)}
+
+
+@dataclass
+class GradeMatrix:
+    student_ids: List[int]
+    columns: List[Tuple[int, AssignmentLetterEnum]]
+    scores: List[List[Optional[int]]]
+
+
+def matrix_query(project_id: Optional[int] = None, team_id: Optional[int] = None):
+    """Студенты LEFT JOIN grades; студенты без оценок тоже дают строку матрицы."""
+    query = (
+        select(Student.id, Grade.sprint, Grade.assignment, Grade.score)
+        .select_from(Student)
+        .outerjoin(Grade, Grade.student_id == Student.id)
+        .order_by(Student.id)
+    )
+    if project_id is not None:
+        query = query.join(Team, Team.id == Student.team_id).where(Team.project_id == project_id)
+    if team_id is not None:
+        query = query.where(Student.team_id == team_id)
+    return query
+
+
+def build_grade_matrix(
+    db: Session, project_id: Optional[int] = None, team_id: Optional[int] = None
+) -> GradeMatrix:
+    student_ids: List[int] = []
+    cells: List[Tuple[int, Tuple[int, AssignmentLetterEnum], int]] = []
+    for student_id, sprint, assignment, score in db.execute(matrix_query(project_id, team_id)):
+        if not student_ids or student_ids[-1] != student_id:
+            student_ids.append(student_id)
+        if sprint is not None:
+            cells.append((len(student_ids) - 1, (sprint, assignment), score))
+
+    columns = sorted({column for _, column, _ in cells}, key=lambda c: (c[0], _LETTER_ORDER[c[1]]))
+    position: Dict[Tuple[int, AssignmentLetterEnum], int] = {c: i for i, c in enumerate(columns)}
+    scores: List[List[Optional[int]]] = [[None] * len(columns) for _ in student_ids]
+    for row, column, score in cells:
+        scores[row][position[column]] = score
+
+    return GradeMatrix(student_ids=student_ids, columns=columns, scores=scores)
@@ -0,0 +1,221 @@
+"""
+Статистика оценок по (sprint, assignment): среднее, разброс, перцентили
+и гистограмма без сканирования grades.
+
+Агрегаты лежат в grade_stats (по строке на корзину гистограммы) и
+обновляются дельтами в тех же транзакциях, что и сами оценки:
+apply_grade_stat_deltas(removed=старые баллы, added=новые). Если дельты
+где-то разошлись с данными — rebuild_grade_stats пересчитывает всё из
+grades / team_grades (фоновая задача, эндпоинт или
+`python -m app.services.grade_stats`).
+"""
+import math
+from dataclasses import dataclass
+from itertools import groupby
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from sqlalchemy import Engine, String, case, cast, func, insert, literal, select
+from sqlalchemy.orm import Session
+
+from app.models.grade import AssignmentLetterEnum, Grade
+from app.models.grade_stat import GradeStat
+from app.models.team_grade import TeamGrade
+from app.services.grade_store import upsert_insert
+from app.services.jobs import job_handler
+
+STUDENT_SCOPE = "student"
+TEAM_SCOPE = "team"
+
+# корзины по 10 баллов: 0-9, ..., 90-99 и последняя — 100 и выше (бонусы)
+BUCKET_WIDTH = 10
+BUCKET_COUNT = 11
+
+# (sprint, assignment, score)
+ScoreValue = Tuple[int, AssignmentLetterEnum, int]
+
+
+def bucket_of(score: int) -> int:
+    return min(max(int(score) // BUCKET_WIDTH, 0), BUCKET_COUNT - 1)
+
+
+def apply_grade_stat_deltas(
+    db: Session,
+    scope: str,
+    removed: Iterable[ScoreValue] = (),
+    added: Iterable[ScoreValue] = (),
+) -> None:
+    """Одним executemany прибавляет новые баллы и вычитает старые."""
+    deltas: Dict[Tuple[int, AssignmentLetterEnum, int], List[float]] = {}
+    for sign, values in ((-1, removed), (1, added)):
+        for sprint, assignment, score in values:
+            key = (sprint, AssignmentLetterEnum(assignment), bucket_of(score))
+            delta = deltas.setdefault(key, [0, 0.0, 0.0])
+            delta[0] += sign
+            delta[1] += sign * score
+            delta[2] += sign * score * score
+
+    rows = [
+        {
+            "scope": scope,
+            "sprint": sprint,
+            "assignment": assignment,
+            "bucket": bucket,
+            "count": count,
+            "total": total,
+            "total_sq": total_sq,
+        }
+        for (sprint, assignment, bucket), (count, total, total_sq) in deltas.items()
+        # перезапись тем же баллом ничего не меняет
+        if count or total or total_sq
+    ]
+    if not rows:
+        return
+
+    table = GradeStat.__table__
+    stmt = upsert_insert(db, table)
+    stmt = stmt.on_conflict_do_update(
+        index_elements=[table.c.scope, table.c.sprint, table.c.assignment, table.c.bucket],
+        set_={
+            "count": table.c.count + stmt.excluded.count,
+            "total": table.c.total + stmt.excluded.total,
+            "total_sq": table.c.total_sq + stmt.excluded.total_sq,
+        },
+    )
+    db.execute(stmt, rows)
+
+
+@dataclass
+class GradeStatSummary:
+    scope: str
+    sprint: int
+    assignment: AssignmentLetterEnum
+    count: int
+    mean: Optional[float]
+    stddev: Optional[float]
+    median: Optional[float]
+    p25: Optional[float]
+    p75: Optional[float]
+    p90: Optional[float]
+    histogram: List[int]
+
+
+def _percentile(histogram: List[int], bucket_means: List[float], q: float) -> Optional[float]:
+    """
+    Оценка перцентиля по гистограмме: линейная интерполяция внутри корзины,
+    для последней (открытой сверху) корзины — её среднее.
+    """
+    count = sum(histogram)
+    if count <= 0:
+        return None
+    rank = q * count
+    seen = 0
+    for bucket, in_bucket in enumerate(histogram):
+        if in_bucket <= 0:
+            continue
+        if seen + in_bucket >= rank:
+            if bucket == BUCKET_COUNT - 1:
+                return bucket_means[bucket]
+            return bucket * BUCKET_WIDTH + (rank - seen) / in_bucket * BUCKET_WIDTH
+        seen += in_bucket
+    return bucket_means[-1]
+
+
+def _summary(scope: str, sprint: int, assignment, rows: List[GradeStat]) -> GradeStatSummary:
+    histogram = [0] * BUCKET_COUNT
+    bucket_means = [0.0] * BUCKET_COUNT
+    total = total_sq = 0.0
+    for row in rows:
+        histogram[row.bucket] = row.count
+        bucket_means[row.bucket] = row.total / row.count if row.count else 0.0
+        total += row.total
+        total_sq += row.total_sq
+
+    count = sum(histogram)
+    mean = stddev = None
+    if count > 0:
+        mean = total / count
+        stddev = math.sqrt(max(total_sq / count - mean * mean, 0.0))
+    return GradeStatSummary(
+        scope=scope,
+        sprint=sprint,
+        assignment=assignment,
+        count=count,
+        mean=mean,
+        stddev=stddev,
+        median=_percentile(histogram, bucket_means, 0.5),
+        p25=_percentile(histogram, bucket_means, 0.25),
+        p75=_percentile(histogram, bucket_means, 0.75),
+        p90=_percentile(histogram, bucket_means, 0.9),
+        histogram=histogram,
+    )
+
+
+def grade_stat_summaries(
+    db: Session,
+    scope: Optional[str] = None,
+    sprint: Optional[int] = None,
+    assignment: Optional[AssignmentLetterEnum] = None,
+) -> List[GradeStatSummary]:
+    """Читает не больше BUCKET_COUNT строк на ключ — объём grades не важен."""
+    query = db.query(GradeStat)
+    if scope is not None:
+        query = query.filter(GradeStat.scope == scope)
+    if sprint is not None:
+        query = query.filter(GradeStat.sprint == sprint)
+    if assignment is not None:
+        query = query.filter(GradeStat.assignment == assignment)
+    rows = query.order_by(GradeStat.scope, GradeStat.sprint, GradeStat.assignment, GradeStat.bucket)
+
+    summaries = [
+        _summary(scope_, sprint_, assignment_, list(group))
+        for (scope_, sprint_, assignment_), group in groupby(
+            rows, key=lambda r: (r.scope, r.sprint, r.assignment)
+        )
+    ]
+    return [s for s in summaries if s.count > 0]
+
+
+def _bucket_expr(score):
+    return case(
+        (score < 0, 0),
+        (score >= (BUCKET_COUNT - 1) * BUCKET_WIDTH, BUCKET_COUNT - 1),
+        else_=score // BUCKET_WIDTH,
+    )
+
+
+@job_handler("rebuild_grade_stats")
+def rebuild_grade_stats(db: Session, payload: Optional[dict] = None) -> dict:
+    """Пересчёт grade_stats с нуля из grades и team_grades (INSERT ... SELECT)."""
+    db.query(GradeStat).delete(synchronize_session=False)
+    columns = ["scope", "sprint", "assignment", "bucket", "count", "total", "total_sq"]
+    for scope, model in ((STUDENT_SCOPE, Grade), (TEAM_SCOPE, TeamGrade)):
+        bucket = _bucket_expr(model.score)
+        source = select(
+            literal(scope),
+            model.sprint,
+            # у team_grades свой enum-тип — через строку приводим к типу grade_stats
+            cast(cast(model.assignment, String), GradeStat.__table__.c.assignment.type),
+            bucket,
+            func.count(),
+            func.sum(model.score),
+            func.sum(model.score * model.score),
+        ).group_by(model.sprint, model.assignment, bucket)
+        db.execute(insert(GradeStat).from_select(columns, source))
+    db.commit()
+    return {"rows": db.query(func.count(GradeStat.id)).scalar()}
+
+
+def ensure_grade_stats(engine: Engine) -> None:
+    """Первый запуск на базе с оценками: grade_stats только что создана и пуста."""
+    with Session(engine) as db:
+        if db.query(GradeStat.id).first() is not None:
+            return
+        if db.query(Grade.id).first() is not None or db.query(TeamGrade.id).first() is not None:
+            rebuild_grade_stats(db)
+
+
+if __name__ == "__main__":
+    from app.core.db import SessionLocal
+
+    with SessionLocal() as session:
+        print(rebuild_grade_stats(session))
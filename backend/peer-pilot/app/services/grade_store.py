@@ -0,0 +1,112 @@
+from typing import Dict, Iterable, List, Tuple
+
+from sqlalchemy import Engine, delete, func, inspect, select
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.engine import Row
+from sqlalchemy.orm import Session
+
+from app.models.grade import Grade
+
+# (student_id, sprint, assignment) — одна оценка на студента, спринт и букву
+GradeKey = Tuple[int, int, str]
+GRADE_NATURAL_KEY = ("student_id", "sprint", "assignment")
+GRADE_NATURAL_KEY_INDEX = "uq_grades_student_sprint_assignment"
+
+_UPSERT_DIALECTS = {
+    "postgresql": postgresql.insert,
+    "sqlite": sqlite.insert,
+}
+
+
+def upsert_insert(db: Session, table):
+    """insert() диалекта с on_conflict_do_update (SQLite / PostgreSQL)."""
+    dialect = db.get_bind().dialect.name
+    try:
+        return _UPSERT_DIALECTS[dialect](table)
+    except KeyError:
+        raise NotImplementedError(f"Upsert is not supported for {dialect}")
+
+
+def grade_key(student_id: int, sprint: int, assignment) -> GradeKey:
+    return student_id, sprint, getattr(assignment, "value", assignment)
+
+
+def upsert_grade_rows(db: Session, rows: Iterable[dict]) -> Dict[GradeKey, Row]:
+    """
+    INSERT ... ON CONFLICT (student_id, sprint, assignment) DO UPDATE SET score
+    ... RETURNING — весь список одним executemany. Повторы ключа во входе
+    схлопываются (побеждает последний). Возвращает {ключ: строка grades}.
+    """
+    by_key: Dict[GradeKey, dict] = {}
+    for row in rows:
+        by_key[grade_key(row["student_id"], row["sprint"], row["assignment"])] = row
+    if not by_key:
+        return {}
+
+    table = Grade.__table__
+    stmt = upsert_insert(db, table)
+    stmt = stmt.on_conflict_do_update(
+        index_elements=[table.c[name] for name in GRADE_NATURAL_KEY],
+        set_={"score": stmt.excluded.score},
+    ).returning(
+        table.c.id,
+        table.c.student_id,
+        table.c.sprint,
+        table.c.assignment,
+        table.c.score,
+    )
+
+    params: List[dict] = [
+        {
+            "student_id": row["student_id"],
+            "sprint": row["sprint"],
+            "assignment": row["assignment"],
+            "score": row["score"],
+        }
+        for row in by_key.values()
+    ]
+    # insertmanyvalues пачками склеивает строки в многострочный INSERT;
+    # порядок RETURNING не гарантирован, поэтому сопоставляем по ключу
+    return {
+        grade_key(row.student_id, row.sprint, row.assignment): row
+        for row in db.execute(stmt, params)
+    }
+
+
+def grade_scores(db: Session, keys: Iterable[GradeKey]) -> Dict[GradeKey, int]:
+    """Текущие баллы по ключам (для дельт статистики до перезаписи)."""
+    keys = set(keys)
+    if not keys:
+        return {}
+    rows = db.execute(
+        select(Grade.student_id, Grade.sprint, Grade.assignment, Grade.score).where(
+            Grade.student_id.in_({student_id for student_id, _, _ in keys})
+        )
+    )
+    scores = {}
+    for student_id, sprint, assignment, score in rows:
+        key = grade_key(student_id, sprint, assignment)
+        if key in keys:
+            scores[key] = score
+    return scores
+
+
+def ensure_grade_natural_key(engine: Engine) -> None:
+    """
+    create_all не трогает уже существующую таблицу: для старых баз удаляем
+    накопившиеся дубли (оставляем последнюю запись) и создаём unique-индекс.
+    """
+    with engine.begin() as conn:
+        existing = {ix["name"] for ix in inspect(conn).get_indexes(Grade.__tablename__)}
+        if GRADE_NATURAL_KEY_INDEX in existing:
+            return
+
+        keep = (
+            select(func.max(Grade.id))
+            .group_by(Grade.student_id, Grade.sprint, Grade.assignment)
+            .scalar_subquery()
+        )
+        conn.execute(delete(Grade).where(Grade.id.not_in(keep)))
+        next(
+            ix for ix in Grade.__table__.indexes if ix.name == GRADE_NATURAL_KEY_INDEX
+        ).create(conn)
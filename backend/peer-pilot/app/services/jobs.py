@@ -0,0 +1,307 @@
+"""
+Фоновые задачи: durable-очередь в таблице jobs и пул потоков-воркеров.
+
+Задача ставится через enqueue() в транзакции вызывающего кода и видна
+воркерам только после её commit. Воркеры есть в каждом процессе uvicorn;
+задачу забирает тот, чей условный UPDATE (status = queued -> running)
+сработал первым, поэтому одну задачу не выполнят дважды.
+
+Пустой опрос очереди — только SELECT'ы, без записи: на SQLite пишущие
+транзакции воркеров иначе конкурировали бы за блокировку с запросами API.
+Пока задача выполняется, воркер продлевает lease (locked_at) отдельным
+потоком, так что долгая задача не считается брошенной.
+"""
+import json
+import logging
+import os
+import socket
+import threading
+from datetime import datetime, timedelta
+from typing import Any, Callable, Dict, Optional
+
+from sqlalchemy import select, update
+from sqlalchemy.orm import Session
+
+from app.core.config import app_settings
+from app.models.job import Job, JobStatus
+
+logger = logging.getLogger(__name__)
+
+# handler(db, payload) -> JSON-совместимый результат (или None)
+JobHandler = Callable[[Session, Dict[str, Any]], Any]
+
+JOB_HANDLERS: Dict[str, JobHandler] = {}
+
+# будит локальные воркеры сразу после постановки задачи
+_wakeup = threading.Event()
+
+
+def job_handler(kind: str) -> Callable[[JobHandler], JobHandler]:
+    """Регистрирует обработчик задач типа kind (вызывается модулем-владельцем)."""
+
+    def register(func: JobHandler) -> JobHandler:
+        JOB_HANDLERS[kind] = func
+        return func
+
+    return register
+
+
+def enqueue(
+    db: Session,
+    kind: str,
+    payload: Optional[Dict[str, Any]] = None,
+    *,
+    dedupe_key: Optional[str] = None,
+    max_attempts: int = 3,
+) -> Job:
+    """
+    Добавляет задачу в текущую транзакцию; commit — за вызывающим кодом.
+    Если такая же (kind, dedupe_key) задача ещё ждёт в очереди, возвращает её.
+    """
+    if dedupe_key is not None:
+        existing = (
+            db.query(Job)
+            .filter(
+                Job.kind == kind,
+                Job.dedupe_key == dedupe_key,
+                Job.status == JobStatus.QUEUED,
+            )
+            .first()
+        )
+        if existing is not None:
+            return existing
+
+    job = Job(
+        kind=kind,
+        payload=json.dumps(payload or {}),
+        dedupe_key=dedupe_key,
+        max_attempts=max_attempts,
+        run_after=datetime.utcnow(),
+    )
+    db.add(job)
+    db.flush()
+    return job
+
+
+def notify_workers() -> None:
+    """Вызывать после commit, в котором была поставлена задача."""
+    _wakeup.set()
+
+
+def _requeue_stale(db: Session, now: datetime) -> bool:
+    # воркер, взявший задачу, умер (рестарт процесса) — отдаём её снова
+    deadline = now - timedelta(seconds=app_settings.JOB_LEASE_SECONDS)
+    stale = (Job.status == JobStatus.RUNNING, Job.locked_at < deadline)
+    # почти всегда зависших нет — сначала дешёвый SELECT, UPDATE только по факту
+    if db.execute(select(Job.id).where(*stale).limit(1)).first() is None:
+        return False
+    db.execute(
+        update(Job)
+        .where(*stale, Job.attempts < Job.max_attempts)
+        .values(status=JobStatus.QUEUED, locked_by=None, locked_at=None, run_after=now)
+    )
+    db.execute(
+        update(Job)
+        .where(*stale, Job.attempts >= Job.max_attempts)
+        .values(status=JobStatus.FAILED, error="Worker lease expired", finished_at=now)
+    )
+    return True
+
+
+def claim_next(db: Session, worker_id: str) -> Optional[Job]:
+    now = datetime.utcnow()
+    if _requeue_stale(db, now):
+        db.commit()
+
+    while True:
+        job_id = (
+            db.query(Job.id)
+            .filter(Job.status == JobStatus.QUEUED, Job.run_after <= now)
+            .order_by(Job.id)
+            .limit(1)
+            .scalar()
+        )
+        if job_id is None:
+            db.commit()
+            return None
+
+        claimed = db.execute(
+            update(Job)
+            .where(Job.id == job_id, Job.status == JobStatus.QUEUED)
+            .values(
+                status=JobStatus.RUNNING,
+                locked_by=worker_id,
+                locked_at=now,
+                attempts=Job.attempts + 1,
+            )
+        ).rowcount
+        db.commit()
+        if claimed:
+            return db.get(Job, job_id)
+        # задачу перехватил другой воркер — берём следующую
+
+
+def _finish(db: Session, job_id: int, worker_id: str, **values) -> None:
+    # пишем результат, только если задача всё ещё наша (не отдана по lease)
+    db.execute(
+        update(Job)
+        .where(Job.id == job_id, Job.locked_by == worker_id, Job.status == JobStatus.RUNNING)
+        .values(**values)
+    )
+    db.commit()
+
+
+def heartbeat_interval() -> float:
+    return max(app_settings.JOB_LEASE_SECONDS / 3, 0.05)
+
+
+class _LeaseHeartbeat:
+    """
+    Поток, который каждые heartbeat_interval() секунд обновляет locked_at
+    задачи своей сессией (сессию обработчика из другого потока трогать нельзя).
+    """
+
+    def __init__(self, session_factory: Callable[[], Session], job_id: int, worker_id: str):
+        self.session_factory = session_factory
+        self.job_id = job_id
+        self.worker_id = worker_id
+        self._stop = threading.Event()
+        self._thread = threading.Thread(
+            target=self._loop, name=f"job-heartbeat-{job_id}", daemon=True
+        )
+
+    def __enter__(self) -> "_LeaseHeartbeat":
+        self._thread.start()
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self._stop.set()
+        self._thread.join()
+
+    def _loop(self) -> None:
+        while not self._stop.wait(heartbeat_interval()):
+            db = self.session_factory()
+            try:
+                db.execute(
+                    update(Job)
+                    .where(
+                        Job.id == self.job_id,
+                        Job.locked_by == self.worker_id,
+                        Job.status == JobStatus.RUNNING,
+                    )
+                    .values(locked_at=datetime.utcnow())
+                )
+                db.commit()
+            except Exception:
+                # пропущенное продление не страшно, пока lease не истёк
+                logger.exception("Lease heartbeat for job %s failed", self.job_id)
+            finally:
+                db.close()
+
+
+def run_job(
+    db: Session,
+    job: Job,
+    worker_id: str,
+    session_factory: Optional[Callable[[], Session]] = None,
+) -> None:
+    """
+    Выполняет задачу. С session_factory (воркеры JobRunner) lease продлевается
+    во время работы обработчика; без неё (run_pending) — нет.
+    """
+    job_id, kind = job.id, job.kind
+    attempts, max_attempts = job.attempts, job.max_attempts
+    payload = json.loads(job.payload or "{}")
+
+    try:
+        handler = JOB_HANDLERS.get(kind)
+        if handler is None:
+            raise LookupError(f"No handler for job kind {kind!r}")
+        if session_factory is None:
+            result = handler(db, payload)
+        else:
+            with _LeaseHeartbeat(session_factory, job_id, worker_id):
+                result = handler(db, payload)
+    except Exception as exc:
+        db.rollback()
+        logger.exception("Job %s (%s) failed, attempt %s/%s", job_id, kind, attempts, max_attempts)
+        now = datetime.utcnow()
+        error = f"{type(exc).__name__}: {exc}"
+        if attempts < max_attempts:
+            backoff = app_settings.JOB_RETRY_BACKOFF_SECONDS * 2 ** (attempts - 1)
+            _finish(
+                db, job_id, worker_id,
+                status=JobStatus.QUEUED, error=error, locked_by=None, locked_at=None,
+                run_after=now + timedelta(seconds=backoff),
+            )
+        else:
+            _finish(db, job_id, worker_id, status=JobStatus.FAILED, error=error, finished_at=now)
+        return
+
+    _finish(
+        db, job_id, worker_id,
+        status=JobStatus.SUCCEEDED,
+        result=json.dumps(result) if result is not None else None,
+        error=None,
+        finished_at=datetime.utcnow(),
+    )
+
+
+def run_next(
+    db: Session,
+    worker_id: str,
+    session_factory: Optional[Callable[[], Session]] = None,
+) -> Optional[Job]:
+    job = claim_next(db, worker_id)
+    if job is not None:
+        run_job(db, job, worker_id, session_factory)
+    return job
+
+
+def run_pending(db: Session, worker_id: str = "inline") -> int:
+    """Выполняет все готовые задачи в текущем потоке (тесты, CLI). Возвращает их число."""
+    done = 0
+    while run_next(db, worker_id) is not None:
+        done += 1
+    return done
+
+
+class JobRunner:
+    """Потоки-воркеры одного процесса; в каждом процессе uvicorn — свой пул."""
+
+    def __init__(self, session_factory: Callable[[], Session], threads: int, poll_interval: float):
+        self.session_factory = session_factory
+        self.threads = threads
+        self.poll_interval = poll_interval
+        self._stop = threading.Event()
+        self._workers: list[threading.Thread] = []
+
+    def start(self) -> None:
+        for i in range(self.threads):
+            worker = threading.Thread(target=self._loop, name=f"job-worker-{i}", daemon=True)
+            worker.start()
+            self._workers.append(worker)
+
+    def stop(self, timeout: float = 5.0) -> None:
+        self._stop.set()
+        _wakeup.set()
+        for worker in self._workers:
+            worker.join(timeout)
+        self._workers.clear()
+
+    def _loop(self) -> None:
+        worker_id = f"{socket.gethostname()}:{os.getpid()}:{threading.current_thread().name}"
+        while not self._stop.is_set():
+            db = self.session_factory()
+            try:
+                job = run_next(db, worker_id, self.session_factory)
+            except Exception:
+                # например, "database is locked" — попробуем на следующем круге
+                logger.exception("Job worker %s iteration failed", worker_id)
+                job = None
+            finally:
+                db.close()
+
+            if job is None:
+                _wakeup.wait(self.poll_interval)
+                _wakeup.clear()
@@ -0,0 +1,190 @@
+"""
+Экспорт журнала в CSV для импорта оценок в Moodle.
+
+Одна строка на студента: идентификация (email — ключ сопоставления в Moodle)
+и по колонке на каждую пару (спринт, буква). Индивидуальная оценка студента
+перекрывает оценку его команды за ту же пару.
+"""
+import csv
+import io
+import os
+import tempfile
+import time
+from itertools import groupby
+from pathlib import Path
+from typing import Iterator, List, Optional, Tuple
+
+from sqlalchemy import Integer, String, cast, literal, select, union_all
+from sqlalchemy.engine import Connection, Engine
+from sqlalchemy.orm import Session
+
+from app.models.grade import Grade
+from app.models.student import Student
+from app.models.team import Team
+from app.models.team_grade import TeamGrade
+
+MOODLE_IDENTITY_COLUMNS = ["Full name", "Email address", "Team"]
+
+# строк из курсора за один fetch и строк CSV в одном отправляемом куске
+EXPORT_FETCH_SIZE = 1000
+EXPORT_CHUNK_ROWS = 200
+
+
+def moodle_column(sprint: int, letter: str) -> str:
+    return f"Sprint {sprint} {letter}"
+
+
+def _project_students(project_id: Optional[int]):
+    query = select(Student.id)
+    if project_id is not None:
+        query = query.join(Team, Team.id == Student.team_id).where(Team.project_id == project_id)
+    return query
+
+
+def _grade_source(project_id: Optional[int], sprint: Optional[int]):
+    """(student_id, sprint, assignment, score, individual) из grades и team_grades."""
+    individual = select(
+        Grade.student_id.label("student_id"),
+        Grade.sprint.label("sprint"),
+        # у grades и team_grades разные enum-типы — в UNION сводим к строке
+        cast(Grade.assignment, String).label("assignment"),
+        Grade.score.label("score"),
+        literal(1, Integer).label("individual"),
+    )
+    team = select(
+        Student.id,
+        TeamGrade.sprint,
+        cast(TeamGrade.assignment, String),
+        TeamGrade.score,
+        literal(0, Integer),
+    ).join(Student, Student.team_id == TeamGrade.team_id)
+
+    if project_id is not None:
+        individual = individual.where(Grade.student_id.in_(_project_students(project_id)))
+        team = team.join(Team, Team.id == TeamGrade.team_id).where(Team.project_id == project_id)
+    if sprint is not None:
+        individual = individual.where(Grade.sprint == sprint)
+        team = team.where(TeamGrade.sprint == sprint)
+    return individual, team
+
+
+def grade_columns(
+    session: Session, project_id: Optional[int] = None, sprint: Optional[int] = None
+) -> List[Tuple[int, str]]:
+    """Отсортированные пары (спринт, буква), по которым есть хоть одна оценка."""
+    grades = union_all(*_grade_source(project_id, sprint)).subquery()
+    pairs = select(grades.c.sprint, grades.c.assignment).distinct()
+    return sorted(tuple(row) for row in session.execute(pairs))
+
+
+def export_query(project_id: Optional[int] = None, sprint: Optional[int] = None):
+    """
+    Один запрос на весь экспорт: студенты LEFT JOIN оценки, отсортированные
+    по студенту — строки одного студента идут подряд и сворачиваются на лету.
+    """
+    grades = union_all(*_grade_source(project_id, sprint)).subquery()
+    query = (
+        select(
+            Student.id.label("student_id"),
+            Student.name,
+            Student.email,
+            Team.name.label("team_name"),
+            grades.c.sprint,
+            grades.c.assignment,
+            grades.c.score,
+        )
+        .select_from(Student)
+        .outerjoin(Team, Team.id == Student.team_id)
+        .outerjoin(grades, grades.c.student_id == Student.id)
+        # командная оценка раньше индивидуальной — индивидуальная её перезапишет
+        .order_by(Student.id, grades.c.individual)
+    )
+    if project_id is not None:
+        query = query.where(Team.project_id == project_id)
+    return query
+
+
+def stream_moodle_csv(
+    bind: Engine | Connection,
+    project_id: Optional[int] = None,
+    sprint: Optional[int] = None,
+) -> Iterator[str]:
+    """
+    Генератор CSV кусками по EXPORT_CHUNK_ROWS студентов. Своя сессия: к моменту
+    отправки тела сессия из get_db уже закрыта. Строки читаются курсором
+    (yield_per / stream_results), весь журнал в памяти не собирается.
+    """
+    session = Session(bind=bind)
+    try:
+        columns = grade_columns(session, project_id, sprint)
+        position = {column: i for i, column in enumerate(columns)}
+
+        buffer = io.StringIO()
+        writer = csv.writer(buffer)
+        writer.writerow(MOODLE_IDENTITY_COLUMNS + [moodle_column(*c) for c in columns])
+
+        rows = session.execute(
+            export_query(project_id, sprint).execution_options(yield_per=EXPORT_FETCH_SIZE)
+        )
+        for written, (_, student_rows) in enumerate(groupby(rows, key=lambda r: r.student_id), 1):
+            cells = [""] * len(columns)
+            for row in student_rows:
+                if row.sprint is not None:
+                    cells[position[(row.sprint, row.assignment)]] = row.score
+            writer.writerow([row.name, row.email, row.team_name or ""] + cells)
+
+            if written % EXPORT_CHUNK_ROWS == 0:
+                yield buffer.getvalue()
+                buffer.seek(0)
+                buffer.truncate(0)
+
+        yield buffer.getvalue()
+    finally:
+        session.close()
+
+
+def moodle_export_path(root: Path, token: str) -> Path:
+    return root / f"moodle_{token}.csv"
+
+
+def moodle_export_expired(path: Path, ttl_seconds: float, now: Optional[float] = None) -> bool:
+    try:
+        return (now or time.time()) - path.stat().st_mtime > ttl_seconds
+    except FileNotFoundError:
+        return True
+
+
+def prune_moodle_exports(root: Path, ttl_seconds: float) -> int:
+    """
+    Удаляет готовые экспорты (и брошенные .part) старше ttl_seconds.
+    Файл отдаётся с ETag/Range, поэтому сразу после отправки его не удаляем —
+    повторное или докачивающее скачивание в пределах TTL должно работать.
+    """
+    if not root.exists():
+        return 0
+    now = time.time()
+    removed = 0
+    for path in [*root.glob("moodle_*.csv"), *root.glob(".export-*.part")]:
+        if moodle_export_expired(path, ttl_seconds, now):
+            path.unlink(missing_ok=True)
+            removed += 1
+    return removed
+
+
+def write_moodle_csv(
+    bind: Engine | Connection,
+    dest: Path,
+    project_id: Optional[int] = None,
+    sprint: Optional[int] = None,
+) -> int:
+    """Тот же поток, но в файл (для фоновой задачи); атомарно через temp + os.replace."""
+    dest.parent.mkdir(parents=True, exist_ok=True)
+    fd, tmp_name = tempfile.mkstemp(dir=dest.parent, prefix=".export-", suffix=".part")
+    try:
+        with os.fdopen(fd, "w", encoding="utf-8", newline="") as out:
+            for chunk in stream_moodle_csv(bind, project_id, sprint):
+                out.write(chunk)
+        os.replace(tmp_name, dest)
+    finally:
+        Path(tmp_name).unlink(missing_ok=True)
+    return dest.stat().st_size
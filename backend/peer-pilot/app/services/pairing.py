@@ -0,0 +1,217 @@
+"""
+Генерация расписания peer review: кто кого ревьюит в каждом спринте.
+
+В каждом спринте расписание — перестановка без неподвижных точек: каждая
+команда ревьюит ровно одну чужую команду и получает ровно одно ревью.
+"""
+import itertools
+import random
+from collections import defaultdict
+from dataclasses import dataclass, field
+from typing import Callable, Dict, List, Protocol, Sequence, Tuple
+
+# (sprint, reviewing_team_id, reviewed_team_id)
+Schedule = List[Tuple[int, int, int]]
+
+
+@dataclass
+class PairingHistory:
+    """То, что уже назначено в предыдущих спринтах, — для проверки ограничений."""
+
+    pair_counts: Dict[Tuple[int, int], int] = field(default_factory=lambda: defaultdict(int))
+    last_reviewed: Dict[int, int] = field(default_factory=dict)
+
+    def record(self, reviewing_id: int, reviewed_id: int) -> None:
+        self.pair_counts[(reviewing_id, reviewed_id)] += 1
+        self.last_reviewed[reviewing_id] = reviewed_id
+
+
+# Доп. ограничение: (sprint, reviewing_id, reviewed_id, history) -> штраф (0 — ок)
+Constraint = Callable[[int, int, int, PairingHistory], float]
+
+
+@dataclass(frozen=True)
+class PairingConstraints:
+    forbid_reciprocal: bool = True          # A -> B и B -> A в одном спринте
+    forbid_consecutive_repeat: bool = True  # та же команда два спринта подряд
+    penalize_repeats: bool = True           # пара уже встречалась раньше
+    extra: Tuple[Constraint, ...] = ()
+
+
+class PairingEngine(Protocol):
+    def generate(self, team_ids: Sequence[int], sprints: int) -> Schedule:
+        ...
+
+
+class RotationPairing:
+    """Старая схема: сдвиг (sprint % (n - 1)) + 1 по командам в порядке id."""
+
+    def generate(self, team_ids: Sequence[int], sprints: int) -> Schedule:
+        n = len(team_ids)
+        schedule: Schedule = []
+        for sprint in range(1, sprints + 1):
+            shift = (sprint % (n - 1)) + 1 if n > 1 else 0
+            for idx, reviewing_id in enumerate(team_ids):
+                schedule.append((sprint, reviewing_id, team_ids[(idx + shift) % n]))
+        return schedule
+
+
+class LatinSquarePairing:
+    """
+    Round-robin по латинскому квадрату: команды перемешиваются (детерминированно
+    от набора id), каждый спринт — циклический сдвиг s. Сдвиги упорядочены так,
+    что сначала каждая неупорядоченная пара встречается один раз, затем в
+    обратном направлении; сдвиг n/2 (взаимные ревью) пропускается. Если
+    ограничения всё же нарушены (мало команд, extra-ограничения), спринт
+    чинится обменами целей между ревьюерами.
+
+    Для маленьких групп (до EXACT_SEARCH_MAX_TEAMS) циклических сдвигов мало —
+    там каждый спринт выбирается лучшая из всех перестановок без неподвижных точек.
+    """
+
+    REPAIR_CANDIDATES = 64
+    # взаимность и повтор подряд важнее, чем равномерность пар по всем спринтам
+    HARD_PENALTY = 10
+    EXACT_SEARCH_MAX_TEAMS = 7
+
+    def __init__(self, constraints: PairingConstraints = PairingConstraints(), seed=None):
+        self.constraints = constraints
+        self.seed = seed
+
+    def _shift_order(self, n: int) -> List[int]:
+        half = (n - 1) // 2
+        forward = list(range(1, half + 1))
+        backward = [n - s for s in forward]
+        shifts = forward + backward
+        if n % 2 == 0:
+            middle = n // 2
+            if not self.constraints.forbid_reciprocal or not shifts:
+                shifts.append(middle)
+        return shifts
+
+    def _cost(self, sprint, order, target, i, history) -> float:
+        c = self.constraints
+        reviewing_id, reviewed_id = order[i], order[target[i]]
+        if reviewing_id == reviewed_id:
+            return float("inf")
+        cost = 0.0
+        if c.forbid_reciprocal and target[target[i]] == i:
+            cost += self.HARD_PENALTY
+        if c.forbid_consecutive_repeat and history.last_reviewed.get(reviewing_id) == reviewed_id:
+            cost += self.HARD_PENALTY
+        if c.penalize_repeats:
+            cost += 0.5 * history.pair_counts.get((reviewing_id, reviewed_id), 0)
+        for constraint in c.extra:
+            cost += constraint(sprint, reviewing_id, reviewed_id, history)
+        return cost
+
+    def _repair(self, sprint, order, target, history, rng) -> None:
+        n = len(order)
+
+        def local_cost(idxs):
+            return sum(self._cost(sprint, order, target, k, history) for k in idxs)
+
+        for i in range(n):
+            if self._cost(sprint, order, target, i, history) == 0:
+                continue
+            candidates = rng.sample(range(n), min(n, self.REPAIR_CANDIDATES))
+            for j in candidates:
+                if j == i:
+                    continue
+                # обмен целей меняет ревью i и j и "взаимность" их старых целей
+                affected = {i, j, target[i], target[j]}
+                before = local_cost(affected)
+                target[i], target[j] = target[j], target[i]
+                if local_cost(affected) < before:
+                    break
+                target[i], target[j] = target[j], target[i]
+
+    def _best_derangement(self, sprint, order, shifted, derangements, history, rng) -> List[int]:
+        def total(target):
+            return sum(self._cost(sprint, order, target, i, history) for i in range(len(order)))
+
+        costs = [total(target) for target in derangements]
+        best = min(costs)
+        if total(shifted) == best:
+            return shifted
+        # среди равноценных — случайная, иначе жадный выбор застревает на "лексикографически первых"
+        return list(rng.choice([t for t, c in zip(derangements, costs) if c == best]))
+
+    def generate(self, team_ids: Sequence[int], sprints: int) -> Schedule:
+        n = len(team_ids)
+        if n < 2:
+            return []
+
+        order = sorted(team_ids)
+        seed = self.seed if self.seed is not None else ",".join(map(str, order))
+        rng = random.Random(seed)
+        rng.shuffle(order)
+
+        shifts = self._shift_order(n)
+        derangements = None
+        if n <= self.EXACT_SEARCH_MAX_TEAMS:
+            derangements = [
+                p for p in itertools.permutations(range(n)) if all(p[i] != i for i in range(n))
+            ]
+        history = PairingHistory()
+        schedule: Schedule = []
+
+        for sprint in range(1, sprints + 1):
+            shift = shifts[(sprint - 1) % len(shifts)]
+            target = [(i + shift) % n for i in range(n)]
+            if derangements is not None:
+                target = self._best_derangement(sprint, order, target, derangements, history, rng)
+            else:
+                self._repair(sprint, order, target, history, rng)
+
+            for i in range(n):
+                schedule.append((sprint, order[i], order[target[i]]))
+            for i in range(n):
+                history.record(order[i], order[target[i]])
+
+        return schedule
+
+
+PAIRING_ENGINES: Dict[str, Callable[[], PairingEngine]] = {
+    "rotation": RotationPairing,
+    "latin_square": LatinSquarePairing,
+}
+
+
+def get_pairing_engine(name: str) -> PairingEngine:
+    try:
+        return PAIRING_ENGINES[name]()
+    except KeyError:
+        raise ValueError(f"Unknown pairing engine: {name}")
+
+
+def schedule_stats(schedule: Schedule) -> Dict[str, float]:
+    """Статистика для бенчмарка/тестов: повторы пар, взаимные и подряд идущие ревью."""
+    by_sprint: Dict[int, Dict[int, int]] = defaultdict(dict)
+    pair_counts: Dict[Tuple[int, int], int] = defaultdict(int)
+    for sprint, reviewing_id, reviewed_id in schedule:
+        by_sprint[sprint][reviewing_id] = reviewed_id
+        pair_counts[(reviewing_id, reviewed_id)] += 1
+
+    reciprocal = sum(
+        1
+        for assignment in by_sprint.values()
+        for a, b in assignment.items()
+        if assignment.get(b) == a
+    )
+    consecutive = 0
+    sprints = sorted(by_sprint)
+    for prev, cur in zip(sprints, sprints[1:]):
+        consecutive += sum(
+            1 for a, b in by_sprint[cur].items() if by_sprint[prev].get(a) == b
+        )
+
+    return {
+        "pairs": len(schedule),
+        "distinct_pairs": len(pair_counts),
+        "repeated_pairs": sum(c - 1 for c in pair_counts.values()),
+        "max_pair_count": max(pair_counts.values(), default=0),
+        "reciprocal": reciprocal,
+        "consecutive_repeats": consecutive,
+        "self_reviews": sum(1 for _, a, b in schedule if a == b),
+    }
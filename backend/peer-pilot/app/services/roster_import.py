@@ -0,0 +1,214 @@
+"""
+Массовый импорт пользователей (и студентов) из CSV или JSON.
+
+Файл читается потоково и обрабатывается пачками по IMPORT_BATCH_SIZE строк:
+на пачку — по одному запросу на поиск существующих пользователей, студентов
+и команд, bcrypt в пуле процессов и bulk INSERT. Ошибки копятся построчно
+и не прерывают импорт остальных строк.
+"""
+import csv
+import io
+import json
+from dataclasses import dataclass, field
+from itertools import islice
+from typing import IO, Any, Dict, Iterator, List, Optional, Tuple
+
+from pydantic import AliasChoices, BaseModel, EmailStr, Field, ValidationError
+from sqlalchemy import insert, select, update
+from sqlalchemy.orm import Session
+
+from app.core.hashing import hash_passwords
+from app.models.student import Student
+from app.models.team import Team
+from app.models.user import User, UserRole
+from app.services.dashboard_snapshots import invalidate_all
+
+IMPORT_BATCH_SIZE = 500
+
+# (номер строки в файле, данные строки или None, ошибка разбора или None)
+RawRow = Tuple[int, Optional[Dict[str, Any]], Optional[str]]
+
+
+class RosterRow(BaseModel):
+    name: str = Field(min_length=1)
+    email: EmailStr
+    password: str = Field(min_length=4)
+    role: UserRole = UserRole.STUDENT
+    team_id: Optional[int] = Field(default=None, validation_alias=AliasChoices("team_id", "teamId"))
+
+
+@dataclass
+class RowError:
+    row: int
+    email: Optional[str]
+    error: str
+
+
+@dataclass
+class ImportResult:
+    created: int = 0
+    linked_students: int = 0
+    errors: List[RowError] = field(default_factory=list)
+
+
+def _is_json(filename: Optional[str], content_type: Optional[str]) -> bool:
+    name = (filename or "").lower()
+    return name.endswith((".json", ".ndjson", ".jsonl")) or "json" in (content_type or "")
+
+
+def _iter_csv(fh: IO[bytes]) -> Iterator[RawRow]:
+    text = io.TextIOWrapper(fh, encoding="utf-8-sig", newline="")
+    reader = csv.DictReader(text)
+    # строка 1 — заголовок
+    for row_no, row in enumerate(reader, 2):
+        # пустые ячейки CSV — это «не указано», а не пустая строка
+        yield row_no, {k.strip(): v.strip() for k, v in row.items() if k and v and v.strip()}, None
+
+
+def _json_object(row_no: int, item: Any) -> RawRow:
+    if isinstance(item, dict):
+        return row_no, item, None
+    return row_no, None, "Expected an object"
+
+
+def _iter_json(fh: IO[bytes]) -> Iterator[RawRow]:
+    """JSON-массив объектов или NDJSON (по объекту на строку)."""
+    text = io.TextIOWrapper(fh, encoding="utf-8-sig")
+    first = True
+    for line_no, line in enumerate(text, 1):
+        if not line.strip():
+            continue
+        if first and line.lstrip().startswith("["):
+            # массив разбираем целиком: строк в импорте сотни, не миллионы
+            try:
+                items = json.loads(line + text.read())
+            except json.JSONDecodeError as exc:
+                yield 1, None, f"Invalid JSON: {exc.msg}"
+                return
+            if not isinstance(items, list):
+                yield 1, None, "Expected an array of objects"
+                return
+            for row_no, item in enumerate(items, 1):
+                yield _json_object(row_no, item)
+            return
+        first = False
+        try:
+            yield _json_object(line_no, json.loads(line))
+        except json.JSONDecodeError as exc:
+            yield line_no, None, f"Invalid JSON: {exc.msg}"
+
+
+def iter_roster_rows(
+    fh: IO[bytes], filename: Optional[str] = None, content_type: Optional[str] = None
+) -> Iterator[RawRow]:
+    if _is_json(filename, content_type):
+        return _iter_json(fh)
+    return _iter_csv(fh)
+
+
+def _validation_message(exc: ValidationError) -> str:
+    return "; ".join(
+        f"{'.'.join(str(p) for p in err['loc']) or 'row'}: {err['msg']}" for err in exc.errors()
+    )
+
+
+def _import_batch(
+    db: Session, batch: List[RawRow], seen: set, result: ImportResult
+) -> None:
+    rows: List[Tuple[int, RosterRow]] = []
+    for row_no, data, error in batch:
+        email = data.get("email") if data else None
+        if error:
+            result.errors.append(RowError(row_no, email, error))
+            continue
+        try:
+            item = RosterRow.model_validate(data)
+        except ValidationError as exc:
+            result.errors.append(RowError(row_no, email, _validation_message(exc)))
+            continue
+        if item.email in seen:
+            result.errors.append(RowError(row_no, item.email, "Duplicate email in file"))
+            continue
+        seen.add(item.email)
+        rows.append((row_no, item))
+    if not rows:
+        return
+
+    emails = [item.email for _, item in rows]
+    existing_users = set(db.scalars(select(User.email).where(User.email.in_(emails))))
+    team_ids = {item.team_id for _, item in rows if item.team_id is not None}
+    known_teams = set(db.scalars(select(Team.id).where(Team.id.in_(team_ids)))) if team_ids else set()
+
+    accepted: List[RosterRow] = []
+    for row_no, item in rows:
+        if item.email in existing_users:
+            result.errors.append(RowError(row_no, item.email, "User with this email already exists"))
+        elif item.team_id is not None and item.team_id not in known_teams:
+            result.errors.append(RowError(row_no, item.email, f"Team {item.team_id} not found"))
+        else:
+            accepted.append(item)
+    if not accepted:
+        return
+
+    # как в register_user: студенту нужна сущность Student — берём существующую по email
+    students = [item for item in accepted if item.role == UserRole.STUDENT]
+    student_ids: Dict[str, int] = dict(
+        db.execute(
+            select(Student.email, Student.id).where(Student.email.in_([s.email for s in students]))
+        ).all()
+    ) if students else {}
+
+    moved = [
+        {"id": student_ids[s.email], "team_id": s.team_id}
+        for s in students
+        if s.email in student_ids and s.team_id is not None
+    ]
+    if moved:
+        db.execute(update(Student), moved)
+    result.linked_students += sum(1 for s in students if s.email in student_ids)
+
+    new_students = [
+        {"name": s.name, "email": s.email, "team_id": s.team_id, "is_rep": False}
+        for s in students
+        if s.email not in student_ids
+    ]
+    if new_students:
+        created = db.execute(insert(Student).returning(Student.id, Student.email), new_students)
+        student_ids.update({email: sid for sid, email in created})
+
+    hashes = hash_passwords([item.password for item in accepted])
+    db.execute(
+        insert(User),
+        [
+            {
+                "name": item.name,
+                "email": item.email,
+                "role": item.role,
+                "hashed_password": hashed,
+                "student_id": student_ids.get(item.email) if item.role == UserRole.STUDENT else None,
+                "team_id": item.team_id,
+            }
+            for item, hashed in zip(accepted, hashes)
+        ],
+    )
+    result.created += len(accepted)
+
+
+def import_roster(
+    db: Session,
+    fh: IO[bytes],
+    filename: Optional[str] = None,
+    content_type: Optional[str] = None,
+    batch_size: int = IMPORT_BATCH_SIZE,
+) -> ImportResult:
+    """Импортирует файл целиком в одной транзакции (commit — на вызывающем)."""
+    result = ImportResult()
+    seen: set = set()
+    rows = iter_roster_rows(fh, filename, content_type)
+    while batch := list(islice(rows, batch_size)):
+        _import_batch(db, batch, seen, result)
+
+    if result.created:
+        invalidate_all(db)
+    result.errors.sort(key=lambda e: e.row)
+    return result
@@ -0,0 +1,72 @@
+from typing import Any, Dict, Iterable, Mapping, Optional
+
+from sqlalchemy import insert
+from sqlalchemy.orm import Session
+
+from app.models.grade import AssignmentLetterEnum
+from app.models.peer_review import PeerReview
+from app.models.suggested_grade import SuggestedGrade
+from app.services.jobs import job_handler
+
+# фронт шлёт {"assignment": 85, "iteration": 90} — оценки за A и I
+SUGGESTED_GRADE_KEYS = {
+    "assignment": AssignmentLetterEnum.A,
+    "iteration": AssignmentLetterEnum.I,
+}
+
+
+def parse_suggested_grades(payload: Any) -> Dict[AssignmentLetterEnum, int]:
+    """JSON suggested_grades -> {буква: балл}; нечисловые значения пропускаются."""
+    if not isinstance(payload, dict):
+        return {}
+
+    parsed: Dict[AssignmentLetterEnum, int] = {}
+    for key, value in payload.items():
+        letter = SUGGESTED_GRADE_KEYS.get(key)
+        if letter is None and key in AssignmentLetterEnum._value2member_map_:
+            letter = AssignmentLetterEnum(key)
+        if letter is None or value is None or isinstance(value, bool):
+            continue
+        try:
+            parsed[letter] = int(value)
+        except (TypeError, ValueError):
+            continue
+    return parsed
+
+
+def clear_suggested_grades(db: Session, review_ids: Iterable[int]) -> None:
+    ids = set(review_ids)
+    if not ids:
+        return
+    db.query(SuggestedGrade).filter(
+        SuggestedGrade.peer_review_id.in_(ids)
+    ).delete(synchronize_session=False)
+
+
+def project_suggested_grades(db: Session, reviews: Mapping[int, Optional[dict]]) -> None:
+    """
+    Перезаписывает строки suggested_grades для {review_id: json}.
+    Вызывается из write-путей ДО commit — проекция в той же транзакции, что и JSON.
+    """
+    clear_suggested_grades(db, reviews.keys())
+    rows = [
+        {"peer_review_id": review_id, "assignment": letter, "score": score}
+        for review_id, payload in reviews.items()
+        for letter, score in parse_suggested_grades(payload).items()
+    ]
+    if rows:
+        db.execute(insert(SuggestedGrade), rows)
+
+
+@job_handler("rebuild_suggested_grades")
+def rebuild_suggested_grades(db: Session, payload: Optional[dict] = None) -> dict:
+    """Полная пересборка проекции из JSON (бэкфилл существующих ревью)."""
+    db.query(SuggestedGrade).delete(synchronize_session=False)
+    reviews = dict(
+        db.query(PeerReview.id, PeerReview.suggested_grades)
+        .filter(PeerReview.suggested_grades.isnot(None))
+        .all()
+    )
+    project_suggested_grades(db, reviews)
+    db.commit()
+    return {"reviews": len(reviews)}
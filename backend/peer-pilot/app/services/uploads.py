@@ -0,0 +1,82 @@
+import hashlib
+import os
+import tempfile
+from dataclasses import dataclass
+from pathlib import Path
+from typing import BinaryIO
+
+from fastapi import UploadFile
+from starlette.concurrency import run_in_threadpool
+
+UPLOAD_CHUNK_SIZE = 1024 * 1024  # 1 MiB
+
+
+class UploadTooLargeError(Exception):
+    def __init__(self, limit: int):
+        super().__init__(f"Upload exceeds {limit} bytes")
+        self.limit = limit
+
+
+@dataclass
+class StoredUpload:
+    path: Path
+    size: int
+    sha256: str
+
+
+def _open_temp(dest_dir: Path) -> tuple[BinaryIO, Path]:
+    dest_dir.mkdir(parents=True, exist_ok=True)
+    # temp-файл в той же директории, чтобы os.replace был атомарным
+    fd, tmp_name = tempfile.mkstemp(dir=dest_dir, prefix=".upload-", suffix=".part")
+    return os.fdopen(fd, "wb"), Path(tmp_name)
+
+
+def _finish(fh: BinaryIO, tmp_path: Path, final_path: Path) -> None:
+    fh.flush()
+    os.fsync(fh.fileno())
+    fh.close()
+    os.replace(tmp_path, final_path)
+
+
+def _discard(fh: BinaryIO, tmp_path: Path) -> None:
+    fh.close()
+    tmp_path.unlink(missing_ok=True)
+
+
+async def hash_upload(upload: UploadFile, max_size: int) -> tuple[str, int]:
+    """
+    Первый проход по UploadFile: sha256 и размер, кусками по UPLOAD_CHUNK_SIZE,
+    без записи на диск. Лимит размера проверяется по ходу чтения.
+    """
+    hasher = hashlib.sha256()
+    size = 0
+    await upload.seek(0)
+    while True:
+        chunk = await upload.read(UPLOAD_CHUNK_SIZE)
+        if not chunk:
+            break
+        size += len(chunk)
+        if size > max_size:
+            raise UploadTooLargeError(max_size)
+        hasher.update(chunk)
+    return hasher.hexdigest(), size
+
+
+async def copy_upload(upload: UploadFile, final_path: Path) -> None:
+    """
+    Копирует UploadFile в final_path: кусками во временный файл рядом,
+    fsync и атомарный os.replace. Вся файловая работа — в threadpool,
+    в памяти держим не больше одного чанка.
+    """
+    await upload.seek(0)
+    fh, tmp_path = await run_in_threadpool(_open_temp, final_path.parent)
+    try:
+        while True:
+            chunk = await upload.read(UPLOAD_CHUNK_SIZE)
+            if not chunk:
+                break
+            await run_in_threadpool(fh.write, chunk)
+        await run_in_threadpool(_finish, fh, tmp_path, final_path)
+    except BaseException:
+        await run_in_threadpool(_discard, fh, tmp_path)
+        raise
@@ -0,0 +1,39 @@
+"""
+Бенчмарк схем назначения peer review.
+
+Запуск из backend/peer-pilot:
+    python -m benchmarks.pairing_benchmark [--sprints 8] [--repeat 5]
+"""
+import argparse
+import time
+
+from app.services.pairing import PAIRING_ENGINES, schedule_stats
+
+TEAM_COUNTS = (2, 3, 4, 5, 8, 9, 16, 50, 100, 250, 500, 1000)
+
+
+def run(sprints: int, repeat: int) -> None:
+    header = f"{'engine':<13}{'n':>6}{'ms':>10}{'repeated':>10}{'max':>5}{'recip':>7}{'consec':>8}"
+    print(header)
+    print("-" * len(header))
+    for name, factory in PAIRING_ENGINES.items():
+        for n in TEAM_COUNTS:
+            team_ids = list(range(1, n + 1))
+            best = float("inf")
+            for _ in range(repeat):
+                started = time.perf_counter()
+                schedule = factory().generate(team_ids, sprints)
+                best = min(best, time.perf_counter() - started)
+            stats = schedule_stats(schedule)
+            print(
+                f"{name:<13}{n:>6}{best * 1000:>10.2f}{stats['repeated_pairs']:>10}"
+                f"{stats['max_pair_count']:>5}{stats['reciprocal']:>7}{stats['consecutive_repeats']:>8}"
+            )
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--sprints", type=int, default=8)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+    run(args.sprints, args.repeat)
@@ -1,16 +1,44 @@
+from contextlib import asynccontextmanager
+
 from fastapi.middleware.cors import CORSMiddleware
 import uvicorn
 from fastapi import FastAPI
 
 from app.api.base import api_router
 from app.core.config import app_settings
-from app.core.db import engine
+from app.core.db import SessionLocal, engine
+from app.core.hashing import shutdown_hash_pool
 
-from app.models.base import Base
+from app.models.base import Base, ensure_indexes
+from app.services.grade_stats import ensure_grade_stats
+from app.services.grade_store import ensure_grade_natural_key
+from app.services.jobs import JobRunner
 
 Base.metadata.create_all(bind=engine)
+ensure_grade_natural_key(engine)
+ensure_grade_stats(engine)
+# индексы, добавленные к таблицам, которые в старых базах уже есть
+ensure_indexes(engine, [
+    "ix_teams_project_id",
+    "ix_peer_reviews_sprint_reviewing_team",
+])
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # воркеры фоновых задач — в каждом процессе uvicorn
+    runner = JobRunner(
+        SessionLocal,
+        threads=app_settings.JOB_WORKER_THREADS,
+        poll_interval=app_settings.JOB_POLL_INTERVAL_SECONDS,
+    )
+    runner.start()
+    yield
+    runner.stop()
+    shutdown_hash_pool()
+
 
-web_app = FastAPI(title=app_settings.PROJECT_NAME)
+web_app = FastAPI(title=app_settings.PROJECT_NAME, lifespan=lifespan)
 web_app.include_router(api_router)
 
 
@@ -20,6 +48,8 @@ web_app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    # курсор пагинации и id фоновой задачи читает фронтенд
+    expose_headers=["X-Next-Cursor", "Link", "X-Job-Id"],
 )
 
 
@@ -40,6 +70,6 @@ if __name__ == "__main__":
             port=app_settings.APP_PORT,
             reload=False,
             log_config=None,
-            workers=4,
+            workers=app_settings.WEB_CONCURRENCY,
             root_path="/app",
         )
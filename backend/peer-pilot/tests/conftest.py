@@ -1,19 +1,27 @@
 # tests/conftest.py
 
 from pathlib import Path
+import os
 import sys
 import pytest
 from fastapi.testclient import TestClient
-from sqlalchemy import create_engine
+from sqlalchemy import create_engine, event
 from sqlalchemy.orm import sessionmaker
 
 ROOT_DIR = Path(__file__).resolve().parents[1]
 if str(ROOT_DIR) not in sys.path:
     sys.path.insert(0, str(ROOT_DIR))
+
+# фоновые задачи в тестах выполняются явно через run_pending(db_session)
+os.environ["JOB_WORKER_THREADS"] = "0"
+# минимальная стоимость bcrypt — тесты входа не ждут по 250 мс на хэш
+os.environ["PASSWORD_BCRYPT_ROUNDS"] = "4"
     
 from main import web_app # noqa: E402
 from app.core.db import get_db # noqa: E402
+from app.core.security import get_current_user # noqa: E402
 from app.models.base import Base # noqa: E402
+from app.models.user import User, UserRole # noqa: E402
 
 
 # Use in-memory SQLite for tests
@@ -74,3 +82,48 @@ def client(db_session):
         yield c
 
     web_app.dependency_overrides.clear()
+
+
+@pytest.fixture(scope="function")
+def instructor_client(client, db_session):
+    """
+    TestClient authenticated as an instructor
+    (get_current_user is overridden with a real User row).
+    """
+    user = User(
+        name="Test Instructor",
+        email="instructor@example.com",
+        hashed_password="not-used",
+        role=UserRole.INSTRUCTOR,
+    )
+    db_session.add(user)
+    db_session.flush()
+
+    web_app.dependency_overrides[get_current_user] = lambda: user
+    return client
+
+
+@pytest.fixture(scope="function")
+def query_counter():
+    """
+    Counts SQL statements executed against the test engine.
+    Use ``query_counter.reset()`` right before the call under test.
+    """
+
+    class _Counter:
+        def __init__(self):
+            self.count = 0
+
+        def reset(self):
+            self.count = 0
+
+    counter = _Counter()
+
+    def _on_execute(conn, cursor, statement, parameters, context, executemany):
+        counter.count += 1
+
+    event.listen(engine, "before_cursor_execute", _on_execute)
+    try:
+        yield counter
+    finally:
+        event.remove(engine, "before_cursor_execute", _on_execute)
@@ -0,0 +1,123 @@
+# tests/test_dashboard_query_plan.py
+
+from sqlalchemy import create_engine, inspect, text
+
+from app.models.base import Base, ensure_indexes
+from app.models.project import Project
+from app.models.team import Team
+from app.models.student import Student
+from app.models.peer_review import PeerReview, PeerReviewStatus
+
+
+def _seed_project(db_session, name, n_teams, students_per_team):
+    project = Project(name=name, max_teams=n_teams, max_students_per_team=students_per_team)
+    db_session.add(project)
+    db_session.flush()
+
+    teams = []
+    for i in range(n_teams):
+        team = Team(name=f"{name} Team {i}", color="#000000", project_id=project.id)
+        db_session.add(team)
+        teams.append(team)
+    db_session.flush()
+
+    for team in teams:
+        for j in range(students_per_team):
+            db_session.add(
+                Student(
+                    name=f"{team.name} Student {j}",
+                    email=f"{team.id}-{j}-{name}@example.com".replace(" ", ""),
+                    team_id=team.id,
+                )
+            )
+
+    for sprint in (1, 2, 3):
+        for idx, team in enumerate(teams):
+            db_session.add(
+                PeerReview(
+                    sprint=sprint,
+                    reviewing_team_id=team.id,
+                    reviewed_team_id=teams[(idx + 1) % n_teams].id,
+                    status=PeerReviewStatus.PENDING,
+                )
+            )
+    db_session.commit()
+    return project, teams
+
+
+def test_project_scoped_dashboard_returns_only_project_teams(instructor_client, db_session):
+    # Arrange
+    # --------
+    _, teams = _seed_project(db_session, "Course A", n_teams=3, students_per_team=2)
+    _seed_project(db_session, "Course B", n_teams=2, students_per_team=2)
+    student = teams[0].students[0]
+
+    # Act
+    # ----
+    response = instructor_client.get(f"/dashboard/students/{student.id}?scope=project")
+
+    # Assert
+    # -------
+    assert response.status_code == 200
+    data = response.json()
+    assert {t["id"] for t in data["teams"]} == {t.id for t in teams}
+    assert len(data["students"]) == 6
+    assert len(data["reviewAssignments"]) == 6
+    assert all(len(r["reviewingTeam"]["students"]) == 2 for r in data["reviewAssignments"])
+
+
+def test_dashboard_query_count_is_constant_as_cohort_grows(
+    instructor_client, db_session, query_counter
+):
+    # Arrange
+    # --------
+    _, teams = _seed_project(db_session, "Small", n_teams=2, students_per_team=2)
+    student = teams[0].students[0]
+    db_session.expire_all()
+
+    # Act
+    # ----
+    query_counter.reset()
+    small = instructor_client.get(f"/dashboard/students/{student.id}?scope=project")
+    small_queries = query_counter.count
+
+    _seed_project(db_session, "Large", n_teams=20, students_per_team=5)
+    _, big_teams = _seed_project(db_session, "Huge", n_teams=30, students_per_team=6)
+    big_student = big_teams[0].students[0]
+    db_session.expire_all()
+
+    query_counter.reset()
+    large = instructor_client.get(f"/dashboard/students/{big_student.id}?scope=project")
+    large_queries = query_counter.count
+
+    db_session.expire_all()
+    query_counter.reset()
+    full = instructor_client.get(f"/dashboard/students/{big_student.id}")
+    full_queries = query_counter.count
+
+    # Assert
+    # -------
+    assert small.status_code == large.status_code == full.status_code == 200
+    assert len(large.json()["teams"]) == 30
+    assert len(full.json()["teams"]) == 52
+    assert small_queries == large_queries
+    assert full_queries <= large_queries + 1
+
+
+def test_project_index_is_added_to_existing_teams_table(tmp_path):
+    # Arrange
+    # --------
+    engine = create_engine(f"sqlite:///{tmp_path / 'teams.db'}")
+    Base.metadata.create_all(bind=engine)
+    with engine.begin() as conn:
+        conn.execute(text("DROP INDEX ix_teams_project_id"))
+
+    # Act
+    # ----
+    ensure_indexes(engine, ["ix_teams_project_id"])
+
+    # Assert
+    # -------
+    indexes = {ix["name"]: ix["column_names"] for ix in inspect(engine).get_indexes("teams")}
+    assert indexes["ix_teams_project_id"] == ["project_id"]
+    engine.dispose()
@@ -0,0 +1,119 @@
+# tests/test_dashboard_snapshots.py
+
+from sqlalchemy.exc import OperationalError
+
+from app.models.dashboard_snapshot import DashboardSnapshot
+from app.models.student import Student
+from app.models.team import Team
+from app.services.dashboard_snapshots import invalidate_students, save_snapshot, snapshot_generation
+
+
+def _create_student_with_team(db_session):
+    team = Team(name="Team Snapshot", color="#123456")
+    db_session.add(team)
+    db_session.flush()
+
+    student = Student(name="Snap", email="snap@example.com", team_id=team.id)
+    db_session.add(student)
+    db_session.commit()
+    return team, student
+
+
+def test_dashboard_is_served_from_snapshot(instructor_client, db_session, query_counter):
+    # Arrange
+    # --------
+    _, student = _create_student_with_team(db_session)
+    student_id, team_id = student.id, student.team_id
+    first = instructor_client.get(f"/dashboard/students/{student_id}")
+
+    # Act
+    # ----
+    query_counter.reset()
+    second = instructor_client.get(f"/dashboard/students/{student_id}")
+
+    # Assert
+    # -------
+    assert first.status_code == second.status_code == 200
+    assert first.json() == second.json()
+    assert first.json()["student"]["teamId"] == team_id
+    assert "reviewAssignments" in first.json()
+    assert query_counter.count == 1
+    assert db_session.get(DashboardSnapshot, (student_id, "all")) is not None
+
+
+def test_grade_upsert_invalidates_student_snapshot(instructor_client, db_session):
+    # Arrange
+    # --------
+    _, student = _create_student_with_team(db_session)
+    before = instructor_client.get(f"/dashboard/students/{student.id}")
+    assert before.json()["grades"] == []
+
+    # Act
+    # ----
+    instructor_client.put(
+        "/grades/",
+        json=[{"studentId": student.id, "sprint": 1, "assignment": "A", "score": 77}],
+    )
+    after = instructor_client.get(f"/dashboard/students/{student.id}")
+
+    # Assert
+    # -------
+    assert [g["score"] for g in after.json()["grades"]] == [77]
+
+
+def test_team_edit_invalidates_all_snapshots(instructor_client, db_session):
+    # Arrange
+    # --------
+    team, student = _create_student_with_team(db_session)
+    instructor_client.get(f"/dashboard/students/{student.id}")
+
+    # Act
+    # ----
+    instructor_client.patch(f"/teams/{team.id}", json={"name": "Renamed"})
+    after = instructor_client.get(f"/dashboard/students/{student.id}")
+
+    # Assert
+    # -------
+    names = {t["name"] for t in after.json()["teams"]}
+    assert "Renamed" in names
+
+
+def test_snapshot_built_before_invalidation_is_not_saved(db_session):
+    # Arrange
+    # --------
+    _, student = _create_student_with_team(db_session)
+    generation = snapshot_generation(db_session)
+
+    # Act
+    # ----
+    # запись успела закоммитить инвалидацию, пока «читатель» собирал снапшот
+    invalidate_students(db_session, [student.id])
+    db_session.commit()
+    save_snapshot(db_session, student.id, "all", '{"stale": true}', generation)
+    save_snapshot(db_session, student.id, "project", "{}", snapshot_generation(db_session))
+
+    # Assert
+    # -------
+    assert db_session.get(DashboardSnapshot, (student.id, "all")) is None
+    assert db_session.get(DashboardSnapshot, (student.id, "project")) is not None
+
+
+def test_locked_database_does_not_fail_dashboard_read(instructor_client, db_session, monkeypatch):
+    # Arrange
+    # --------
+    _, student = _create_student_with_team(db_session)
+    student_id = student.id
+
+    def locked():
+        raise OperationalError("COMMIT", {}, Exception("database is locked"))
+
+    monkeypatch.setattr(db_session, "commit", locked)
+
+    # Act
+    # ----
+    response = instructor_client.get(f"/dashboard/students/{student_id}")
+
+    # Assert
+    # -------
+    assert response.status_code == 200
+    assert response.json()["student"]["id"] == student_id
@@ -0,0 +1,130 @@
+# tests/test_fieldsets.py
+
+from sqlalchemy import event
+
+from app.models.peer_review import PeerReview
+from app.models.project import Project
+from app.models.student import Student
+from app.models.team import Team
+
+
+def _teams_with_students(db_session, count, per_team=2):
+    project = Project(name="Sparse", max_teams=count, max_students_per_team=per_team)
+    db_session.add(project)
+    db_session.flush()
+    teams = [Team(name=f"Sparse {i}", color="#333333", project_id=project.id) for i in range(count)]
+    db_session.add_all(teams)
+    db_session.flush()
+    db_session.add_all([
+        Student(name=f"Sparse {t.id}.{i}", email=f"sparse{t.id}.{i}@example.com", team_id=t.id)
+        for t in teams
+        for i in range(per_team)
+    ])
+    db_session.commit()
+    return project, teams
+
+
+class _Statements:
+    def __init__(self, engine):
+        self.engine, self.sql = engine, []
+
+    def _on_execute(self, conn, cursor, statement, parameters, context, executemany):
+        self.sql.append(statement)
+
+    def __enter__(self):
+        event.listen(self.engine, "before_cursor_execute", self._on_execute)
+        return self
+
+    def __exit__(self, *exc):
+        event.remove(self.engine, "before_cursor_execute", self._on_execute)
+
+
+def test_default_shape_is_unchanged(instructor_client, db_session):
+    # Arrange
+    # --------
+    _, (team,) = _teams_with_students(db_session, 1)
+
+    # Act
+    # ----
+    response = instructor_client.get(f"/teams/{team.id}")
+
+    # Assert
+    # -------
+    data = response.json()
+    assert {"id", "name", "color", "isLocked", "projectId", "students"} <= data.keys()
+    assert len(data["students"]) == 2
+
+
+def test_fields_select_only_requested_columns(instructor_client, db_session):
+    # Arrange
+    # --------
+    _teams_with_students(db_session, 3)
+
+    # Act
+    # ----
+    with _Statements(db_session.get_bind().engine) as statements:
+        response = instructor_client.get("/teams/?fields=id,name")
+
+    # Assert
+    # -------
+    assert response.status_code == 200
+    assert all(item.keys() == {"id", "name"} for item in response.json())
+    (team_select,) = [sql for sql in statements.sql if "FROM teams" in sql]
+    assert "teams.color" not in team_select
+    assert not any("FROM students" in sql for sql in statements.sql)
+
+
+def test_include_nested_relations(instructor_client, db_session, query_counter):
+    # Arrange
+    # --------
+    _, (a, b) = _teams_with_students(db_session, 2)
+    db_session.add_all([
+        PeerReview(sprint=1, reviewing_team_id=a.id, reviewed_team_id=b.id),
+        PeerReview(sprint=1, reviewing_team_id=b.id, reviewed_team_id=a.id),
+    ])
+    db_session.commit()
+
+    # Act
+    # ----
+    query_counter.reset()
+    response = instructor_client.get(
+        "/peer-reviews/?fields=id,sprint&include=reviewingTeam.students,reviewedTeam"
+    )
+
+    # Assert
+    # -------
+    assert response.status_code == 200
+    first = response.json()[0]
+    assert first.keys() == {"id", "sprint", "reviewingTeam", "reviewedTeam"}
+    assert "students" not in first["reviewedTeam"]
+    assert len(first["reviewingTeam"]["students"]) == 2
+    assert first["reviewingTeam"]["students"][0].keys() == {"id", "name", "email", "teamId", "isRep"}
+    # ревью + две выборки команд + студенты (+ перечитывание пользователя фикстуры после commit)
+    assert query_counter.count <= 5
+
+
+def test_project_detail_include_and_paging_headers(instructor_client, db_session):
+    # Arrange
+    # --------
+    project, _ = _teams_with_students(db_session, 2)
+    db_session.add(Project(name="Sparse 2", max_teams=1, max_students_per_team=1))
+    db_session.commit()
+
+    # Act
+    # ----
+    detail = instructor_client.get(f"/projects/{project.id}?include=teams")
+    listed = instructor_client.get("/projects/?fields=id&limit=1")
+
+    # Assert
+    # -------
+    assert [t.keys() for t in detail.json()["teams"]] == [
+        {"id", "name", "color", "isLocked", "projectId"}
+    ] * 2
+    assert listed.json() == [{"id": project.id}]
+    assert "X-Next-Cursor" in listed.headers
+
+
+def test_unknown_fields_and_includes_are_rejected(instructor_client):
+    assert instructor_client.get("/teams/?fields=id,secret").status_code == 400
+    assert instructor_client.get("/peer-reviews/?include=reviewingTeam.coach").status_code == 400
+    assert instructor_client.get("/students/?include=team").status_code == 400
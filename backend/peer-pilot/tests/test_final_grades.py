@@ -0,0 +1,199 @@
+# tests/test_final_grades.py
+
+import time
+from dataclasses import replace
+
+import numpy as np
+import pytest
+from sqlalchemy import insert
+
+from app.core.config import app_settings
+from app.models.grade import AssignmentLetterEnum, Grade
+from app.models.peer_review import PeerReview
+from app.models.project import Project
+from app.models.student import Student
+from app.models.team import Team
+from app.models.team_grade import TeamGrade
+from app.services.final_grades import Cohort, GradingPolicy, LETTERS, compute_final_grades
+
+L = AssignmentLetterEnum
+EQUAL = {L.A: 1, L.R: 1, L.I: 1, L.C: 1}
+
+
+def _project_with_teams(db_session, name, sizes):
+    project = Project(name=name, max_teams=len(sizes), max_students_per_team=max(sizes))
+    db_session.add(project)
+    db_session.flush()
+    teams = [Team(name=f"{name} {i}", color="#101010", project_id=project.id) for i in range(len(sizes))]
+    db_session.add_all(teams)
+    db_session.flush()
+    students = [
+        [Student(name=f"{name} {t}.{i}", email=f"{name}.{t}.{i}@example.com", team_id=team.id)
+         for i in range(size)]
+        for t, (team, size) in enumerate(zip(teams, sizes))
+    ]
+    db_session.add_all([s for team_students in students for s in team_students])
+    db_session.flush()
+    return project, teams, students
+
+
+def _by_student(data):
+    return {
+        sid: (final, band, dict(zip(data["letters"], averages)))
+        for sid, final, band, averages in zip(
+            data["studentIds"], data["final"], data["bands"], data["letterAverages"]
+        )
+    }
+
+
+def test_compute_weights_bonus_and_bands():
+    # Arrange
+    # --------
+    nan = np.nan
+    scores = np.full((3, 2, len(LETTERS)), nan)
+    scores[0, 0, :4] = [100, 100, 100, 100]
+    scores[0, 1, :4] = [80, 80, 80, 80]
+    scores[0, 1, LETTERS.index(L.E)] = 5
+    scores[1, 0, :4] = [70, 70, 70, 70]  # во втором спринте нет оценок -> 0
+    cohort = Cohort(np.array([1, 2, 3]), np.array([7, 7, -1]), scores)
+    policy = GradingPolicy(weights=EQUAL, bonus_letters=(L.E,))
+
+    # Act
+    # ----
+    result = compute_final_grades(cohort, policy)
+
+    # Assert
+    # -------
+    assert result.final.tolist() == [95, 35, 0]
+    assert result.bands == ["A", "D", "D"]
+    assert np.isnan(result.letter_averages[:, LETTERS.index(L.TE)]).all()
+
+
+def test_bands_from_settings_in_any_order(monkeypatch):
+    # Arrange
+    # --------
+    monkeypatch.setattr(app_settings, "FINAL_GRADE_BANDS", {"D": 0, "B": 75, "A": 90, "C": 60})
+    scores = np.full((4, 1, len(LETTERS)), np.nan)
+    scores[:, 0, :4] = np.array([95, 80, 65, 10])[:, None]
+    cohort = Cohort(np.arange(1, 5), np.full(4, -1), scores)
+
+    # Act
+    # ----
+    policy = GradingPolicy.from_settings()
+    result = compute_final_grades(cohort, replace(policy, weights=EQUAL, bonus_letters=()))
+
+    # Assert
+    # -------
+    assert [name for name, _ in policy.bands] == ["A", "B", "C", "D"]
+    assert result.bands == ["A", "B", "C", "D"]
+
+
+def test_what_if_rejects_empty_bands(instructor_client):
+    response = instructor_client.post("/grades/final/what-if", json={"bands": {}})
+    assert response.status_code == 422
+
+
+def test_final_grades_inherit_team_and_review_grades(instructor_client, db_session):
+    # Arrange
+    # --------
+    project, (team, other), ((s1, s2), (s3,)) = _project_with_teams(db_session, "Final", [2, 1])
+    _project_with_teams(db_session, "Elsewhere", [1])
+    db_session.add_all([
+        TeamGrade(team_id=team.id, sprint=1, assignment=L.A, score=60),
+        TeamGrade(team_id=other.id, sprint=1, assignment=L.A, score=90),
+        Grade(student_id=s1.id, sprint=1, assignment=L.A, score=100),
+        PeerReview(sprint=1, reviewing_team_id=team.id, reviewed_team_id=other.id, review_grade=70),
+        PeerReview(sprint=1, reviewing_team_id=team.id, reviewed_team_id=other.id, review_grade=90),
+    ])
+    db_session.commit()
+
+    # Act
+    # ----
+    response = instructor_client.get(f"/grades/final?project_id={project.id}")
+
+    # Assert
+    # -------
+    assert response.status_code == 200
+    data = _by_student(response.json())
+    assert list(data) == [s1.id, s2.id, s3.id]
+    assert data[s1.id][2]["A"] == 100
+    assert data[s2.id][2]["A"] == 60
+    assert data[s2.id][2]["R"] == 80
+    assert data[s3.id][2]["R"] == 0
+    assert data[s1.id][2]["I"] is None
+
+
+def test_what_if_changes_weights_and_scores_without_writing(instructor_client, db_session):
+    # Arrange
+    # --------
+    project, _, ((s1, s2),) = _project_with_teams(db_session, "WhatIf", [2])
+    db_session.add_all([
+        Grade(student_id=s1.id, sprint=1, assignment=L.A, score=50),
+        Grade(student_id=s1.id, sprint=1, assignment=L.C, score=100),
+        Grade(student_id=s2.id, sprint=1, assignment=L.A, score=100),
+    ])
+    db_session.commit()
+
+    # Act
+    # ----
+    response = instructor_client.post(
+        f"/grades/final/what-if?project_id={project.id}",
+        json={
+            "weights": {"A": 1, "C": 3},
+            "bands": {"pass": 50, "fail": 0},
+            "overrides": [
+                {"studentId": s2.id, "sprint": 1, "assignment": "C", "score": 80},
+                {"studentId": s1.id, "sprint": 1, "assignment": "A", "score": None},
+            ],
+        },
+    )
+
+    # Assert
+    # -------
+    data = _by_student(response.json())
+    assert data[s1.id][:2] == (75, "pass")
+    assert data[s2.id][:2] == (85, "pass")
+    assert db_session.query(Grade).filter(Grade.student_id == s1.id).count() == 2
+
+
+@pytest.mark.parametrize("student_count", [3000])
+def test_final_grades_load(instructor_client, db_session, student_count):
+    # Arrange
+    # --------
+    project, teams, students = _project_with_teams(db_session, "Cohort", [5] * (student_count // 5))
+    db_session.execute(
+        insert(TeamGrade),
+        [
+            {"team_id": t.id, "sprint": sprint, "assignment": letter, "score": 70}
+            for t in teams
+            for sprint in range(1, 9)
+            for letter in (L.A, L.I)
+        ],
+    )
+    db_session.execute(
+        insert(Grade),
+        [
+            {"student_id": s.id, "sprint": sprint, "assignment": letter, "score": 80}
+            for team_students in students
+            for s in team_students
+            for sprint in range(1, 9)
+            for letter in (L.R, L.C)
+        ],
+    )
+    db_session.commit()
+    project_id = project.id
+
+    # Act
+    # ----
+    started = time.perf_counter()
+    response = instructor_client.post(
+        f"/grades/final/what-if?project_id={project_id}", json={"weights": {"A": 1, "C": 1}}
+    )
+    elapsed = time.perf_counter() - started
+
+    # Assert
+    # -------
+    data = response.json()
+    assert len(data["studentIds"]) == student_count
+    assert set(data["final"]) == {75}
+    assert elapsed < 1.5
@@ -0,0 +1,139 @@
+# tests/test_grade_fanout.py
+
+from sqlalchemy import insert
+
+from app.models.grade import AssignmentLetterEnum, Grade
+from app.models.grade_stat import GradeStat
+from app.models.project import Project
+from app.models.student import Student
+from app.models.team import Team
+from app.models.team_grade import TeamGrade
+from app.services.grade_stats import rebuild_grade_stats
+
+
+def _seed_project(db_session, name, teams, students_per_team):
+    project = Project(name=name, max_teams=teams, max_students_per_team=students_per_team)
+    db_session.add(project)
+    db_session.flush()
+    team_rows = [Team(name=f"{name} T{i}", color="#00AA00", project_id=project.id) for i in range(teams)]
+    db_session.add_all(team_rows)
+    db_session.flush()
+    db_session.execute(
+        insert(Student),
+        [
+            {"name": f"{name} S{t}.{i}", "email": f"{name}.{t}.{i}@example.com", "team_id": team.id}
+            for t, team in enumerate(team_rows)
+            for i in range(students_per_team)
+        ],
+    )
+    db_session.commit()
+    return project, team_rows
+
+
+def _grades(db_session, team):
+    return {
+        (g.student_id, g.sprint, g.assignment.value): g.score
+        for g in db_session.query(Grade).join(Student).filter(Student.team_id == team.id)
+    }
+
+
+def _stats_snapshot(db_session):
+    return sorted(
+        (r.scope, r.sprint, r.assignment.value, r.bucket, r.count, r.total, r.total_sq)
+        for r in db_session.query(GradeStat).filter(GradeStat.count != 0)
+    )
+
+
+def test_fan_out_copies_team_grades_to_members(instructor_client, db_session):
+    # Arrange
+    # --------
+    project, (t1, t2) = _seed_project(db_session, "fanout", 2, 3)
+    other, (stranger,) = _seed_project(db_session, "fanout-other", 1, 1)
+    db_session.add_all([
+        TeamGrade(team_id=t1.id, sprint=1, assignment=AssignmentLetterEnum.A, score=70),
+        TeamGrade(team_id=t1.id, sprint=1, assignment=AssignmentLetterEnum.TE, score=90),
+        TeamGrade(team_id=t2.id, sprint=1, assignment=AssignmentLetterEnum.A, score=55),
+        TeamGrade(team_id=t1.id, sprint=2, assignment=AssignmentLetterEnum.A, score=10),
+        TeamGrade(team_id=stranger.id, sprint=1, assignment=AssignmentLetterEnum.A, score=99),
+    ])
+    db_session.commit()
+    members = [s.id for s in db_session.query(Student).filter(Student.team_id == t1.id).order_by(Student.id)]
+    body = {"projectId": project.id, "sprint": 1}
+
+    # Act
+    # ----
+    first = instructor_client.post("/grades/fan-out", json=body)
+    after_first = _grades(db_session, t1)
+    second = instructor_client.post("/grades/fan-out", json={
+        **body,
+        "overrides": [{"studentId": members[0], "assignment": "A", "score": 100}],
+    })
+
+    # Assert
+    # -------
+    assert first.status_code == 200
+    assert first.json() == {"students": 6, "written": 9, "overridden": 0}
+    assert after_first == {
+        **{(sid, 1, "A"): 70 for sid in members},
+        **{(sid, 1, "TE"): 90 for sid in members},
+    }
+    assert set(_grades(db_session, t2).values()) == {55}
+    assert _grades(db_session, stranger) == {}
+
+    assert second.json() == {"students": 6, "written": 9, "overridden": 1}
+    assert _grades(db_session, t1) == {**after_first, (members[0], 1, "A"): 100}
+    assert db_session.query(Grade).join(Student).filter(
+        Student.team_id.in_([t1.id, t2.id])
+    ).count() == 9
+
+
+def test_fan_out_keeps_stats_consistent(instructor_client, db_session):
+    # Arrange
+    # --------
+    project, (team,) = _seed_project(db_session, "fanstats", 1, 4)
+    (sid, *_) = [s.id for s in db_session.query(Student).filter(Student.team_id == team.id)]
+    db_session.add(TeamGrade(team_id=team.id, sprint=4, assignment=AssignmentLetterEnum.R, score=80))
+    db_session.commit()
+    instructor_client.put("/grades/", json=[
+        {"studentId": sid, "sprint": 4, "assignment": "R", "score": 20},
+    ])
+
+    # Act
+    # ----
+    for _ in range(2):
+        instructor_client.post("/grades/fan-out", json={
+            "projectId": project.id,
+            "sprint": 4,
+            "overrides": [{"studentId": sid, "assignment": "C", "score": 35}],
+        })
+    incremental = _stats_snapshot(db_session)
+    rebuild_grade_stats(db_session)
+    rebuilt = _stats_snapshot(db_session)
+
+    # Assert
+    # -------
+    # командную оценку добавили мимо эндпоинта — сравниваем только scope student
+    assert [r for r in incremental if r[0] == "student"] == [r for r in rebuilt if r[0] == "student"]
+    student_r = [r for r in incremental if r[:3] == ("student", 4, "R")]
+    assert [r[3:5] for r in student_r] == [(8, 4)]
+
+
+def test_fan_out_rejects_overrides_outside_project(instructor_client, db_session):
+    # Arrange
+    # --------
+    project, _ = _seed_project(db_session, "fanreject", 1, 1)
+    _, (other_team,) = _seed_project(db_session, "fanreject-other", 1, 1)
+    outsider = db_session.query(Student).filter(Student.team_id == other_team.id).one()
+
+    # Act
+    # ----
+    response = instructor_client.post("/grades/fan-out", json={
+        "projectId": project.id,
+        "sprint": 1,
+        "overrides": [{"studentId": outsider.id, "assignment": "A", "score": 50}],
+    })
+
+    # Assert
+    # -------
+    assert response.status_code == 400
+    assert db_session.query(Grade).filter(Grade.student_id == outsider.id).count() == 0
@@ -0,0 +1,99 @@
+# tests/test_grade_matrix.py
+
+from sqlalchemy import insert
+
+from app.models.grade import AssignmentLetterEnum, Grade
+from app.models.project import Project
+from app.models.student import Student
+from app.models.team import Team
+
+LETTERS = [letter.value for letter in AssignmentLetterEnum]
+
+
+def _team_with_students(db_session, name, count, project_id=None):
+    team = Team(name=name, color="#0000AA", project_id=project_id)
+    db_session.add(team)
+    db_session.flush()
+    students = [
+        Student(name=f"{name} {i}", email=f"{name}.{i}@example.com".replace(" ", ""), team_id=team.id)
+        for i in range(count)
+    ]
+    db_session.add_all(students)
+    db_session.flush()
+    return team, students
+
+
+def test_matrix_is_dense_with_gaps(instructor_client, db_session, query_counter):
+    # Arrange
+    # --------
+    project = Project(name="Matrix", max_teams=2, max_students_per_team=3)
+    db_session.add(project)
+    db_session.flush()
+    team, (s1, s2, s3) = _team_with_students(db_session, "Matrix A", 3, project.id)
+    _team_with_students(db_session, "Matrix B", 1)
+    db_session.add_all([
+        Grade(student_id=s1.id, sprint=2, assignment=AssignmentLetterEnum.A, score=80),
+        Grade(student_id=s1.id, sprint=1, assignment=AssignmentLetterEnum.C, score=60),
+        Grade(student_id=s2.id, sprint=1, assignment=AssignmentLetterEnum.R, score=90),
+    ])
+    db_session.commit()
+    ids = [s1.id, s2.id, s3.id]
+
+    # Act
+    # ----
+    query_counter.reset()
+    by_project = instructor_client.get(f"/grades/matrix?project_id={project.id}")
+    queries = query_counter.count
+    by_team = instructor_client.get(f"/grades/matrix?team_id={team.id}")
+
+    # Assert
+    # -------
+    assert by_project.status_code == 200
+    data = by_project.json()
+    assert data == {
+        "studentIds": ids,
+        "sprints": [1, 1, 2],
+        "assignments": ["R", "C", "A"],
+        "scores": [[None, 60, 80], [90, None, None], [None, None, None]],
+    }
+    assert by_team.json() == data
+    assert queries <= 2
+
+
+def test_matrix_payload_is_much_smaller_than_list(instructor_client, db_session):
+    # Arrange
+    # --------
+    project = Project(name="Big matrix", max_teams=60, max_students_per_team=5)
+    db_session.add(project)
+    db_session.flush()
+    students = []
+    for t in range(60):
+        students += _team_with_students(db_session, f"Big {t}", 5, project.id)[1]
+    db_session.execute(
+        insert(Grade),
+        [
+            {"student_id": s.id, "sprint": sprint, "assignment": letter, "score": 75}
+            for s in students
+            for sprint in range(1, 9)
+            for letter in LETTERS
+        ],
+    )
+    db_session.commit()
+
+    # Act
+    # ----
+    matrix = instructor_client.get(f"/grades/matrix?project_id={project.id}")
+    flat_bytes, url = 0, "/grades/?limit=1000"
+    while url:
+        page = instructor_client.get(url)
+        flat_bytes += len(page.content)
+        cursor = page.headers.get("X-Next-Cursor")
+        url = cursor and f"/grades/?limit=1000&cursor={cursor}"
+
+    # Assert
+    # -------
+    data = matrix.json()
+    assert len(data["studentIds"]) == 300
+    assert len(data["sprints"]) == 8 * len(LETTERS)
+    assert all(row == [75] * 8 * len(LETTERS) for row in data["scores"])
+    assert len(matrix.content) * 10 < flat_bytes
@@ -0,0 +1,140 @@
+# tests/test_grade_stats.py
+
+from app.models.grade import AssignmentLetterEnum, Grade
+from app.models.grade_stat import GradeStat
+from app.models.student import Student
+from app.models.team import Team
+from app.services.grade_stats import grade_stat_summaries, rebuild_grade_stats
+from app.services.jobs import run_pending
+
+
+def _students(db_session, count, prefix):
+    team = Team(name=f"{prefix} team", color="#AA5500")
+    db_session.add(team)
+    db_session.flush()
+    students = [
+        Student(name=f"{prefix} {i}", email=f"{prefix}{i}@example.com", team_id=team.id)
+        for i in range(count)
+    ]
+    db_session.add_all(students)
+    db_session.commit()
+    return team.id, [s.id for s in students]
+
+
+def _stats(client, **params):
+    query = "&".join(f"{k}={v}" for k, v in params.items())
+    return {(s["scope"], s["sprint"], s["assignment"]): s for s in client.get(f"/grades/stats?{query}").json()}
+
+
+def _snapshot(db_session):
+    return sorted(
+        (r.scope, r.sprint, r.assignment.value, r.bucket, r.count, r.total, r.total_sq)
+        for r in db_session.query(GradeStat).filter(GradeStat.count != 0)
+    )
+
+
+def test_grade_writes_maintain_stats(instructor_client, db_session):
+    # Arrange
+    # --------
+    _, ids = _students(db_session, 4, "stats")
+    sprint = 7
+
+    # Act
+    # ----
+    instructor_client.put("/grades/", json=[
+        {"studentId": sid, "sprint": sprint, "assignment": "A", "score": score}
+        for sid, score in zip(ids, [50, 70, 90, 100])
+    ])
+    saved = instructor_client.put("/grades/", json=[
+        {"studentId": ids[0], "sprint": sprint, "assignment": "A", "score": 60},
+    ]).json()
+    instructor_client.put("/grades/", json=[
+        {"id": saved[0]["id"], "studentId": ids[0], "sprint": sprint, "assignment": "C", "score": 60},
+    ])
+    instructor_client.delete(f"/students/{ids[3]}")
+    stats = _stats(instructor_client, sprint=sprint)
+
+    # Assert
+    # -------
+    a = stats[("student", sprint, "A")]
+    assert a["count"] == 2
+    assert a["mean"] == 80
+    assert a["stddev"] == 10
+    assert a["histogram"][7] == 1 and a["histogram"][9] == 1
+    assert stats[("student", sprint, "C")]["count"] == 1
+    assert 60 <= stats[("student", sprint, "C")]["median"] < 70
+
+
+def test_team_grade_writes_maintain_stats(instructor_client, db_session):
+    # Arrange
+    # --------
+    team_id, _ = _students(db_session, 1, "teamstats")
+    sprint = 6
+
+    # Act
+    # ----
+    created = instructor_client.post(
+        "/team-grades/", json={"teamId": team_id, "sprint": sprint, "assignment": "TE", "score": 40}
+    ).json()
+    instructor_client.put(f"/team-grades/{created['id']}", json={"score": 45})
+    after_update = _stats(instructor_client, scope="team", sprint=sprint)
+    instructor_client.delete(f"/team-grades/{created['id']}")
+    after_delete = _stats(instructor_client, scope="team", sprint=sprint)
+
+    # Assert
+    # -------
+    assert after_update[("team", sprint, "TE")]["mean"] == 45
+    assert after_update[("team", sprint, "TE")]["count"] == 1
+    assert after_delete == {}
+
+
+def test_rebuild_matches_incremental_stats(instructor_client, db_session):
+    # Arrange
+    # --------
+    _, ids = _students(db_session, 20, "rebuildstats")
+    instructor_client.put("/grades/", json=[
+        {"studentId": sid, "sprint": s, "assignment": letter, "score": (sid * 7 + s) % 105}
+        for sid in ids
+        for s in (1, 2)
+        for letter in ("A", "R")
+    ])
+    incremental = _snapshot(db_session)
+
+    # Act
+    # ----
+    db_session.query(GradeStat).delete()
+    db_session.add(Grade(student_id=ids[0], sprint=3, assignment=AssignmentLetterEnum.E, score=5))
+    db_session.commit()
+    response = instructor_client.post("/grades/stats/rebuild")
+    run_pending(db_session)
+
+    # Assert
+    # -------
+    assert response.status_code == 202
+    rebuilt = _snapshot(db_session)
+    assert [r for r in rebuilt if r[1] != 3] == incremental
+    assert [r[:5] for r in rebuilt if r[1] == 3] == [("student", 3, "E", 0, 1)]
+
+
+def test_percentiles_from_histogram(db_session):
+    # Arrange
+    # --------
+    _, ids = _students(db_session, 10, "pctstats")
+    db_session.add_all([
+        Grade(student_id=sid, sprint=5, assignment=AssignmentLetterEnum.I, score=score)
+        for sid, score in zip(ids, [10, 20, 30, 40, 50, 60, 70, 80, 90, 110])
+    ])
+    db_session.commit()
+    rebuild_grade_stats(db_session)
+
+    # Act
+    # ----
+    (summary,) = grade_stat_summaries(db_session, scope="student", sprint=5)
+
+    # Assert
+    # -------
+    assert summary.count == 10
+    assert summary.mean == 56
+    assert 50 <= summary.median <= 60
+    assert summary.p90 >= 90
+    assert summary.histogram[-1] == 1
@@ -0,0 +1,139 @@
+# tests/test_grade_upsert.py
+
+from sqlalchemy import create_engine, text
+from sqlalchemy.orm import Session
+
+from app.models.base import Base
+from app.models.grade import AssignmentLetterEnum, Grade
+from app.models.student import Student
+from app.models.team import Team
+from app.services.grade_store import GRADE_NATURAL_KEY_INDEX, ensure_grade_natural_key
+
+LETTERS = [letter.value for letter in AssignmentLetterEnum]
+
+
+def _students(db_session, count, prefix):
+    team = Team(name=f"{prefix} team", color="#AA00AA")
+    db_session.add(team)
+    db_session.flush()
+    students = [
+        Student(name=f"{prefix} {i}", email=f"{prefix}{i}@example.com", team_id=team.id)
+        for i in range(count)
+    ]
+    db_session.add_all(students)
+    db_session.commit()
+    return [s.id for s in students]
+
+
+def test_gradebook_save_is_a_handful_of_statements(instructor_client, db_session, query_counter):
+    # Arrange
+    # --------
+    student_ids = _students(db_session, 200, "bulkgrade")
+    payload = [
+        {"studentId": sid, "sprint": 1, "assignment": letter, "score": 50}
+        for sid in student_ids
+        for letter in LETTERS
+    ]
+
+    # Act
+    # ----
+    query_counter.reset()
+    first = instructor_client.put("/grades/", json=payload)
+    first_queries = query_counter.count
+    second = instructor_client.put(
+        "/grades/", json=[{**item, "score": 60} for item in payload]
+    )
+
+    # Assert
+    # -------
+    assert first.status_code == 200
+    assert len(first.json()) == 200 * len(LETTERS)
+    assert first_queries < 10
+    assert [g["id"] for g in second.json()] == [g["id"] for g in first.json()]
+    assert {g["score"] for g in second.json()} == {60}
+    assert db_session.query(Grade).filter(Grade.student_id.in_(student_ids)).count() == len(payload)
+
+
+def test_duplicate_keys_in_one_save_collapse(instructor_client, db_session):
+    # Arrange
+    # --------
+    (sid,) = _students(db_session, 1, "dupgrade")
+    item = {"studentId": sid, "sprint": 2, "assignment": "R"}
+
+    # Act
+    # ----
+    response = instructor_client.put("/grades/", json=[{**item, "score": 10}, {**item, "score": 20}])
+
+    # Assert
+    # -------
+    assert response.status_code == 200
+    data = response.json()
+    assert data[0]["id"] == data[1]["id"]
+    assert db_session.query(Grade).filter(Grade.student_id == sid).one().score == 20
+
+
+def test_grade_with_id_can_move_to_another_key(instructor_client, db_session):
+    # Arrange
+    # --------
+    (sid,) = _students(db_session, 1, "movegrade")
+    grade = Grade(student_id=sid, sprint=1, assignment=AssignmentLetterEnum.A, score=70)
+    db_session.add(grade)
+    db_session.commit()
+    grade_id = grade.id
+
+    # Act
+    # ----
+    moved = instructor_client.put(
+        "/grades/", json=[{"id": grade_id, "studentId": sid, "sprint": 3, "assignment": "A", "score": 71}]
+    )
+    missing = instructor_client.put(
+        "/grades/", json=[{"id": 999999, "studentId": sid, "sprint": 1, "assignment": "A", "score": 1}]
+    )
+
+    # Assert
+    # -------
+    assert moved.json()[0]["id"] == grade_id
+    db_session.expire_all()
+    assert db_session.get(Grade, grade_id).sprint == 3
+    assert missing.status_code == 404
+
+
+def test_legacy_post_uses_upsert(instructor_client, db_session):
+    # Arrange
+    # --------
+    (sid,) = _students(db_session, 1, "legacygrade")
+    item = {"studentId": sid, "sprint": 1, "assignment": "C", "score": 40}
+
+    # Act
+    # ----
+    first = instructor_client.post("/grades/", json=[item])
+    second = instructor_client.post("/grades/", json=[{**item, "score": 45}])
+
+    # Assert
+    # -------
+    assert (first.status_code, second.status_code) == (204, 204)
+    assert db_session.query(Grade).filter(Grade.student_id == sid).one().score == 45
+
+
+def test_ensure_natural_key_dedupes_existing_table(tmp_path):
+    # Arrange
+    # --------
+    engine = create_engine(f"sqlite:///{tmp_path / 'grades.db'}")
+    Base.metadata.create_all(bind=engine)
+    with engine.begin() as conn:
+        conn.execute(text(f"DROP INDEX {GRADE_NATURAL_KEY_INDEX}"))
+        for score in (1, 2, 3):
+            conn.execute(text(
+                "INSERT INTO grades (student_id, sprint, assignment, score) VALUES (1, 1, 'A', :s)"
+            ), {"s": score})
+
+    # Act
+    # ----
+    ensure_grade_natural_key(engine)
+    ensure_grade_natural_key(engine)
+
+    # Assert
+    # -------
+    with Session(engine) as session:
+        assert [g.score for g in session.query(Grade)] == [3]
+    engine.dispose()
@@ -0,0 +1,79 @@
+# tests/test_instructor_dashboard.py
+
+from app.models.grade import AssignmentLetterEnum, Grade
+from app.models.peer_review import PeerReview, PeerReviewStatus
+from app.models.project import Project
+from app.models.student import Student
+from app.models.team import Team
+from app.models.team_grade import TeamGrade
+
+
+def _seed(db_session):
+    project = Project(name="Course", max_teams=2, max_students_per_team=2)
+    other = Project(name="Other", max_teams=1, max_students_per_team=1)
+    db_session.add_all([project, other])
+    db_session.flush()
+
+    t1 = Team(name="Alpha", color="#111111", project_id=project.id)
+    t2 = Team(name="Beta", color="#222222", project_id=project.id)
+    t3 = Team(name="Gamma", color="#333333", project_id=other.id)
+    db_session.add_all([t1, t2, t3])
+    db_session.flush()
+
+    s1 = Student(name="S1", email="s1@example.com", team_id=t1.id)
+    s2 = Student(name="S2", email="s2@example.com", team_id=t1.id)
+    s3 = Student(name="S3", email="s3@example.com", team_id=t3.id)
+    db_session.add_all([s1, s2, s3])
+    db_session.flush()
+
+    db_session.add_all([
+        Grade(student_id=s1.id, sprint=1, assignment=AssignmentLetterEnum.A, score=80),
+        Grade(student_id=s2.id, sprint=1, assignment=AssignmentLetterEnum.A, score=90),
+        Grade(student_id=s3.id, sprint=1, assignment=AssignmentLetterEnum.A, score=10),
+        TeamGrade(team_id=t2.id, sprint=1, assignment=AssignmentLetterEnum.R, score=70),
+        PeerReview(sprint=1, reviewing_team_id=t1.id, reviewed_team_id=t2.id,
+                   status=PeerReviewStatus.SUBMITTED),
+        PeerReview(sprint=1, reviewing_team_id=t2.id, reviewed_team_id=t1.id,
+                   status=PeerReviewStatus.PENDING),
+        PeerReview(sprint=2, reviewing_team_id=t1.id, reviewed_team_id=t2.id,
+                   status=PeerReviewStatus.GRADED),
+    ])
+    db_session.commit()
+    return project, t1, t2
+
+
+def test_instructor_dashboard_aggregates(instructor_client, db_session):
+    # Arrange
+    # --------
+    project, t1, t2 = _seed(db_session)
+
+    # Act
+    # ----
+    response = instructor_client.get(f"/dashboard/instructor/{project.id}")
+
+    # Assert
+    # -------
+    assert response.status_code == 200
+    data = response.json()
+    assert data["projectId"] == project.id
+
+    teams = {t["teamId"]: t for t in data["teams"]}
+    assert set(teams) == {t1.id, t2.id}
+    assert teams[t1.id]["studentCount"] == 2
+    assert teams[t1.id]["avgStudentScore"] == 85
+    assert teams[t1.id]["avgTeamScore"] is None
+    assert teams[t2.id]["avgTeamScore"] == 70
+    assert teams[t2.id]["studentGradeCount"] == 0
+
+    assert data["reviewStatus"] == [
+        {"sprint": 1, "pending": 1, "submitted": 1, "graded": 0},
+        {"sprint": 2, "pending": 0, "submitted": 0, "graded": 1},
+    ]
+    assert len(data["pendingReviews"]) == 1
+    assert data["pendingReviews"][0]["reviewingTeamName"] == "Beta"
+    assert data["pendingReviews"][0]["reviewedTeamName"] == "Alpha"
+
+
+def test_instructor_dashboard_unknown_project(instructor_client):
+    response = instructor_client.get("/dashboard/instructor/999999")
+    assert response.status_code == 404
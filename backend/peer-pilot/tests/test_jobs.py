@@ -0,0 +1,252 @@
+# tests/test_jobs.py
+
+import time
+from datetime import datetime, timedelta
+
+import pytest
+from sqlalchemy import create_engine, event
+from sqlalchemy.orm import sessionmaker
+
+from main import web_app
+from app.core.config import app_settings
+from app.core.security import get_current_user
+from app.models.base import Base
+from app.models.job import Job, JobStatus
+from app.models.peer_review import PeerReview
+from app.models.student import Student
+from app.models.team import Team
+from app.models.user import User, UserRole
+from app.services import jobs
+
+
+@pytest.fixture
+def job_sessions(tmp_path):
+    """
+    Файловая SQLite и настоящие commit/rollback: воркер откатывает упавшую
+    задачу, что в транзакционной db_session откатило бы весь тест.
+    Возвращает фабрику сессий — по одной на "воркер".
+    """
+    engine = create_engine(f"sqlite:///{tmp_path / 'jobs.db'}")
+    Base.metadata.create_all(bind=engine)
+    factory = sessionmaker(bind=engine, autoflush=False)
+    opened = []
+
+    def open_session():
+        session = factory()
+        opened.append(session)
+        return session
+
+    yield open_session
+    for session in opened:
+        session.close()
+    engine.dispose()
+
+
+@pytest.fixture
+def flaky_handler(monkeypatch):
+    calls = []
+
+    def handler(db, payload):
+        calls.append(payload)
+        if len(calls) <= payload["failures"]:
+            raise RuntimeError("boom")
+        return {"calls": len(calls)}
+
+    monkeypatch.setitem(jobs.JOB_HANDLERS, "flaky", handler)
+    monkeypatch.setattr(app_settings, "JOB_RETRY_BACKOFF_SECONDS", 0)
+    return calls
+
+
+def test_locking_last_team_enqueues_regeneration(instructor_client, db_session):
+    # Arrange
+    # --------
+    teams = [Team(name=f"Job Team {i}", color="#123456", is_locked=i > 0) for i in range(3)]
+    db_session.add_all(teams)
+    db_session.flush()
+    db_session.add_all(
+        Student(name=f"Job Student {i}", email=f"job{i}@example.com", team_id=team.id)
+        for i, team in enumerate(teams)
+    )
+    db_session.commit()
+    team_id = teams[0].id
+
+    # Act
+    # ----
+    response = instructor_client.patch(f"/teams/{team_id}", json={"isLocked": True})
+    job_id = int(response.headers["X-Job-Id"])
+    queued = instructor_client.get(f"/jobs/{job_id}").json()
+    reviews_before = db_session.query(PeerReview).count()
+    done = jobs.run_pending(db_session)
+    finished = instructor_client.get(f"/jobs/{job_id}").json()
+
+    # Assert
+    # -------
+    assert response.status_code == 200
+    assert queued["status"] == "queued"
+    assert reviews_before == 0
+    assert done == 1
+    assert finished["status"] == "succeeded"
+    assert finished["attempts"] == 1
+    assert db_session.query(PeerReview).count() > 0
+
+
+def test_job_status_is_instructor_only(client, db_session):
+    # Arrange
+    # --------
+    job = jobs.enqueue(db_session, "moodle_export", {"file_token": "secret"})
+    db_session.commit()
+    student = User(name="Nosy", email="nosy@example.com", hashed_password="x", role=UserRole.STUDENT)
+    web_app.dependency_overrides[get_current_user] = lambda: student
+
+    # Act
+    # ----
+    response = client.get(f"/jobs/{job.id}")
+
+    # Assert
+    # -------
+    assert response.status_code == 403
+
+
+def test_failed_job_is_retried_then_succeeds(job_sessions, flaky_handler):
+    # Arrange
+    # --------
+    db = job_sessions()
+    job = jobs.enqueue(db, "flaky", {"failures": 1})
+    db.commit()
+
+    # Act
+    # ----
+    jobs.run_next(db, "w1")
+    db.refresh(job)
+    after_failure = (job.status, job.attempts, job.error)
+    jobs.run_next(db, "w1")
+    db.refresh(job)
+
+    # Assert
+    # -------
+    assert after_failure == (JobStatus.QUEUED, 1, "RuntimeError: boom")
+    assert job.status == JobStatus.SUCCEEDED
+    assert job.attempts == 2
+    assert job.result == '{"calls": 2}'
+
+
+def test_job_fails_after_max_attempts(job_sessions, flaky_handler):
+    # Arrange
+    # --------
+    db = job_sessions()
+    job = jobs.enqueue(db, "flaky", {"failures": 10}, max_attempts=2)
+    db.commit()
+
+    # Act
+    # ----
+    done = jobs.run_pending(db)
+    db.refresh(job)
+
+    # Assert
+    # -------
+    assert done == 2
+    assert job.status == JobStatus.FAILED
+    assert job.finished_at is not None
+    assert len(flaky_handler) == 2
+
+
+def test_job_is_claimed_by_one_worker_only(job_sessions):
+    # Arrange
+    # --------
+    db = job_sessions()
+    jobs.enqueue(db, "flaky", {"failures": 0})
+    db.commit()
+
+    # Act
+    # ----
+    first = jobs.claim_next(db, "w1")
+    second = jobs.claim_next(job_sessions(), "w2")
+
+    # Assert
+    # -------
+    assert first is not None and first.locked_by == "w1"
+    assert second is None
+
+
+def test_stale_running_job_is_requeued(job_sessions):
+    # Arrange
+    # --------
+    db = job_sessions()
+    job = jobs.enqueue(db, "flaky", {"failures": 0})
+    db.commit()
+    jobs.claim_next(db, "dead-worker")
+    job.locked_at = datetime.utcnow() - timedelta(seconds=app_settings.JOB_LEASE_SECONDS + 1)
+    db.commit()
+
+    # Act
+    # ----
+    reclaimed = jobs.claim_next(job_sessions(), "w2")
+
+    # Assert
+    # -------
+    assert reclaimed.id == job.id
+    assert reclaimed.locked_by == "w2"
+    assert reclaimed.attempts == 2
+
+
+def test_enqueue_deduplicates_queued_jobs(job_sessions):
+    db = job_sessions()
+    first = jobs.enqueue(db, "flaky", {}, dedupe_key="project:1")
+    second = jobs.enqueue(db, "flaky", {}, dedupe_key="project:1")
+
+    assert first.id == second.id
+    assert db.query(Job).filter(Job.dedupe_key == "project:1").count() == 1
+
+
+def test_idle_poll_does_not_write(job_sessions):
+    # Arrange
+    # --------
+    db = job_sessions()
+    writes = []
+
+    def _on_execute(conn, cursor, statement, parameters, context, executemany):
+        if not statement.lstrip().upper().startswith("SELECT"):
+            writes.append(statement)
+
+    event.listen(db.get_bind(), "before_cursor_execute", _on_execute)
+
+    # Act
+    # ----
+    try:
+        for _ in range(3):
+            jobs.claim_next(db, "idle")
+    finally:
+        event.remove(db.get_bind(), "before_cursor_execute", _on_execute)
+
+    # Assert
+    # -------
+    assert writes == []
+
+
+def test_heartbeat_keeps_long_job_leased(job_sessions, monkeypatch):
+    # Arrange
+    # --------
+    monkeypatch.setattr(app_settings, "JOB_LEASE_SECONDS", 0.3)
+    stolen = []
+
+    def slow(db, payload):
+        time.sleep(1.0)
+        # другой воркер в это время ищет зависшие задачи
+        stolen.append(jobs.claim_next(job_sessions(), "w2"))
+        return {"done": True}
+
+    monkeypatch.setitem(jobs.JOB_HANDLERS, "slow", slow)
+    db = job_sessions()
+    job_id = jobs.enqueue(db, "slow").id
+    db.commit()
+
+    # Act
+    # ----
+    jobs.run_next(db, "w1", session_factory=job_sessions)
+
+    # Assert
+    # -------
+    assert stolen == [None]
+    job = job_sessions().get(Job, job_id)
+    assert job.status == JobStatus.SUCCEEDED
+    assert job.attempts == 1
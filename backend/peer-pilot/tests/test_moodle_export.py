@@ -0,0 +1,162 @@
+# tests/test_moodle_export.py
+
+import csv
+import io
+import os
+import time
+
+import pytest
+from sqlalchemy import insert
+
+from app.api.endpoints import grades as grades_endpoint
+from app.core.config import app_settings
+from app.models.grade import AssignmentLetterEnum, Grade
+from app.models.project import Project
+from app.models.student import Student
+from app.models.team import Team
+from app.models.team_grade import TeamGrade
+from app.services.jobs import run_pending
+
+LETTERS = [letter.value for letter in AssignmentLetterEnum]
+
+
+def _rows(response):
+    return list(csv.reader(io.StringIO(response.text)))
+
+
+def _seed_project(db_session, name, students_per_team, teams=1):
+    project = Project(name=name, max_teams=teams, max_students_per_team=students_per_team)
+    db_session.add(project)
+    db_session.flush()
+    team_rows = [Team(name=f"{name} T{i}", color="#111111", project_id=project.id) for i in range(teams)]
+    db_session.add_all(team_rows)
+    db_session.flush()
+    db_session.execute(
+        insert(Student),
+        [
+            {"name": f"{name} S{t}.{i}", "email": f"{name}.{t}.{i}@example.com", "team_id": team.id}
+            for t, team in enumerate(team_rows)
+            for i in range(students_per_team)
+        ],
+    )
+    db_session.commit()
+    return project, team_rows
+
+
+def test_export_pivots_team_and_individual_grades(instructor_client, db_session):
+    # Arrange
+    # --------
+    project, (team,) = _seed_project(db_session, "moodle", 2)
+    other, _ = _seed_project(db_session, "other", 1)
+    s1, s2 = db_session.query(Student).filter(Student.team_id == team.id).order_by(Student.id)
+    db_session.add_all([
+        TeamGrade(team_id=team.id, sprint=1, assignment=AssignmentLetterEnum.A, score=70),
+        TeamGrade(team_id=team.id, sprint=2, assignment=AssignmentLetterEnum.A, score=75),
+        Grade(student_id=s1.id, sprint=1, assignment=AssignmentLetterEnum.A, score=95),
+        Grade(student_id=s2.id, sprint=1, assignment=AssignmentLetterEnum.I, score=60),
+    ])
+    db_session.commit()
+
+    # Act
+    # ----
+    full = instructor_client.get(f"/grades/export/moodle?project_id={project.id}")
+    sprint_1 = instructor_client.get(f"/grades/export/moodle?project_id={project.id}&sprint=1")
+
+    # Assert
+    # -------
+    assert full.status_code == 200
+    assert full.headers["content-type"].startswith("text/csv")
+    header, *rows = _rows(full)
+    assert header == ["Full name", "Email address", "Team",
+                      "Sprint 1 A", "Sprint 1 I", "Sprint 2 A"]
+    assert rows == [
+        [s1.name, s1.email, team.name, "95", "", "75"],
+        [s2.name, s2.email, team.name, "70", "60", "75"],
+    ]
+    assert _rows(sprint_1)[0][3:] == ["Sprint 1 A", "Sprint 1 I"]
+    assert len(_rows(sprint_1)) == 3
+
+
+@pytest.mark.parametrize("student_count", [200, 1000])
+def test_export_load(instructor_client, db_session, query_counter, student_count):
+    # Arrange
+    # --------
+    project, teams = _seed_project(db_session, f"load{student_count}", 5, teams=student_count // 5)
+    db_session.execute(
+        insert(Grade),
+        [
+            {"student_id": sid, "sprint": sprint, "assignment": letter, "score": 80}
+            for (sid,) in db_session.query(Student.id).filter(
+                Student.team_id.in_([t.id for t in teams])
+            )
+            for sprint in range(1, 9)
+            for letter in LETTERS
+        ],
+    )
+    db_session.commit()
+    project_id = project.id
+
+    # Act
+    # ----
+    query_counter.reset()
+    started = time.perf_counter()
+    response = instructor_client.get(f"/grades/export/moodle?project_id={project_id}")
+    elapsed = time.perf_counter() - started
+
+    # Assert
+    # -------
+    rows = _rows(response)
+    assert len(rows) == student_count + 1
+    assert len(rows[0]) == 3 + 8 * len(LETTERS)
+    assert all(row[3:] == ["80"] * 8 * len(LETTERS) for row in rows[1:])
+    assert elapsed < 10  # QAS002
+    # колонки + один курсор по данным (+ перечитывание пользователя фикстуры после commit)
+    assert query_counter.count <= 3
+
+
+def test_export_as_background_job(instructor_client, db_session, tmp_path, monkeypatch):
+    # Arrange
+    # --------
+    monkeypatch.setattr(grades_endpoint, "EXPORT_DIR", tmp_path)
+    project, _ = _seed_project(db_session, "jobexport", 3)
+
+    # Act
+    # ----
+    job_id = instructor_client.post(f"/grades/export/moodle/jobs?project_id={project.id}").json()["jobId"]
+    pending = instructor_client.get(f"/grades/export/moodle/jobs/{job_id}")
+    run_pending(db_session)
+    ready = instructor_client.get(f"/grades/export/moodle/jobs/{job_id}")
+
+    # Assert
+    # -------
+    assert pending.status_code == 409
+    assert ready.status_code == 200
+    assert len(_rows(ready)) == 4
+
+
+def test_old_export_files_expire(instructor_client, db_session, tmp_path, monkeypatch):
+    # Arrange
+    # --------
+    monkeypatch.setattr(grades_endpoint, "EXPORT_DIR", tmp_path)
+    project, _ = _seed_project(db_session, "ttlexport", 1)
+    first_id = instructor_client.post(f"/grades/export/moodle/jobs?project_id={project.id}").json()["jobId"]
+    run_pending(db_session)
+    (old_file,) = tmp_path.glob("moodle_*.csv")
+    expired = time.time() - app_settings.MOODLE_EXPORT_TTL_SECONDS - 60
+    os.utime(old_file, (expired, expired))
+
+    # Act
+    # ----
+    stale = instructor_client.get(f"/grades/export/moodle/jobs/{first_id}")
+    (tmp_path / "moodle_leftover.csv").write_text("x")
+    os.utime(tmp_path / "moodle_leftover.csv", (expired, expired))
+    second_id = instructor_client.post(f"/grades/export/moodle/jobs?project_id={project.id}").json()["jobId"]
+    run_pending(db_session)
+
+    # Assert
+    # -------
+    assert stale.status_code == 404
+    assert not old_file.exists()
+    assert not (tmp_path / "moodle_leftover.csv").exists()
+    assert instructor_client.get(f"/grades/export/moodle/jobs/{second_id}").status_code == 200
+    assert len(list(tmp_path.glob("moodle_*.csv"))) == 1
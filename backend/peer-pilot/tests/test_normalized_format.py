@@ -0,0 +1,97 @@
+# tests/test_normalized_format.py
+
+from app.models.dashboard_snapshot import DashboardSnapshot
+from app.models.peer_review import PeerReview
+from app.models.project import Project
+from app.models.student import Student
+from app.models.team import Team
+
+
+def _course(db_session, n_teams=6, per_team=4, sprints=3):
+    project = Project(name="Normalized", max_teams=n_teams, max_students_per_team=per_team)
+    db_session.add(project)
+    db_session.flush()
+    teams = [Team(name=f"Norm {i}", color="#445566", project_id=project.id) for i in range(n_teams)]
+    db_session.add_all(teams)
+    db_session.flush()
+    db_session.add_all([
+        Student(name=f"Norm {t.id}.{i}", email=f"norm{t.id}.{i}@example.com", team_id=t.id)
+        for t in teams
+        for i in range(per_team)
+    ])
+    db_session.add_all([
+        PeerReview(sprint=s, reviewing_team_id=t.id, reviewed_team_id=teams[(i + s) % n_teams].id)
+        for s in range(1, sprints + 1)
+        for i, t in enumerate(teams)
+    ])
+    db_session.commit()
+    return teams
+
+
+def test_dashboard_normalized_lists_each_entity_once(instructor_client, db_session):
+    # Arrange
+    # --------
+    teams = _course(db_session, sprints=8)
+    student = teams[0].students[0]
+    student_id, team_ids = student.id, [t.id for t in teams]
+
+    # Act
+    # ----
+    nested = instructor_client.get(f"/dashboard/students/{student_id}?scope=project")
+    normalized = instructor_client.get(f"/dashboard/students/{student_id}?scope=project&format=normalized")
+
+    # Assert
+    # -------
+    body = normalized.json()
+    data, entities = body["data"], body["entities"]
+    assert data["studentId"] == student_id
+    assert data["teamIds"] == team_ids
+    assert sorted(entities["teams"]) == sorted(str(t) for t in team_ids)
+    assert len(entities["students"]) == 6 * 4
+    assert entities["teams"][str(team_ids[0])]["studentIds"] == [s["id"] for s in nested.json()["teams"][0]["students"]]
+    review = data["reviewAssignments"][0]
+    assert "reviewingTeam" not in review and str(review["reviewingTeamId"]) in entities["teams"]
+    assert len(normalized.content) * 3 < len(nested.content)
+    assert "teams" in nested.json()
+
+
+def test_dashboard_formats_have_separate_snapshots(instructor_client, db_session, query_counter):
+    # Arrange
+    # --------
+    teams = _course(db_session, n_teams=2, per_team=1, sprints=1)
+    student_id = teams[0].students[0].id
+    first = instructor_client.get(f"/dashboard/students/{student_id}?format=normalized")
+
+    # Act
+    # ----
+    query_counter.reset()
+    second = instructor_client.get(f"/dashboard/students/{student_id}?format=normalized")
+    cached_queries = query_counter.count
+    nested = instructor_client.get(f"/dashboard/students/{student_id}")
+
+    # Assert
+    # -------
+    assert first.content == second.content
+    assert cached_queries == 1
+    assert "student" in nested.json()
+    assert db_session.get(DashboardSnapshot, (student_id, "all:normalized")) is not None
+    assert db_session.get(DashboardSnapshot, (student_id, "all")) is not None
+
+
+def test_peer_review_list_normalized_with_paging(instructor_client, db_session):
+    # Arrange
+    # --------
+    _course(db_session, n_teams=3, per_team=2, sprints=2)
+
+    # Act
+    # ----
+    response = instructor_client.get("/peer-reviews/?format=normalized&limit=4&fields=id,reviewingTeamId,reviewedTeamId")
+
+    # Assert
+    # -------
+    body = response.json()
+    assert [r.keys() for r in body["data"]] == [{"id", "reviewingTeamId", "reviewedTeamId"}] * 4
+    referenced = {r["reviewingTeamId"] for r in body["data"]} | {r["reviewedTeamId"] for r in body["data"]}
+    assert {int(k) for k in body["entities"]["teams"]} == referenced
+    assert len(body["entities"]["students"]) == 2 * len(referenced)
+    assert "X-Next-Cursor" in response.headers
@@ -0,0 +1,112 @@
+# tests/test_pagination.py
+
+from sqlalchemy import text
+
+from app.api.pagination import encode_cursor
+from app.core.config import app_settings
+from app.models.grade import AssignmentLetterEnum, Grade
+from app.models.peer_review import PeerReview
+from app.models.student import Student
+from app.models.team import Team
+
+
+def _walk(client, url):
+    pages, cursor = [], None
+    while True:
+        sep = "&" if "?" in url else "?"
+        response = client.get(url + (f"{sep}cursor={cursor}" if cursor else ""))
+        assert response.status_code == 200
+        pages.append(response)
+        cursor = response.headers.get("X-Next-Cursor")
+        if not cursor:
+            return pages
+
+
+def test_students_are_paged_by_id(instructor_client, db_session):
+    # Arrange
+    # --------
+    db_session.add_all([Student(name=f"Paged {i}", email=f"paged{i}@example.com") for i in range(25)])
+    db_session.commit()
+
+    # Act
+    # ----
+    pages = _walk(instructor_client, "/students/?limit=10")
+
+    # Assert
+    # -------
+    ids = [s["id"] for page in pages for s in page.json()]
+    assert [len(page.json()) for page in pages] == [10, 10, 5]
+    assert ids == sorted(set(ids))
+    assert 'rel="next"' in pages[0].headers["Link"]
+    assert "cursor=" in pages[0].headers["Link"]
+    assert "Link" not in pages[-1].headers
+
+
+def test_filters_apply_before_paging(instructor_client, db_session):
+    # Arrange
+    # --------
+    team = Team(name="Paged team", color="#222222")
+    db_session.add(team)
+    db_session.flush()
+    student, other = Student(name="P1", email="p1@example.com"), Student(name="P2", email="p2@example.com")
+    db_session.add_all([student, other])
+    db_session.flush()
+    db_session.add_all([
+        Grade(student_id=sid, sprint=sprint, assignment=AssignmentLetterEnum.A, score=50)
+        for sid in (student.id, other.id)
+        for sprint in range(1, 8)
+    ])
+    db_session.add_all([
+        PeerReview(sprint=1, reviewing_team_id=team.id, reviewed_team_id=team.id) for _ in range(5)
+    ])
+    db_session.commit()
+
+    # Act
+    # ----
+    grades = _walk(instructor_client, f"/grades/?student_id={student.id}&limit=3")
+    reviews = _walk(instructor_client, f"/peer-reviews/?reviewing_team_id={team.id}&limit=2")
+
+    # Assert
+    # -------
+    assert [len(p.json()) for p in grades] == [3, 3, 1]
+    assert {g["studentId"] for p in grades for g in p.json()} == {student.id}
+    assert sum(len(p.json()) for p in reviews) == 5
+
+
+def test_default_page_is_bounded(instructor_client, db_session):
+    # Arrange
+    # --------
+    size = app_settings.LIST_PAGE_SIZE
+    db_session.add_all([Student(name=f"Bounded {i}", email=f"bounded{i}@example.com") for i in range(size + 5)])
+    db_session.commit()
+
+    # Act
+    # ----
+    pages = _walk(instructor_client, "/students/")
+
+    # Assert
+    # -------
+    # без limit — страница LIST_PAGE_SIZE, а не весь список
+    assert [len(page.json()) for page in pages] == [size, 5]
+
+
+def test_bad_cursor_and_limit(instructor_client):
+    assert instructor_client.get("/teams/?cursor=not-a-cursor").status_code == 400
+    assert instructor_client.get("/teams/?limit=0").status_code == 422
+    assert instructor_client.get("/teams/?limit=100000").status_code == 422
+    assert instructor_client.get(f"/teams/?cursor={encode_cursor(10**9)}").json() == []
+
+
+def test_deep_page_seeks_by_primary_key(db_session):
+    # Arrange
+    # --------
+    sql = "EXPLAIN QUERY PLAN SELECT * FROM students WHERE id > :after ORDER BY id LIMIT 101"
+
+    # Act
+    # ----
+    plan = " ".join(row[-1] for row in db_session.execute(text(sql), {"after": 5000}))
+
+    # Assert
+    # -------
+    assert "USING INTEGER PRIMARY KEY" in plan
+    assert "TEMP B-TREE" not in plan
@@ -0,0 +1,148 @@
+# tests/test_password_hashing.py
+
+import asyncio
+
+from passlib.context import CryptContext
+from sqlalchemy import event
+
+from app.core.config import app_settings
+from app.core import hashing
+from app.core.hashing import hash_pool_metrics, hash_pool_size, pwd_context
+from app.models.user import User, UserRole
+
+
+def _user(db_session, email, hashed_password):
+    user = User(name=email, email=email, hashed_password=hashed_password, role=UserRole.INSTRUCTOR)
+    db_session.add(user)
+    db_session.commit()
+    return user
+
+
+def test_login_rehashes_outdated_cost(client, db_session):
+    # Arrange
+    # --------
+    old_hash = CryptContext(schemes=["bcrypt"], bcrypt__rounds=5).hash("secret")
+    user = _user(db_session, "rehash@example.com", old_hash)
+    before = hash_pool_metrics()
+
+    # Act
+    # ----
+    wrong = client.post("/auth/login", json={"email": user.email, "password": "nope"})
+    unchanged = user.hashed_password
+    first = client.post("/auth/login", json={"email": user.email, "password": "secret"})
+    db_session.refresh(user)
+    rehashed = user.hashed_password
+    second = client.post("/auth/token", data={"username": user.email, "password": "secret"})
+    db_session.refresh(user)
+
+    # Assert
+    # -------
+    assert wrong.status_code == 401
+    assert unchanged == old_hash
+    assert first.status_code == 200
+    assert rehashed.startswith(f"$2b${app_settings.PASSWORD_BCRYPT_ROUNDS:02d}$")
+    assert not pwd_context.needs_update(rehashed)
+    assert second.status_code == 200
+    assert user.hashed_password == rehashed
+
+    after = hash_pool_metrics()
+    assert after.rehashed - before.rehashed == 1
+    assert after.completed - before.completed == 3
+    assert after.in_flight == 0
+
+
+def test_hash_queue_limit_rejects_with_503(client, db_session, monkeypatch):
+    # Arrange
+    # --------
+    user = _user(db_session, "busy@example.com", pwd_context.hash("secret"))
+    monkeypatch.setattr(app_settings, "PASSWORD_HASH_QUEUE_SIZE", 0)
+    before = hash_pool_metrics()
+
+    # Act
+    # ----
+    login = client.post("/auth/login", json={"email": user.email, "password": "secret"})
+    register = client.post("/auth/register", json={
+        "name": "Busy", "email": "busy2@example.com", "password": "secret", "role": "instructor",
+    })
+
+    # Assert
+    # -------
+    assert login.status_code == 503
+    assert login.headers["retry-after"] == "1"
+    assert register.status_code == 503
+    assert hash_pool_metrics().rejected - before.rejected == 2
+    assert db_session.query(User).filter(User.email == "busy2@example.com").count() == 0
+
+
+def test_hashing_metrics_endpoint(instructor_client):
+    # Act
+    # ----
+    register = instructor_client.post("/auth/register", json={
+        "name": "New", "email": "metrics@example.com", "password": "secret", "role": "instructor",
+    })
+    metrics = instructor_client.get("/auth/hashing/metrics")
+
+    # Assert
+    # -------
+    assert register.status_code == 201
+    body = metrics.json()
+    assert body["queueLimit"] == app_settings.PASSWORD_HASH_QUEUE_SIZE
+    assert body["workers"] >= 1
+    assert body["submitted"] >= 1
+    assert body["inFlight"] == 0
+    assert body["avgSeconds"] > 0
+
+
+def test_auth_sql_runs_off_the_event_loop(client, db_session):
+    # Arrange
+    # --------
+    old_hash = CryptContext(schemes=["bcrypt"], bcrypt__rounds=5).hash("secret")
+    user = _user(db_session, "offloop@example.com", old_hash)
+    connection = db_session.get_bind()
+    on_loop = []
+
+    def _on_execute(conn, cursor, statement, parameters, context, executemany):
+        try:
+            asyncio.get_running_loop()
+            on_loop.append(statement)
+        except RuntimeError:
+            pass
+
+    # Act
+    # ----
+    event.listen(connection, "before_cursor_execute", _on_execute)
+    try:
+        login = client.post("/auth/login", json={"email": user.email, "password": "secret"})
+        register = client.post("/auth/register", json={
+            "name": "Loop", "email": "offloop-student@example.com", "password": "secret",
+        })
+    finally:
+        event.remove(connection, "before_cursor_execute", _on_execute)
+
+    # Assert
+    # -------
+    assert login.status_code == 200
+    assert register.status_code == 201
+    assert on_loop == []
+
+
+def test_pool_size_shares_cores_between_web_workers(monkeypatch):
+    # Arrange
+    # --------
+    monkeypatch.setattr(hashing.os, "cpu_count", lambda: 8)
+    monkeypatch.setattr(app_settings, "PASSWORD_HASH_WORKERS", 0)
+
+    def size(web_workers):
+        monkeypatch.setattr(app_settings, "WEB_CONCURRENCY", web_workers)
+        return hash_pool_size()
+
+    # Act
+    # ----
+    sizes = [size(1), size(4), size(16)]
+    monkeypatch.setattr(app_settings, "PASSWORD_HASH_WORKERS", 3)
+    explicit = size(4)
+
+    # Assert
+    # -------
+    assert sizes == [8, 2, 1]
+    assert explicit == 3
@@ -0,0 +1,74 @@
+# tests/test_peer_review_bulk.py
+
+from app.models.peer_review import PeerReview, PeerReviewStatus
+from app.models.team import Team
+
+
+def _create_reviews(db_session, n):
+    t1 = Team(name="Bulk One", color="#00AA00")
+    t2 = Team(name="Bulk Two", color="#00BB00")
+    db_session.add_all([t1, t2])
+    db_session.flush()
+    reviews = [
+        PeerReview(sprint=1, reviewing_team_id=t1.id, reviewed_team_id=t2.id,
+                   status=PeerReviewStatus.SUBMITTED)
+        for _ in range(n)
+    ]
+    db_session.add_all(reviews)
+    db_session.commit()
+    return t1, t2, [r.id for r in reviews]
+
+
+def test_bulk_update_applies_grades_in_one_transaction(instructor_client, db_session):
+    # Arrange
+    # --------
+    _, _, ids = _create_reviews(db_session, 3)
+    payload = [
+        {"id": ids[0], "reviewGrade": 8},
+        {"id": ids[1], "reviewGrade": 9},
+        {"id": ids[2], "reviewGrade": 10, "assignedWork": "Sprint 1 report"},
+        {"id": 999999, "reviewGrade": 1},
+    ]
+
+    # Act
+    # ----
+    response = instructor_client.patch("/peer-reviews/bulk", json=payload)
+
+    # Assert
+    # -------
+    assert response.status_code == 200
+    assert response.json() == [
+        {"id": ids[0], "ok": True, "error": None},
+        {"id": ids[1], "ok": True, "error": None},
+        {"id": ids[2], "ok": True, "error": None},
+        {"id": 999999, "ok": False, "error": "Peer review not found"},
+    ]
+    db_session.expire_all()
+    reviews = {r.id: r for r in db_session.query(PeerReview).filter(PeerReview.id.in_(ids))}
+    assert [reviews[i].review_grade for i in ids] == [8, 9, 10]
+    assert reviews[ids[2]].assigned_work == "Sprint 1 report"
+    assert reviews[ids[0]].assigned_work is None
+    assert all(r.status == PeerReviewStatus.SUBMITTED for r in reviews.values())
+
+
+def test_bulk_update_rejects_unknown_teams_per_item(instructor_client, db_session):
+    # Arrange
+    # --------
+    _, t2, ids = _create_reviews(db_session, 2)
+
+    # Act
+    # ----
+    response = instructor_client.patch(
+        "/peer-reviews/bulk",
+        json=[
+            {"id": ids[0], "reviewedTeamId": 424242},
+            {"id": ids[1], "reviewingTeamId": t2.id, "reviewGrade": 5},
+        ],
+    )
+
+    # Assert
+    # -------
+    assert [r["ok"] for r in response.json()] == [False, True]
+    db_session.expire_all()
+    assert db_session.get(PeerReview, ids[1]).reviewing_team_id == t2.id
+    assert db_session.get(PeerReview, ids[0]).reviewed_team_id == t2.id
@@ -0,0 +1,105 @@
+# tests/test_peer_review_mirror_links.py
+
+from sqlalchemy import create_engine, inspect, text
+
+from main import web_app
+from app.core.security import get_current_user
+from app.models.base import Base, ensure_indexes
+from app.models.peer_review import PeerReview, PeerReviewStatus
+from app.models.student import Student
+from app.models.team import Team
+from app.models.user import User, UserRole
+
+
+def _seed(db_session, sprints, prefix="Mirror"):
+    t1 = Team(name=f"{prefix} One", color="#000001")
+    t2 = Team(name=f"{prefix} Two", color="#000002")
+    db_session.add_all([t1, t2])
+    db_session.flush()
+
+    student = Student(name="Reviewer", email=f"{prefix}@example.com", team_id=t1.id)
+    db_session.add(student)
+    db_session.flush()
+
+    user = User(
+        name="Reviewer",
+        email=f"{prefix}@example.com",
+        hashed_password="not-used",
+        role=UserRole.STUDENT,
+        student_id=student.id,
+    )
+    db_session.add(user)
+
+    for sprint in range(1, sprints + 1):
+        db_session.add_all([
+            PeerReview(sprint=sprint, reviewing_team_id=t1.id, reviewed_team_id=t2.id,
+                       status=PeerReviewStatus.PENDING),
+            # у команды напротив лежит ссылка на отчёт t2 за этот спринт
+            PeerReview(sprint=sprint, reviewing_team_id=t2.id, reviewed_team_id=t1.id,
+                       reviewed_team_report_link=f"https://example.com/t2/{sprint}",
+                       status=PeerReviewStatus.PENDING),
+        ])
+    db_session.commit()
+    web_app.dependency_overrides[get_current_user] = lambda: user
+    return t1, t2
+
+
+def test_student_sees_mirror_report_links(client, db_session):
+    # Arrange
+    # --------
+    _, t2 = _seed(db_session, sprints=3)
+
+    # Act
+    # ----
+    response = client.get("/peer-reviews/")
+
+    # Assert
+    # -------
+    assert response.status_code == 200
+    data = sorted(response.json(), key=lambda r: r["sprint"])
+    assert [r["reviewedTeamId"] for r in data] == [t2.id] * 3
+    assert [r["reviewedTeamReportLink"] for r in data] == [
+        f"https://example.com/t2/{s}" for s in (1, 2, 3)
+    ]
+
+
+def test_mirror_lookup_query_count_does_not_grow_with_sprints(client, db_session, query_counter):
+    # Arrange
+    # --------
+    _seed(db_session, sprints=2)
+    query_counter.reset()
+    client.get("/peer-reviews/")
+    few_sprints = query_counter.count
+
+    _seed(db_session, sprints=12, prefix="Many")
+
+    # Act
+    # ----
+    query_counter.reset()
+    response = client.get("/peer-reviews/")
+
+    # Assert
+    # -------
+    assert len(response.json()) == 12
+    assert query_counter.count == few_sprints
+
+
+def test_mirror_index_is_added_to_existing_table(tmp_path):
+    # Arrange
+    # --------
+    name = "ix_peer_reviews_sprint_reviewing_team"
+    engine = create_engine(f"sqlite:///{tmp_path / 'reviews.db'}")
+    Base.metadata.create_all(bind=engine)
+    with engine.begin() as conn:
+        conn.execute(text(f"DROP INDEX {name}"))
+
+    # Act
+    # ----
+    ensure_indexes(engine, [name])
+    ensure_indexes(engine, [name])
+
+    # Assert
+    # -------
+    indexes = {ix["name"]: ix["column_names"] for ix in inspect(engine).get_indexes("peer_reviews")}
+    assert indexes[name] == ["sprint", "reviewing_team_id"]
+    engine.dispose()
@@ -0,0 +1,107 @@
+# tests/test_review_generation.py
+
+from app.api.endpoints import peer_reviews
+from app.api.endpoints.teams import TOTAL_SPRINTS, maybe_generate_peer_reviews_for_project
+from app.models.file_blob import FileBlob
+from app.models.grade import AssignmentLetterEnum
+from app.models.grade_stat import GradeStat
+from app.models.peer_review import PeerReview, PeerReviewStatus
+from app.models.project import Project
+from app.models.student import Student
+from app.models.team import Team
+from app.models.team_grade import TeamGrade
+from app.services.jobs import run_pending
+
+
+def _project_with_teams(db_session, name, sizes, locked=True):
+    project = Project(name=name, max_teams=len(sizes), max_students_per_team=5)
+    db_session.add(project)
+    db_session.flush()
+    teams = []
+    for i, size in enumerate(sizes):
+        team = Team(name=f"{name} {i}", color="#ABCDEF", is_locked=locked, project_id=project.id)
+        db_session.add(team)
+        db_session.flush()
+        for j in range(size):
+            db_session.add(Student(name=f"{name} {i}.{j}", email=f"{name}{i}.{j}@example.com",
+                                   team_id=team.id))
+        teams.append(team)
+    db_session.commit()
+    return project, teams
+
+
+def test_locking_last_team_generates_schedule_for_its_project_only(
+    instructor_client, db_session, query_counter
+):
+    # Arrange
+    # --------
+    _, other_teams = _project_with_teams(db_session, "Other", [1, 1], locked=False)
+    _, teams = _project_with_teams(db_session, "Main", [2, 2, 2, 0, 2])
+    last = teams[-1]
+    last.is_locked = False
+    db_session.commit()
+    last_id, empty_id = last.id, teams[3].id
+    main_ids = {t.id for t in teams} - {empty_id}
+
+    # Act
+    # ----
+    query_counter.reset()
+    response = instructor_client.patch(f"/teams/{last_id}", json={"isLocked": True})
+    request_queries = query_counter.count
+    query_counter.reset()
+    run_pending(db_session)
+
+    # Assert
+    # -------
+    assert response.status_code == 200
+    reviews = db_session.query(PeerReview).all()
+    assert len(reviews) == TOTAL_SPRINTS * 4
+    assert {r.reviewing_team_id for r in reviews} == main_ids
+    assert all(r.reviewing_team_id != r.reviewed_team_id for r in reviews)
+    assert db_session.get(Team, empty_id) is None
+    assert all(db_session.get(Team, t.id) is not None for t in other_teams)
+    assert request_queries < 15
+    # вместе с claim/finish самой задачи и счётчиком инвалидации снапшотов
+    assert query_counter.count < 26
+
+
+def test_regeneration_releases_blobs_and_cleans_up_empty_teams(
+    instructor_client, db_session, tmp_path, monkeypatch
+):
+    # Arrange
+    # --------
+    monkeypatch.setattr(peer_reviews, "UPLOAD_DIR", tmp_path)
+    project, teams = _project_with_teams(db_session, "Regen", [1, 1, 0])
+    empty_id = teams[2].id
+    pr = PeerReview(sprint=1, reviewing_team_id=teams[0].id, reviewed_team_id=teams[2].id,
+                    status=PeerReviewStatus.PENDING)
+    db_session.add(pr)
+    db_session.commit()
+    instructor_client.post(
+        "/peer-reviews/upload",
+        data={"reviewId": str(pr.id), "fileType": "summary"},
+        files={"file": ("r.pdf", b"%PDF-1.4 regenerated away", "application/pdf")},
+    )
+    instructor_client.post(
+        "/team-grades/",
+        json={"teamId": empty_id, "sprint": 2, "assignment": "A", "score": 77},
+    )
+    blob = next(tmp_path.rglob("*.pdf"))
+
+    # Act
+    # ----
+    maybe_generate_peer_reviews_for_project(db_session, project.id)
+
+    # Assert
+    # -------
+    assert not blob.exists()
+    assert db_session.get(FileBlob, blob.stem) is None
+    assert db_session.get(Team, empty_id) is None
+    assert db_session.query(TeamGrade).filter(TeamGrade.team_id == empty_id).count() == 0
+    assert db_session.query(GradeStat).filter(
+        GradeStat.scope == "team",
+        GradeStat.sprint == 2,
+        GradeStat.assignment == AssignmentLetterEnum.A,
+        GradeStat.count != 0,
+    ).count() == 0
+    assert db_session.query(PeerReview).count() == TOTAL_SPRINTS * 2
@@ -0,0 +1,387 @@
+# tests/test_review_uploads.py
+
+import asyncio
+import hashlib
+import io
+import json
+import zipfile
+
+import pytest
+from sqlalchemy import event
+
+from app.api.endpoints import peer_reviews
+from app.core.config import app_settings
+from app.models.file_blob import FileBlob
+from app.models.peer_review import PeerReview, PeerReviewStatus
+from app.models.team import Team
+from app.services import blob_store
+from app.services.archives import (
+    build_sprint_archive,
+    ensure_sprint_archive,
+    read_manifest,
+    update_sprint_archive,
+)
+from app.services.jobs import run_pending
+
+
+@pytest.fixture
+def upload_dir(tmp_path, monkeypatch):
+    monkeypatch.setattr(peer_reviews, "UPLOAD_DIR", tmp_path)
+    return tmp_path
+
+
+def _create_review(db_session):
+    t1 = Team(name="Upload One", color="#0000AA")
+    t2 = Team(name="Upload Two", color="#0000BB")
+    db_session.add_all([t1, t2])
+    db_session.flush()
+    pr = PeerReview(sprint=1, reviewing_team_id=t1.id, reviewed_team_id=t2.id,
+                    status=PeerReviewStatus.PENDING)
+    db_session.add(pr)
+    db_session.commit()
+    return pr
+
+
+def test_upload_streams_file_with_checksum(instructor_client, db_session, upload_dir):
+    # Arrange
+    # --------
+    pr = _create_review(db_session)
+    review_id = pr.id
+    content = b"%PDF-1.4\n" + b"x" * (3 * 1024 * 1024)
+
+    # Act
+    # ----
+    first = instructor_client.post(
+        "/peer-reviews/upload",
+        data={"reviewId": str(review_id), "fileType": "summary"},
+        files={"file": ("summary.pdf", content, "application/pdf")},
+    )
+    second = instructor_client.post(
+        "/peer-reviews/upload",
+        data={"reviewId": str(review_id), "fileType": "comments"},
+        files={"file": ("comments.pdf", content, "application/pdf")},
+    )
+
+    # Assert
+    # -------
+    assert first.status_code == second.status_code == 200
+    assert first.json()["sha256"] == hashlib.sha256(content).hexdigest()
+    assert first.json()["size"] == len(content)
+
+    # identical content for both file types is stored once
+    # (locks/ — файлы межпроцессных блокировок blob-хранилища)
+    stored = [p for p in upload_dir.rglob("*") if p.is_file() and p.parent.name != "locks"]
+    assert len(stored) == 1
+    assert stored[0].read_bytes() == content
+    assert stored[0].stem == hashlib.sha256(content).hexdigest()
+    assert db_session.get(FileBlob, stored[0].stem).ref_count == 2
+
+    db_session.expire_all()
+    assert db_session.get(PeerReview, review_id).status == PeerReviewStatus.SUBMITTED
+
+
+def test_upload_sql_and_unlink_run_off_the_event_loop(instructor_client, db_session, upload_dir, monkeypatch):
+    # Arrange
+    # --------
+    pr = _create_review(db_session)
+    connection = db_session.get_bind()
+    on_loop = []
+    unlink_released = blob_store.unlink_released
+
+    def _on_loop():
+        try:
+            asyncio.get_running_loop()
+            return True
+        except RuntimeError:
+            return False
+
+    def _on_execute(conn, cursor, statement, parameters, context, executemany):
+        if _on_loop():
+            on_loop.append(statement)
+
+    def _unlink(*args, **kwargs):
+        if _on_loop():
+            on_loop.append("unlink_released")
+        return unlink_released(*args, **kwargs)
+
+    monkeypatch.setattr(blob_store, "unlink_released", _unlink)
+
+    # Act
+    # ----
+    event.listen(connection, "before_cursor_execute", _on_execute)
+    try:
+        responses = [
+            instructor_client.post(
+                "/peer-reviews/upload",
+                data={"reviewId": str(pr.id), "fileType": "summary", "suggestedGrades": '{"A": 80}'},
+                files={"file": ("summary.pdf", b"%PDF-1.4\n" + content, "application/pdf")},
+            )
+            for content in (b"first", b"second")
+        ]
+    finally:
+        event.remove(connection, "before_cursor_execute", _on_execute)
+
+    # Assert
+    # -------
+    assert [r.status_code for r in responses] == [200, 200]
+    assert on_loop == []
+
+
+def test_upload_over_limit_is_rejected(instructor_client, db_session, upload_dir, monkeypatch):
+    # Arrange
+    # --------
+    pr = _create_review(db_session)
+    monkeypatch.setattr(app_settings, "MAX_UPLOAD_SIZE_MB", 1)
+
+    # Act
+    # ----
+    response = instructor_client.post(
+        "/peer-reviews/upload",
+        data={"reviewId": str(pr.id), "fileType": "summary"},
+        files={"file": ("big.pdf", b"x" * (2 * 1024 * 1024), "application/pdf")},
+    )
+
+    # Assert
+    # -------
+    assert response.status_code == 413
+    assert [p for p in upload_dir.rglob("*") if p.is_file()] == []
+
+
+def test_download_all_streams_stored_zip(instructor_client, db_session, upload_dir):
+    # Arrange
+    # --------
+    pr = _create_review(db_session)
+    summary = upload_dir / "s.pdf"
+    comments = upload_dir / "c.pdf"
+    summary.write_bytes(b"%PDF summary" * 1000)
+    comments.write_bytes(b"%PDF comments" * 1000)
+    pr.summary_pdf_link = str(summary)
+    pr.comments_pdf_link = str(comments)
+    review_id = pr.id
+    db_session.commit()
+
+    # Act
+    # ----
+    response = instructor_client.get("/peer-reviews/1/download-all")
+
+    # Assert
+    # -------
+    assert response.status_code == 200
+    assert response.headers["content-type"] == "application/zip"
+    with zipfile.ZipFile(io.BytesIO(response.content)) as zf:
+        assert zf.testzip() is None
+        infos = {i.filename: i for i in zf.infolist()}
+        summary_name = f"sprint_1/review_{review_id}_summary.pdf"
+        assert zf.read(summary_name) == summary.read_bytes()
+        assert zf.read(f"sprint_1/review_{review_id}_comments.pdf") == comments.read_bytes()
+        assert all(i.compress_type == zipfile.ZIP_STORED for i in infos.values())
+
+
+def test_blob_is_unlinked_only_after_last_reference(instructor_client, db_session, upload_dir):
+    # Arrange
+    # --------
+    pr = _create_review(db_session)
+    review_id = pr.id
+    content = b"%PDF-1.4 same file"
+    for file_type in ("summary", "comments"):
+        instructor_client.post(
+            "/peer-reviews/upload",
+            data={"reviewId": str(review_id), "fileType": file_type},
+            files={"file": ("r.pdf", content, "application/pdf")},
+        )
+    blob = next(p for p in upload_dir.rglob("*.pdf"))
+
+    # Act
+    # ----
+    instructor_client.delete(f"/peer-reviews/{review_id}/file/summary")
+    after_first = blob.exists()
+    instructor_client.delete(f"/peer-reviews/{review_id}/file/comments")
+
+    # Assert
+    # -------
+    assert after_first
+    assert not blob.exists()
+    assert db_session.get(FileBlob, blob.stem) is None
+
+
+def test_blob_removed_by_concurrent_cleanup_is_rewritten(
+    instructor_client, db_session, upload_dir, monkeypatch
+):
+    # Arrange
+    # --------
+    review_id = _create_review(db_session).id
+    content = b"%PDF-1.4 raced"
+    instructor_client.post(
+        "/peer-reviews/upload",
+        data={"reviewId": str(review_id), "fileType": "summary"},
+        files={"file": ("r.pdf", content, "application/pdf")},
+    )
+    blob = next(upload_dir.rglob("*.pdf"))
+    acquire = blob_store._acquire
+
+    def acquire_then_cleanup_wins(db, digest, size):
+        # put_upload уже увидел файл и не копировал; параллельный
+        # unlink_released проверил ref_count до нашего commit и удалил файл
+        acquire(db, digest, size)
+        blob.unlink()
+
+    monkeypatch.setattr(blob_store, "_acquire", acquire_then_cleanup_wins)
+
+    # Act
+    # ----
+    response = instructor_client.post(
+        "/peer-reviews/upload",
+        data={"reviewId": str(review_id), "fileType": "comments"},
+        files={"file": ("r.pdf", content, "application/pdf")},
+    )
+
+    # Assert
+    # -------
+    assert response.status_code == 200
+    assert blob.read_bytes() == content
+    assert db_session.get(FileBlob, blob.stem).ref_count == 2
+
+
+def test_download_supports_etag_and_range(instructor_client, db_session, upload_dir):
+    # Arrange
+    # --------
+    pr = _create_review(db_session)
+    review_id = pr.id
+    content = b"%PDF-1.4 " + bytes(range(256)) * 40
+    instructor_client.post(
+        "/peer-reviews/upload",
+        data={"reviewId": str(review_id), "fileType": "summary"},
+        files={"file": ("r.pdf", content, "application/pdf")},
+    )
+    url = f"/peer-reviews/{review_id}/download/summary"
+
+    # Act
+    # ----
+    full = instructor_client.get(url)
+    etag = full.headers["etag"]
+    cached = instructor_client.get(url, headers={"If-None-Match": etag})
+    by_date = instructor_client.get(url, headers={"If-Modified-Since": full.headers["last-modified"]})
+    partial = instructor_client.get(url, headers={"Range": "bytes=10-19"})
+    stale_if_range = instructor_client.get(url, headers={"Range": "bytes=0-9", "If-Range": '"other"'})
+
+    # Assert
+    # -------
+    assert full.status_code == 200
+    assert full.content == content
+    assert etag == f'"{hashlib.sha256(content).hexdigest()}"'
+    assert cached.status_code == 304
+    assert cached.content == b""
+    assert by_date.status_code == 304
+    assert partial.status_code == 206
+    assert partial.content == content[10:20]
+    assert partial.headers["content-range"] == f"bytes 10-19/{len(content)}"
+    assert stale_if_range.status_code == 200
+
+
+def test_sprint_archive_is_prebuilt_and_updated_on_upload(instructor_client, db_session, upload_dir):
+    # Arrange
+    # --------
+    pr = _create_review(db_session)
+    review_id = pr.id
+
+    def upload(file_type, content):
+        return instructor_client.post(
+            "/peer-reviews/upload",
+            data={"reviewId": str(review_id), "fileType": file_type},
+            files={"file": ("r.pdf", content, "application/pdf")},
+        )
+
+    upload("summary", b"%PDF summary v1")
+    archive = upload_dir / "archives" / "sprint_1.zip"
+    # архива ещё нет: отдаём поток, сборку ставим в очередь
+    streamed = instructor_client.get("/peer-reviews/1/download-all")
+    missing = not archive.exists()
+    run_pending(db_session)
+    first = instructor_client.get("/peer-reviews/1/download-all")
+    built = archive.stat().st_mtime_ns
+
+    # Act
+    # ----
+    again = instructor_client.get("/peer-reviews/1/download-all")
+    reused = archive.stat().st_mtime_ns == built
+    upload("comments", b"%PDF comments")
+    run_pending(db_session)
+    appended = instructor_client.get("/peer-reviews/1/download-all")
+    upload("summary", b"%PDF summary v2")
+    invalidated = archive.exists()
+    replaced = instructor_client.get("/peer-reviews/1/download-all")
+
+    # Assert
+    # -------
+    assert missing
+    assert "etag" not in streamed.headers and "etag" in first.headers
+    with zipfile.ZipFile(io.BytesIO(streamed.content)) as zf:
+        assert zf.read(f"sprint_1/review_{review_id}_summary.pdf") == b"%PDF summary v1"
+    assert first.content == again.content
+    assert reused
+
+    with zipfile.ZipFile(io.BytesIO(appended.content)) as zf:
+        assert zf.read(f"sprint_1/review_{review_id}_summary.pdf") == b"%PDF summary v1"
+        assert zf.read(f"sprint_1/review_{review_id}_comments.pdf") == b"%PDF comments"
+
+    assert not invalidated
+    with zipfile.ZipFile(io.BytesIO(replaced.content)) as zf:
+        assert len(zf.namelist()) == 2
+        assert zf.read(f"sprint_1/review_{review_id}_summary.pdf") == b"%PDF summary v2"
+
+
+def test_sprint_archive_is_built_by_background_job(instructor_client, db_session, upload_dir):
+    # Arrange
+    # --------
+    pr = _create_review(db_session)
+    review_id = pr.id
+
+    # Act
+    # ----
+    for file_type in ("summary", "comments"):
+        instructor_client.post(
+            "/peer-reviews/upload",
+            data={"reviewId": str(review_id), "fileType": file_type},
+            files={"file": ("r.pdf", f"%PDF {file_type}".encode(), "application/pdf")},
+        )
+    done = run_pending(db_session)
+
+    # Assert
+    # -------
+    archive = upload_dir / "archives" / "sprint_1.zip"
+    assert done == 1  # две загрузки — одна задача на спринт
+    with zipfile.ZipFile(archive) as zf:
+        assert sorted(zf.namelist()) == [
+            f"sprint_1/review_{review_id}_comments.pdf",
+            f"sprint_1/review_{review_id}_summary.pdf",
+        ]
+
+
+def test_large_sprint_manifest_does_not_fit_zip_comment(tmp_path):
+    # Arrange
+    # --------
+    pdf = tmp_path / "review.pdf"
+    pdf.write_bytes(b"%PDF shared")
+    entries = {f"sprint_1/review_{i:05d}_summary.pdf": str(pdf) for i in range(2000)}
+    extra = tmp_path / "extra.pdf"
+    extra.write_bytes(b"%PDF extra")
+
+    # Act
+    # ----
+    archive = build_sprint_archive(tmp_path, 1, entries)
+    built = archive.stat().st_mtime_ns
+    manifest = read_manifest(archive)
+    ensure_sprint_archive(tmp_path, 1, entries)
+    reused = archive.stat().st_mtime_ns == built
+    update_sprint_archive(tmp_path, 1, "sprint_1/extra.pdf", str(extra))
+
+    # Assert
+    # -------
+    # манифест больше предела комментария ZIP (65535 байт)
+    assert len(json.dumps(entries)) > 65535
+    assert manifest == entries
+    assert reused
+    assert read_manifest(archive) == {**entries, "sprint_1/extra.pdf": str(extra)}
+    with zipfile.ZipFile(archive) as zf:
+        assert len(zf.namelist()) == 2001
+        assert zf.read("sprint_1/extra.pdf") == b"%PDF extra"
@@ -0,0 +1,127 @@
+# tests/test_roster_import.py
+
+import io
+import json
+
+from app.core.hashing import hash_passwords, pwd_context
+from app.models.student import Student
+from app.models.team import Team
+from app.models.user import User, UserRole
+from app.services.roster_import import import_roster
+
+
+def _upload(client, name, content, content_type):
+    return client.post("/auth/import", files={"file": (name, content.encode(), content_type)})
+
+
+def test_hash_passwords_keeps_order():
+    hashes = hash_passwords(["first", "second", "third"])
+    assert [pwd_context.verify(p, h) for p, h in zip(["first", "second", "third"], hashes)] == [True] * 3
+    assert not pwd_context.verify("first", hashes[1])
+
+
+def test_csv_import_creates_users_and_reports_bad_rows(instructor_client, client, db_session):
+    # Arrange
+    # --------
+    team = Team(name="Roster team", color="#123456")
+    db_session.add(team)
+    db_session.flush()
+    db_session.add_all([
+        Student(name="Known", email="known@example.com"),
+        User(name="Taken", email="taken@example.com", hashed_password="x", role=UserRole.STUDENT),
+    ])
+    db_session.commit()
+    team_id = team.id
+    content = "\n".join([
+        "name,email,password,role,team_id",
+        f"Ann,ann@example.com,secret1,,{team_id}",
+        f"Known,known@example.com,secret2,student,{team_id}",
+        "Prof,prof@example.com,secret3,instructor,",
+        "Ann again,ann@example.com,secret4,,",
+        "Taken,taken@example.com,secret5,,",
+        "Bad,not-an-email,secret6,,",
+        "Lost,lost@example.com,secret7,,999999",
+    ])
+
+    # Act
+    # ----
+    response = _upload(instructor_client, "roster.csv", content, "text/csv")
+    login = client.post("/auth/login", json={"email": "ann@example.com", "password": "secret1"})
+
+    # Assert
+    # -------
+    assert response.status_code == 200
+    report = response.json()
+    assert (report["created"], report["linkedStudents"]) == (3, 1)
+    assert [(e["row"], e["email"]) for e in report["errors"]] == [
+        (5, "ann@example.com"),
+        (6, "taken@example.com"),
+        (7, "not-an-email"),
+        (8, "lost@example.com"),
+    ]
+    assert "Team 999999" in report["errors"][-1]["error"]
+    assert login.status_code == 200
+
+    ann = db_session.query(User).filter(User.email == "ann@example.com").one()
+    known = db_session.query(Student).filter(Student.email == "known@example.com").one()
+    prof = db_session.query(User).filter(User.email == "prof@example.com").one()
+    assert ann.student.team_id == team_id
+    assert known.team_id == team_id
+    assert db_session.query(User).filter(User.student_id == known.id).count() == 1
+    assert (prof.role, prof.student_id) == (UserRole.INSTRUCTOR, None)
+
+
+def test_json_array_and_ndjson(instructor_client, db_session):
+    # Arrange
+    # --------
+    array = json.dumps([
+        {"name": "Json", "email": "json@example.com", "password": "pass1"},
+        {"name": "Short", "email": "short@example.com", "password": "p"},
+        "oops",
+    ])
+    ndjson = "\n".join([
+        json.dumps({"name": "Nd", "email": "nd@example.com", "password": "pass2"}),
+        "",
+        "{broken",
+    ])
+
+    # Act
+    # ----
+    from_array = _upload(instructor_client, "users.json", array, "application/json").json()
+    from_lines = _upload(instructor_client, "users.ndjson", ndjson, "application/x-ndjson").json()
+
+    # Assert
+    # -------
+    assert from_array["created"] == 1
+    assert [(e["row"], e["email"]) for e in from_array["errors"]] == [
+        (2, "short@example.com"),
+        (3, None),
+    ]
+    assert from_lines["created"] == 1
+    assert [e["row"] for e in from_lines["errors"]] == [3]
+    assert db_session.query(User).filter(User.email.in_(["json@example.com", "nd@example.com"])).count() == 2
+
+
+def test_import_batches_queries(db_session, query_counter, monkeypatch):
+    # Arrange
+    # --------
+    # хэширование не предмет этого теста: bcrypt на сотнях паролей слишком медленный для CI
+    monkeypatch.setattr(
+        "app.services.roster_import.hash_passwords", lambda passwords: ["x"] * len(passwords)
+    )
+    content = "name,email,password\n" + "\n".join(
+        f"Student {i},batch{i}@example.com,pass{i}" for i in range(300)
+    )
+
+    # Act
+    # ----
+    query_counter.reset()
+    result = import_roster(db_session, io.BytesIO(content.encode()), "roster.csv", batch_size=100)
+
+    # Assert
+    # -------
+    assert (result.created, result.errors) == (300, [])
+    # на пачку: users, students, INSERT students, INSERT users; плюс сброс снимков
+    # (счётчик инвалидаций + DELETE)
+    assert query_counter.count <= 3 * 4 + 3
+    assert db_session.query(User).filter(User.email.like("batch%")).count() == 300
@@ -0,0 +1,135 @@
+# tests/test_suggested_grades.py
+
+import json
+
+import pytest
+
+from app.api.endpoints import peer_reviews
+from app.models.grade import AssignmentLetterEnum
+from app.models.peer_review import PeerReview, PeerReviewStatus
+from app.models.suggested_grade import SuggestedGrade
+from app.models.team import Team
+from app.services.jobs import run_pending
+from app.services.suggested_grades import parse_suggested_grades
+
+
+@pytest.fixture
+def upload_dir(tmp_path, monkeypatch):
+    monkeypatch.setattr(peer_reviews, "UPLOAD_DIR", tmp_path)
+    return tmp_path
+
+
+def _reviews_of(db_session, reviewed, reviewers, sprint=1):
+    reviews = [
+        PeerReview(sprint=sprint, reviewing_team_id=t.id, reviewed_team_id=reviewed.id,
+                   status=PeerReviewStatus.PENDING)
+        for t in reviewers
+    ]
+    db_session.add_all(reviews)
+    db_session.commit()
+    return reviews
+
+
+def _teams(db_session, count):
+    teams = [Team(name=f"Suggested {i}", color="#00AA00") for i in range(count)]
+    db_session.add_all(teams)
+    db_session.flush()
+    return teams
+
+
+def _projection(db_session, review_id):
+    return {
+        sg.assignment: sg.score
+        for sg in db_session.query(SuggestedGrade).filter(SuggestedGrade.peer_review_id == review_id)
+    }
+
+
+def test_parse_suggested_grades():
+    assert parse_suggested_grades({"assignment": 85, "iteration": "90", "note": "x"}) == {
+        AssignmentLetterEnum.A: 85,
+        AssignmentLetterEnum.I: 90,
+    }
+    assert parse_suggested_grades({"C": 70, "assignment": "n/a"}) == {AssignmentLetterEnum.C: 70}
+    assert parse_suggested_grades(None) == {}
+
+
+def test_upload_projects_suggested_grades_and_summary_averages(
+    instructor_client, db_session, upload_dir
+):
+    # Arrange
+    # --------
+    reviewed, *reviewers = _teams(db_session, 3)
+    reviews = _reviews_of(db_session, reviewed, reviewers)
+    review_ids = [r.id for r in reviews]
+    reviewed_id = reviewed.id
+
+    # Act
+    # ----
+    for review_id, grades in zip(review_ids, [{"assignment": 80, "iteration": 70},
+                                              {"assignment": 90}]):
+        instructor_client.post(
+            "/peer-reviews/upload",
+            data={"reviewId": str(review_id), "fileType": "summary",
+                  "suggestedGrades": json.dumps(grades)},
+            files={"file": ("s.pdf", b"%PDF s", "application/pdf")},
+        )
+    response = instructor_client.get("/peer-reviews/suggested-grades/summary?sprint=1")
+
+    # Assert
+    # -------
+    assert response.status_code == 200
+    rows = {(r["teamId"], r["assignment"]): r for r in response.json()}
+    assert rows[(reviewed_id, "A")]["avgScore"] == 85
+    assert rows[(reviewed_id, "A")]["count"] == 2
+    assert rows[(reviewed_id, "I")]["avgScore"] == 70
+    assert _projection(db_session, review_ids[0]) == {
+        AssignmentLetterEnum.A: 80,
+        AssignmentLetterEnum.I: 70,
+    }
+
+
+def test_projection_follows_json_on_update_bulk_and_delete(
+    instructor_client, db_session, upload_dir
+):
+    # Arrange
+    # --------
+    reviewed, reviewer = _teams(db_session, 2)
+    (review,) = _reviews_of(db_session, reviewed, [reviewer])
+    review_id = review.id
+
+    # Act
+    # ----
+    instructor_client.put(f"/peer-reviews/{review_id}", json={"suggestedGrades": {"assignment": 50}})
+    after_put = _projection(db_session, review_id)
+    instructor_client.patch(
+        "/peer-reviews/bulk", json=[{"id": review_id, "suggestedGrades": {"iteration": 60}}]
+    )
+    after_bulk = _projection(db_session, review_id)
+    instructor_client.delete(f"/peer-reviews/{review_id}/file/summary")
+    after_delete = _projection(db_session, review_id)
+
+    # Assert
+    # -------
+    assert after_put == {AssignmentLetterEnum.A: 50}
+    assert after_bulk == {AssignmentLetterEnum.I: 60}
+    assert after_delete == {}
+
+
+def test_rebuild_backfills_projection_from_json(instructor_client, db_session):
+    # Arrange
+    # --------
+    reviewed, reviewer = _teams(db_session, 2)
+    (review,) = _reviews_of(db_session, reviewed, [reviewer])
+    review.suggested_grades = {"assignment": 77}
+    db_session.commit()
+    review_id = review.id
+
+    # Act
+    # ----
+    response = instructor_client.post("/peer-reviews/suggested-grades/rebuild")
+    run_pending(db_session)
+
+    # Assert
+    # -------
+    assert response.status_code == 202
+    assert _projection(db_session, review_id) == {AssignmentLetterEnum.A: 77}
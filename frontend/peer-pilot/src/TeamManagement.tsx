@@ -1,7 +1,7 @@
 import React, { useEffect, useState } from 'react';
 import { Plus, User, Shield, Lock, Edit2, Check, Users } from 'lucide-react';
 import { type Project, type Student, type Team, type UserRole } from './types/types';
-import { API_BASE_URL } from './api/studentApi';
+import { API_BASE_URL, fetchAllPages } from './api/studentApi';
 
 interface TeamManagementProps {
   role: UserRole;
@@ -125,12 +125,7 @@ export default function TeamManagement({ role }: TeamManagementProps) {
   };
 
   const loadProjects = async () => {
-    const resp = await authFetch('/projects');
-    if (!resp.ok) {
-      const text = await resp.text();
-      throw new Error(`Failed to load projects: ${resp.status} ${text}`);
-    }
-    const data = await resp.json();
+    const data = await fetchAllPages<any>('/projects', authFetch, 'Failed to load projects');
     setProjects(mapProjectsFromApi(data));
   };
 
@@ -1,5 +1,5 @@
 import type { ApiPeerReview, Grade, ReportLinkUpdate, Student, Team } from "../types/types";
-import { API_BASE_URL } from "./studentApi";
+import { API_BASE_URL, fetchAllPages } from "./studentApi";
 
 function authFetch(url: string, options: RequestInit = {}): Promise<Response> {
   const token = localStorage.getItem("access_token");
@@ -35,26 +35,17 @@ function authFetch(url: string, options: RequestInit = {}): Promise<Response> {
 export const apiService = {
     // Fetch all teams
     async fetchTeams(): Promise<Team[]> {
-        const response = await authFetch(`${API_BASE_URL}/teams`);
-        if (!response.ok) throw new Error('Failed to fetch teams');
-        const result: Team[] = await response.json();
-        return result;
+        return fetchAllPages<Team>(`${API_BASE_URL}/teams`, authFetch, 'Failed to fetch teams');
     },
 
     // Fetch all students
     async fetchStudents(): Promise<Student[]> {
-        const response = await authFetch(`${API_BASE_URL}/students`);
-        if (!response.ok) throw new Error('Failed to fetch students');
-        const result: Student[] = await response.json();
-        return result;
+        return fetchAllPages<Student>(`${API_BASE_URL}/students`, authFetch, 'Failed to fetch students');
     },
 
     // Fetch grades
     async fetchGrades(): Promise<Grade[]> {
-        const response = await authFetch(`${API_BASE_URL}/grades`);
-        if (!response.ok) throw new Error('Failed to fetch grades');
-        const result: Grade[] = await response.json();
-        return result;
+        return fetchAllPages<Grade>(`${API_BASE_URL}/grades`, authFetch, 'Failed to fetch grades');
     },
 
     // Save grades (batch update)
@@ -75,9 +66,11 @@ export const apiService = {
 
     // Get all peer reviews for a sprint
     async getPeerReviews(sprint: number): Promise<ApiPeerReview[]> {
-        const response = await authFetch(`${API_BASE_URL}/peer-reviews?sprint=${sprint}`);
-        if (!response.ok) throw new Error('Failed to fetch peer reviews');
-        return response.json();
+        return fetchAllPages<ApiPeerReview>(
+            `${API_BASE_URL}/peer-reviews?sprint=${sprint}`,
+            authFetch,
+            'Failed to fetch peer reviews',
+        );
     },
 
 
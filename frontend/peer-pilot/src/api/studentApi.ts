@@ -34,6 +34,27 @@ function authFetch(url: string, options: RequestInit = {}): Promise<Response> {
 // api/studentApi.ts
 export const API_BASE_URL = 'http://localhost:8000';
 
+const PAGE_LIMIT = 1000;
+
+// Списки на бэкенде отдаются страницами (keyset по id): курсор следующей
+// страницы приходит в заголовке X-Next-Cursor, на последней его нет.
+export async function fetchAllPages<T>(
+  url: string,
+  doFetch: (url: string) => Promise<Response>,
+  errorMessage: string,
+): Promise<T[]> {
+  const items: T[] = [];
+  const base = `${url}${url.includes('?') ? '&' : '?'}limit=${PAGE_LIMIT}`;
+  let cursor: string | null = null;
+  do {
+    const response = await doFetch(cursor ? `${base}&cursor=${encodeURIComponent(cursor)}` : base);
+    if (!response.ok) throw new Error(errorMessage);
+    items.push(...((await response.json()) as T[]));
+    cursor = response.headers.get('X-Next-Cursor');
+  } while (cursor);
+  return items;
+}
+
 export const studentApi = {
   // Fetch student dashboard data
   async fetchStudentDashboard(studentId: string): Promise<{
@@ -50,16 +71,16 @@ export const studentApi = {
 
   // Fetch grades for a student
   async fetchStudentGrades(studentId: string): Promise<any[]> {
-    const response = await authFetch(`${API_BASE_URL}/grades?student_id=${studentId}`);
-    if (!response.ok) throw new Error('Failed to fetch grades');
-    return response.json();
+    return fetchAllPages(`${API_BASE_URL}/grades?student_id=${studentId}`, authFetch, 'Failed to fetch grades');
   },
 
   // Fetch peer reviews for a team
   async fetchPeerReviews(teamId: string): Promise<any[]> {
-    const response = await authFetch(`${API_BASE_URL}/peer-reviews?reviewing_team_id=${teamId}`);
-    if (!response.ok) throw new Error('Failed to fetch peer reviews');
-    return response.json();
+    return fetchAllPages(
+      `${API_BASE_URL}/peer-reviews?reviewing_team_id=${teamId}`,
+      authFetch,
+      'Failed to fetch peer reviews',
+    );
   },
 
   async uploadFile(reviewId: string, fileType: 'comments' | 'summary', file: File, suggestedGrades: {[key: string]: { iteration: number; assignment: number }}): Promise<{fileUrl: string}> {
@@ -134,9 +155,7 @@ export const studentApi = {
 
   // Fetch team members
   async fetchTeamMembers(teamId: string): Promise<any[]> {
-    const response = await authFetch(`${API_BASE_URL}/students?team_id=${teamId}`);
-    if (!response.ok) throw new Error('Failed to fetch team members');
-    return response.json();
+    return fetchAllPages(`${API_BASE_URL}/students?team_id=${teamId}`, authFetch, 'Failed to fetch team members');
   },
 
   // Fetch team details